@@ -0,0 +1,143 @@
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from core.config import settings
+from data_ingestion.rss_collector import new_article_listeners
+from data_ingestion.work_queue import default_worker_id
+from local_processor import LocalProcessor, analysis_latency
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("analysis_pipeline")
+
+
+class AnalysisPipeline:
+    """采集到分析的流式流水线
+
+    RSSCollector 提交新文章后把ID放入有界队列，分析线程取出后凑成小批次（最多
+    batch_size 篇或等待 batch_wait 秒），通过待处理队列领取并分析。数据库中的
+    pending 状态是持久的队列，内存队列只是通知：
+    - 队列满时丢弃通知而不阻塞采集（背压），文章留在 pending 状态；
+    - 一段时间没有通知时扫描待处理文章，补上丢弃的通知、重启前未处理的文章
+      以及其他进程（如数据采集服务）写入的文章。
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None,
+        sweep_interval: Optional[float] = None
+    ):
+        self.workers = workers or settings.PIPELINE_WORKERS
+        self.batch_size = batch_size or settings.PIPELINE_BATCH_SIZE
+        self.batch_wait = settings.PIPELINE_BATCH_WAIT if batch_wait is None else batch_wait
+        self.sweep_interval = sweep_interval or settings.PIPELINE_SWEEP_INTERVAL
+        self.queue: "queue.Queue[int]" = queue.Queue(maxsize=queue_size or settings.PIPELINE_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.batches = 0
+        self.processed = 0
+
+    def publish(self, article_ids: Iterable[int]) -> None:
+        """放入新文章ID（不阻塞），队列满时丢弃，由定期扫描补上"""
+        dropped = 0
+        for article_id in article_ids:
+            try:
+                self.queue.put_nowait(article_id)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            with self._lock:
+                self.dropped += dropped
+            logger.warning(f"分析队列已满，{dropped}篇新文章等待定期扫描处理")
+
+    def start(self) -> None:
+        """启动分析线程并订阅采集器的新文章通知（重复调用无副作用）"""
+        if self.publish not in new_article_listeners:
+            new_article_listeners.append(self.publish)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            return
+        self._stop.clear()
+        worker_id = default_worker_id()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, args=(f"{worker_id}-pipeline-{index}",),
+                name=f"analysis-pipeline-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"启动分析流水线: {self.workers}个线程，小批次{self.batch_size}篇")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止分析线程并取消订阅"""
+        if self.publish in new_article_listeners:
+            new_article_listeners.remove(self.publish)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _next_batch(self) -> Optional[List[int]]:
+        """等待下一个小批次的文章ID，超过扫描间隔没有通知时返回 None"""
+        try:
+            batch = [self.queue.get(timeout=self.sweep_interval)]
+        except queue.Empty:
+            return None
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, worker_id: str) -> None:
+        processor = LocalProcessor(worker_id=worker_id)
+        while not self._stop.is_set():
+            ids = self._next_batch()
+            if self._stop.is_set():
+                break
+            # 收到通知时只领取这些文章；扫描时按ID顺序领取，直到没有待处理文章
+            while True:
+                result = processor.process_pending_articles(limit=self.batch_size, ids=ids)
+                if result["status"] != "success":
+                    self._stop.wait(5)  # 出错后稍等再继续，文章由队列重试
+                    break
+                with self._lock:
+                    self.batches += 1
+                    self.processed += result["processed"]
+                if ids is not None or result["processed"] < self.batch_size or self._stop.is_set():
+                    break
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = {"batches": self.batches, "processed": self.processed, "dropped": self.dropped}
+        return {
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            **counts,
+            "latency": analysis_latency.stats()
+        }
+
+
+# 进程内共享的分析流水线
+analysis_pipeline = AnalysisPipeline()
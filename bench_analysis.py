@@ -0,0 +1,48 @@
+"""并行分析基准：顺序分析 vs 不同进程数的进程池
+
+    python bench_analysis.py
+    python bench_analysis.py --articles 20000 --workers 1 2 4 8 16 --chunk-size 100 --backend lexicon
+"""
+import argparse
+import os
+import random
+import time
+
+from bench_sentiment import make_article
+from content_analysis.analyzer import ContentAnalyzer
+from content_analysis.parallel import ParallelAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行分析基准")
+    parser.add_argument("--articles", type=int, default=4000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--backend", default="textblob", help="情感分析后端")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    articles = [(i, f"Article {i}", make_article(args.words, rng)) for i in range(args.articles)]
+    analyzer = ContentAnalyzer(sentiment_backend=args.backend)
+    print(f"语料: {args.articles}篇, 每篇约{args.words}词, 情感后端 {args.backend}, CPU核数 {os.cpu_count()}")
+
+    start = time.perf_counter()
+    expected = analyzer.analyze_articles([(title, content) for _, title, content in articles])
+    sequential = time.perf_counter() - start
+    print(f"{'顺序':>6}: {args.articles / sequential:>8.0f} 篇/秒")
+
+    for workers in args.workers:
+        pool = ParallelAnalyzer(workers=workers, chunk_size=args.chunk_size)
+        # 预热：进程启动和分析器编译不计入耗时
+        list(pool.analyze(analyzer, articles[:args.chunk_size * workers]))
+        start = time.perf_counter()
+        scores = list(pool.analyze(analyzer, articles))
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+        assert [s[1] for s in scores] == [r["relevance_score"] for r in expected]
+        print(f"{workers:>4}进程: {args.articles / elapsed:>8.0f} 篇/秒 (加速 {sequential / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
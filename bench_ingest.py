@@ -0,0 +1,116 @@
+"""入库查重基准测试
+
+用合成的大型feed比较旧的逐条查重/逐条插入与批量查重/批量插入的耗时：
+
+    python bench_ingest.py --entries 10000 --existing 50000
+
+两种实现做相同的工作（都提取纯文本、计算guid哈希），近似重复检测只在批量实现中存在，测试时关闭。
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import feedparser
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from data_ingestion import models
+from data_ingestion.database import init_db
+from data_ingestion.normalize import plain_text
+from data_ingestion.rss_collector import RSSCollector
+
+
+def synthetic_entries(count: int, prefix: str):
+    """生成合成feed条目"""
+    return [
+        feedparser.FeedParserDict(
+            id=f"https://example.com/{prefix}/{i}",
+            link=f"https://example.com/{prefix}/{i}",
+            title=f"Synthetic article {prefix} {i}",
+            description=f"Synthetic body for article {i} about international students in Adelaide.",
+            published_parsed=time.gmtime(1700000000 + i)
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_store(db, source, entries) -> int:
+    """旧实现：每个条目一次查询、一次 db.add（与新实现一样提取纯文本、计算guid哈希）"""
+    new_articles = 0
+    for entry in entries:
+        guid = entry.get('id') or entry.get('link')
+        if db.query(models.Article).filter_by(guid=guid).first():
+            continue
+        content = entry.get('description', '')
+        text = plain_text(content)
+        db.add(models.Article(
+            guid=guid,
+            guid_hash=models.guid_key(guid),
+            title=entry.title,
+            content=content,
+            plain_text=text,
+            plain_text_length=len(text),
+            source=source.name,
+            url=entry.link,
+            published_at=datetime(*entry.published_parsed[:6]),
+            language='en',
+            status='pending'
+        ))
+        new_articles += 1
+    db.commit()
+    return new_articles
+
+
+def batched_store(db, source, entries) -> int:
+    """新实现：一次集合查重 + 一次批量插入"""
+    new_articles = RSSCollector(db)._store_entries(source, entries)
+    db.commit()
+    return new_articles
+
+
+def run(name, store, entries, existing):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    init_db(engine)
+    db = sessionmaker(bind=engine)()
+    source = models.RSSSource(name="Bench", url="https://example.com/feed")
+    db.add(source)
+    db.commit()
+    if existing:
+        batched_store(db, source, synthetic_entries(existing, "old"))
+
+    start = time.perf_counter()
+    inserted = store(db, source, entries)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    duplicates = store(db, source, entries)
+    second = time.perf_counter() - start
+
+    print(f"{name:8s} 新条目: {inserted:6d} 条 {first:7.3f}s ({inserted / first:9.0f} 条/秒) | "
+          f"全部重复: {duplicates:d} 条新增 {second:7.3f}s ({len(entries) / second:9.0f} 条/秒)")
+    db.close()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入库查重基准测试")
+    parser.add_argument("--entries", type=int, default=10000, help="合成feed的条目数")
+    parser.add_argument("--existing", type=int, default=50000, help="预先写入的文章数")
+    args = parser.parse_args()
+
+    logging.getLogger("rss_collector").setLevel(logging.WARNING)
+    # 旧实现没有近似重复检测，关闭后两者的工作量相同
+    settings.NEAR_DUP_ENABLED = False
+    entries = synthetic_entries(args.entries, "new")
+    print(f"合成feed: {args.entries} 条, 已有文章: {args.existing} 篇")
+    run("逐条", legacy_store, entries, args.existing)
+    run("批量", batched_store, entries, args.existing)
+
+
+if __name__ == "__main__":
+    main()
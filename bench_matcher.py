@@ -0,0 +1,77 @@
+"""关键词匹配微基准：逐关键词正则 vs 单次扫描的 KeywordMatcher
+
+    python bench_matcher.py
+    python bench_matcher.py --keywords 20 100 500 --lengths 2000 20000 --repeat 5
+"""
+import argparse
+import random
+import re
+import time
+
+from content_analysis.analyzer import DEFAULT_KEYWORD_WEIGHTS
+from content_analysis.matcher import KeywordMatcher
+
+
+def legacy_count(keywords, text):
+    """原实现：每个关键词单独编译并扫描全文"""
+    counts = {}
+    for keyword in keywords:
+        matches = len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', text))
+        if matches:
+            counts[keyword] = matches
+    return counts
+
+
+def make_keywords(n, rng):
+    keywords = list(DEFAULT_KEYWORD_WEIGHTS)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while len(keywords) < n:
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(rng.randint(1, 2))]
+        keywords.append(" ".join(words))
+    return keywords[:n]
+
+
+def make_text(length, keywords, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(keywords) if rng.random() < 0.02 else "".join(rng.choice(letters) for _ in range(rng.randint(2, 10)))
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).lower()
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词匹配微基准")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[20, 100, 500, 2000])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'关键词数':>8} {'文本长度':>10} {'逐词正则(ms)':>14} {'单次扫描(ms)':>14} {'构建(ms)':>10} {'加速比':>8}")
+    for n in args.keywords:
+        keywords = make_keywords(n, rng)
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build = time.perf_counter() - start
+        for length in args.lengths:
+            text = make_text(length, keywords, rng)
+            assert matcher.count(text) == legacy_count(keywords, text)
+            legacy = best_of(lambda: legacy_count(keywords, text), args.repeat)
+            single = best_of(lambda: matcher.count(text), args.repeat)
+            print(f"{n:>8} {length:>10} {legacy * 1000:>14.2f} {single * 1000:>14.2f} {build * 1000:>10.1f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
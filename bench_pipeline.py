@@ -0,0 +1,142 @@
+"""离线采集流水线基准测试
+
+录制真实feed或生成合成存档，然后在临时数据库上回放整个采集流程，
+报告文章吞吐量、下载延迟分位数以及写库耗时：
+
+    python bench_pipeline.py synth --archive feeds.jsonl.gz
+    python bench_pipeline.py record --archive feeds.jsonl.gz
+    python bench_pipeline.py run --archive feeds.jsonl.gz --passes 3 --latency 0.2 --jitter 0.1 --error-rate 0.05 --size-factor 10
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from data_ingestion import models
+from data_ingestion.database import SessionLocal, init_db
+from data_ingestion.replay import FeedArchive, RecordingFetcher, ReplayFetcher, synthesize_archive
+from data_ingestion.rss_collector import RSSCollector
+
+
+class TimedCollector(RSSCollector):
+    """记录每个源的下载延迟、解析耗时和写库耗时"""
+
+    def __init__(self, db, fetcher):
+        super().__init__(db, fetcher)
+        self.fetch_latencies = []
+        self.parse_time = 0.0
+        self.store_time = 0.0
+
+    def _store_feed(self, source, result):
+        self.fetch_latencies.append(result.elapsed)
+        self.parse_time += result.parse_time
+        start = time.perf_counter()
+        try:
+            return super()._store_feed(source, result)
+        finally:
+            self.store_time += time.perf_counter() - start
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def cmd_synth(args):
+    synthesize_archive(args.archive, sources=args.sources, entries=args.entries, passes=args.passes)
+    print(f"已生成合成存档: {args.archive}")
+
+
+def cmd_record(args):
+    """从数据库中的激活源录制一次完整响应"""
+    db = SessionLocal()
+    try:
+        sources = db.query(models.RSSSource).filter(models.RSSSource.is_active == True).all()
+        fetcher = RecordingFetcher(FeedArchive(args.archive))
+        for source_id, result in fetcher.fetch_many((s.id, s.url, None) for s in sources):
+            print(f"录制 {result.url}: HTTP {result.status_code} {len(result.content)} 字节 {result.error or ''}")
+    finally:
+        db.close()
+
+
+def cmd_run(args):
+    records = FeedArchive(args.archive).load()
+    fetcher = ReplayFetcher(
+        records,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        size_factor=args.size_factor,
+        seed=args.seed,
+        max_workers=args.concurrency
+    )
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    init_db(engine)
+    db = sessionmaker(bind=engine)()
+    for i, url in enumerate(records):
+        db.add(models.RSSSource(name=f"replay-{i}", url=url))
+    db.commit()
+
+    collector = TimedCollector(db, fetcher)
+    total_articles = 0
+    start = time.perf_counter()
+    for p in range(args.passes):
+        results = collector.fetch_all_active_sources(concurrent=args.concurrency > 1)
+        new_articles = sum(r.get("new_articles", 0) for r in results)
+        errors = sum(1 for r in results if r.get("status") == "error")
+        total_articles += new_articles
+        print(f"第{p + 1}轮: {len(results)}个源, 新文章{new_articles}篇, 失败{errors}个")
+    elapsed = time.perf_counter() - start
+
+    latencies = collector.fetch_latencies
+    print(f"总计: {total_articles}篇文章, 耗时{elapsed:.2f}秒, {total_articles / elapsed:.0f} 篇/秒")
+    print(f"下载延迟: p50={percentile(latencies, 50) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.1f}ms p99={percentile(latencies, 99) * 1000:.1f}ms")
+    print(f"解析耗时: {collector.parse_time:.2f}秒, 写库耗时: {collector.store_time:.2f}秒 "
+          f"(平均每源 {collector.store_time / max(len(latencies), 1) * 1000:.1f}ms)")
+    db.close()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线采集流水线基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    synth = sub.add_parser("synth", help="生成合成存档")
+    synth.add_argument("--archive", required=True)
+    synth.add_argument("--sources", type=int, default=20)
+    synth.add_argument("--entries", type=int, default=50)
+    synth.add_argument("--passes", type=int, default=3)
+    synth.set_defaults(func=cmd_synth)
+
+    record = sub.add_parser("record", help="录制数据库中激活源的真实响应")
+    record.add_argument("--archive", required=True)
+    record.set_defaults(func=cmd_record)
+
+    run = sub.add_parser("run", help="回放存档并报告性能")
+    run.add_argument("--archive", required=True)
+    run.add_argument("--passes", type=int, default=3)
+    run.add_argument("--latency", type=float, default=0.0, help="每次请求的固定延迟（秒）")
+    run.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    run.add_argument("--error-rate", type=float, default=0.0, help="模拟错误的概率")
+    run.add_argument("--size-factor", type=int, default=1, help="条目复制倍数")
+    run.add_argument("--concurrency", type=int, default=8, help="下载并发数，1为顺序执行")
+    run.add_argument("--seed", type=int, default=0)
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""关键词权重修改后的相关性重算基准：计数矩阵重算 vs 完整重新分析
+
+    python bench_rescore.py
+    python bench_rescore.py --articles 1000000 --keywords-per-article 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from bench_sentiment import make_article
+from content_analysis.analyzer import ContentAnalyzer, DEFAULT_KEYWORD_WEIGHTS
+from content_analysis.keyword_index import KeywordIndex
+from data_ingestion.models import Article, ArticleKeyword, Base, Keyword
+
+
+def build_database(path: str, articles: int, per_article: int, rng: random.Random):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    keyword_ids = list(range(1, len(DEFAULT_KEYWORD_WEIGHTS) + 1))
+    with engine.begin() as conn:
+        conn.execute(Keyword.__table__.insert(), [
+            {"id": i, "word": word, "category": "bench", "weight": weight, "is_active": True}
+            for i, (word, weight) in zip(keyword_ids, DEFAULT_KEYWORD_WEIGHTS.items())
+        ])
+        now = datetime.now()
+        batch = 50000
+        for start in range(1, articles + 1, batch):
+            ids = range(start, min(start + batch, articles + 1))
+            conn.execute(Article.__table__.insert(), [
+                {"id": i, "guid": f"bench-{i}", "title": f"Article {i}", "url": f"https://example.com/{i}",
+                 "source": "bench", "published_at": now, "status": "processed", "relevance_score": 0.0, "keywords_indexed": True}
+                for i in ids
+            ])
+            conn.execute(ArticleKeyword.__table__.insert(), [
+                {"article_id": i, "keyword_id": keyword_id, "count": rng.randint(1, 4)}
+                for i in ids
+                for keyword_id in rng.sample(keyword_ids, rng.randint(0, per_article * 2))
+            ])
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相关性重算基准")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--keywords-per-article", type=int, default=3, help="每篇文章平均包含的关键词数")
+    parser.add_argument("--words", type=int, default=300, help="估算完整重新分析时每篇文章的词数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        engine = build_database(os.path.join(tmp, "bench.db"), args.articles, args.keywords_per_article, rng)
+        Session = sessionmaker(bind=engine)
+        print(f"构建 {args.articles} 篇文章的计数矩阵: {time.perf_counter() - start:.1f}秒")
+
+        index = KeywordIndex()
+        db = Session()
+        index.rescore(db)  # 首次写入全部得分
+        for round_ in range(3):
+            db.query(Keyword).filter(Keyword.id == round_ + 1).update({"weight": Keyword.weight + 0.5})
+            db.commit()
+            start = time.perf_counter()
+            result = index.rescore(db)
+            elapsed = time.perf_counter() - start
+            print(f"修改权重后重算: {elapsed * 1000:>8.0f} ms (更新{result['updated']}篇)")
+        db.close()
+        engine.dispose()
+
+    # 完整重新分析（只算相关性）的速度，按样本外推
+    analyzer = ContentAnalyzer()
+    sample = [f"Article {i} {make_article(args.words, rng)}" for i in range(2000)]
+    start = time.perf_counter()
+    for text in sample:
+        analyzer.calculate_relevance(text)
+    per_article = (time.perf_counter() - start) / len(sample)
+    print(f"完整重新分析（估算，不含情感分析和读库）: {per_article * args.articles:>8.1f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from data_ingestion.database import SessionLocal
+from data_ingestion.models import AnalysisCacheEntry
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("analysis_cache")
+
+# 每次IN查询/批量写入的行数
+BATCH_SIZE = 500
+
+
+def content_hash(title: str, content: str) -> str:
+    """规范化（合并空白）后的标题+正文的sha1
+
+    情感分析只按空白分词，空白不同的同一文本（如转载稿）得分相同，可以共用缓存。
+    """
+    normalized = " ".join(f"{title} {content}".split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """两级情感分析结果缓存：进程内 LRU + SQLite 持久层
+
+    键为 (内容哈希, 分析器版本)，分析器版本由情感分析后端给出，
+    后端或其词典升级后旧条目自然失效。命中时完全跳过情感分析。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_entries: Optional[int] = None,
+        persistent: Optional[bool] = None
+    ):
+        self.session_factory = session_factory
+        self.max_entries = max_entries if max_entries is not None else settings.ANALYSIS_CACHE_SIZE
+        self.persistent = settings.ANALYSIS_CACHE_PERSIST if persistent is None else persistent
+        self._entries: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[str], version: str) -> Dict[str, float]:
+        """批量查找，返回命中的 {内容哈希: 情感得分}"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, float] = {}
+        with self._lock:
+            for key in keys:
+                value = self._entries.get((key, version))
+                if value is not None:
+                    self._entries.move_to_end((key, version))
+                    found[key] = value
+            self.memory_hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.persistent:
+            stored = self._load(missing, version)
+            found.update(stored)
+            with self._lock:
+                self.db_hits += len(stored)
+                for key, value in stored.items():
+                    self._remember((key, version), value)
+        with self._lock:
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, values: Dict[str, float], version: str) -> None:
+        """写入新计算的结果"""
+        if not values:
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._remember((key, version), value)
+        if self.persistent:
+            self._store(values, version)
+
+    def _remember(self, key: tuple, value: float) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, keys, version: str) -> Dict[str, float]:
+        found = {}
+        try:
+            db = self.session_factory()
+            try:
+                for i in range(0, len(keys), BATCH_SIZE):
+                    found.update(db.execute(
+                        select(AnalysisCacheEntry.content_hash, AnalysisCacheEntry.sentiment).where(
+                            AnalysisCacheEntry.version == version,
+                            AnalysisCacheEntry.content_hash.in_(keys[i:i + BATCH_SIZE])
+                        )
+                    ).all())
+            finally:
+                db.close()
+        except Exception as e:
+            # 持久层不可用时只使用内存层
+            logger.warning(f"读取分析缓存失败: {str(e)}")
+        return found
+
+    def _store(self, values: Dict[str, float], version: str) -> None:
+        rows = [{"content_hash": key, "version": version, "sentiment": value} for key, value in values.items()]
+        db = self.session_factory()
+        try:
+            # 并发分析同一内容时可能已被其他进程写入，忽略重复
+            table = AnalysisCacheEntry.__table__
+            dialect = db.get_bind().dialect.name
+            if dialect == "sqlite":
+                stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=["content_hash", "version"])
+            elif dialect == "postgresql":
+                stmt = postgresql_insert(table).on_conflict_do_nothing(index_elements=["content_hash", "version"])
+            else:
+                stmt = table.insert().prefix_with("IGNORE")
+            for i in range(0, len(rows), BATCH_SIZE):
+                db.execute(stmt, rows[i:i + BATCH_SIZE])
+            db.commit()
+        except IntegrityError as e:
+            # 其他方言下仍可能与并发写入冲突，这些结果下次分析时重新写入
+            db.rollback()
+            logger.warning(f"写入分析缓存时与并发写入冲突: {str(e)}")
+        except Exception as e:
+            # 持久层不可用（如数据库被锁）时只保留内存层，不影响分析结果
+            db.rollback()
+            logger.warning(f"写入分析缓存失败: {str(e)}")
+        finally:
+            db.close()
+
+    def clear(self) -> None:
+        """清空内存层和统计（不删除持久层）"""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.db_hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        """命中统计"""
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0
+            }
+
+
+# 进程内共享的分析缓存
+analysis_cache = AnalysisCache()
@@ -1,7 +1,10 @@
-import re
-from typing import List, Tuple, Dict
-from textblob import TextBlob
+from typing import List, Tuple, Dict, Optional
 import logging
+import threading
+from core.config import settings
+from .analysis_cache import content_hash
+from .matcher import KeywordMatcher
+from .sentiment import get_sentiment_backend
 
 # 设置日志
 logging.basicConfig(
@@ -34,16 +37,72 @@ DEFAULT_KEYWORD_WEIGHTS = {
     "housing": 1.5
 }
 
+class StageCounters:
+    """分析各阶段处理的文章数（进程内累计）
+
+    relevance: 经过相关性阶段的文章；gated: 低于阈值、跳过情感分析的文章；
+    sentiment_cached: 情感得分来自缓存的文章；sentiment: 实际做了情感分析的文章。
+    """
+    
+    FIELDS = ("relevance", "gated", "sentiment_cached", "sentiment")
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+    
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self._counts[name] += value
+    
+    def drain(self) -> Dict[str, int]:
+        """取出计数并清零（工作进程把计数交回主进程）"""
+        with self._lock:
+            counts = self._counts
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+            return counts
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        avoided = counts["gated"] + counts["sentiment_cached"]
+        counts["sentiment_avoided_rate"] = avoided / counts["relevance"] if counts["relevance"] else 0.0
+        return counts
+
+
+# 进程内共享的阶段计数
+stage_counters = StageCounters()
+
 class ContentAnalyzer:
-    """内容分析器"""
+    """内容分析器
+    
+    分两个阶段：先用关键词计算相关性，低于 relevance_threshold 的文章标记为不相关，
+    不再做情感分析（结果中 sentiment 为 None，irrelevant 为 True）；
+    通过的文章结果格式不变。
+    """
     
-    def __init__(self, keyword_weights: Dict[str, float] = None):
+    def __init__(
+        self,
+        keyword_weights: Dict[str, float] = None,
+        sentiment_backend: Optional[str] = None,
+        cache=None,
+        relevance_threshold: Optional[float] = None
+    ):
         """初始化分析器
         
         Args:
             keyword_weights: 关键词权重字典，如果为None则使用默认值
+            sentiment_backend: 情感分析后端名称（textblob / lexicon），为None时使用配置
+            cache: 情感分析结果缓存（AnalysisCache），为None时不使用缓存
+            relevance_threshold: 相关性阈值，为None时使用 ARTICLE_RELEVANCE_THRESHOLD，为0时不过滤
         """
         self.keyword_weights = keyword_weights or DEFAULT_KEYWORD_WEIGHTS
+        self.relevance_threshold = settings.ARTICLE_RELEVANCE_THRESHOLD if relevance_threshold is None else relevance_threshold
+        self.sentiment = get_sentiment_backend(sentiment_backend)
+        self.sentiment_version = f"{self.sentiment.name}:{self.sentiment.version}"
+        self.cache = cache
+        # 关键词集合不变时复用同一个匹配器
+        self.matcher = KeywordMatcher(self.keyword_weights)
     
     def calculate_relevance(self, text: str) -> Tuple[float, List[str]]:
         """计算文章相关性得分"""
@@ -51,10 +110,10 @@ class ContentAnalyzer:
         matched_keywords = []
         total_score = 0.0
         
+        # 一次扫描统计所有关键词的出现次数
+        counts = self.matcher.count(text_lower)
         for keyword, weight in self.keyword_weights.items():
-            # 使用正则表达式匹配关键词
-            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-            matches = len(re.findall(pattern, text_lower))
+            matches = counts.get(keyword, 0)
             
             if matches > 0:
                 matched_keywords.append(keyword)
@@ -70,30 +129,99 @@ class ContentAnalyzer:
     
     def analyze_sentiment(self, text: str) -> float:
         """分析情感倾向"""
-        blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity  # -1 to 1
-        
-        sentiment_desc = "中性"
-        if sentiment > 0.25:
-            sentiment_desc = "积极"
-        elif sentiment < -0.25:
-            sentiment_desc = "消极"
-            
-        logger.info(f"情感分析: {sentiment:.2f} ({sentiment_desc})")
+        sentiment = self.sentiment.polarity(text)  # -1 to 1
+        logger.info(f"情感分析: {sentiment:.2f} ({self._sentiment_desc(sentiment)})")
         return sentiment
     
+    @staticmethod
+    def _sentiment_desc(sentiment: float) -> str:
+        if sentiment > 0.25:
+            return "积极"
+        if sentiment < -0.25:
+            return "消极"
+        return "中性"
+    
+    def sentiments(self, articles: List[Tuple[str, str]]) -> List[float]:
+        """批量情感分析，有缓存时只分析未命中的文章
+        
+        Args:
+            articles: (title, content) 列表
+        """
+        texts = [f"{title} {content}" for title, content in articles]
+        if self.cache is None:
+            stage_counters.add(sentiment=len(texts))
+            return self.sentiment.polarity_batch(texts)
+        
+        keys = [content_hash(title, content) for title, content in articles]
+        cached = self.cache.get_many(keys, self.sentiment_version)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            computed = dict(zip(missing, self.sentiment.polarity_batch(list(missing.values()))))
+            self.cache.put_many(computed, self.sentiment_version)
+            cached.update(computed)
+        stage_counters.add(sentiment=len(missing), sentiment_cached=len(keys) - len(missing))
+        return [cached[key] for key in keys]
+    
+    def is_relevant(self, relevance_score: float) -> bool:
+        """是否通过相关性阶段"""
+        return relevance_score >= self.relevance_threshold
+    
+    @staticmethod
+    def _irrelevant_result(relevance_score: float, matched_keywords: List[str]) -> Dict:
+        return {
+            "relevance_score": relevance_score,
+            "sentiment": None,
+            "matched_keywords": matched_keywords,
+            "irrelevant": True
+        }
+    
     def analyze_article(self, title: str, content: str) -> Dict:
         """分析文章内容"""
         full_text = f"{title} {content}"
         
         # 计算相关性
         relevance_score, matched_keywords = self.calculate_relevance(full_text)
+        if not self.is_relevant(relevance_score):
+            stage_counters.add(relevance=1, gated=1)
+            return self._irrelevant_result(relevance_score, matched_keywords)
+        stage_counters.add(relevance=1)
         
         # 情感分析
-        sentiment = self.analyze_sentiment(full_text)
+        if self.cache is None:
+            stage_counters.add(sentiment=1)
+            sentiment = self.analyze_sentiment(full_text)
+        else:
+            sentiment = self.sentiments([(title, content)])[0]
         
         return {
             "relevance_score": relevance_score,
             "sentiment": sentiment,
             "matched_keywords": matched_keywords
-        }
\ No newline at end of file
+        }
+    
+    def analyze_articles(self, articles: List[Tuple[str, str]]) -> List[Dict]:
+        """批量分析文章，通过相关性阶段的文章整批交给情感分析后端（向量化后端一次处理整批）
+        
+        Args:
+            articles: (title, content) 列表
+        """
+        relevance = [self.calculate_relevance(f"{title} {content}") for title, content in articles]
+        passed = [i for i, (relevance_score, _) in enumerate(relevance) if self.is_relevant(relevance_score)]
+        stage_counters.add(relevance=len(articles), gated=len(articles) - len(passed))
+        sentiments = dict(zip(passed, self.sentiments([articles[i] for i in passed])))
+        
+        results = []
+        for i, (relevance_score, matched_keywords) in enumerate(relevance):
+            if i not in sentiments:
+                results.append(self._irrelevant_result(relevance_score, matched_keywords))
+                continue
+            results.append({
+                "relevance_score": relevance_score,
+                "sentiment": sentiments[i],
+                "matched_keywords": matched_keywords
+            })
+        logger.info(f"批量分析了{len(results)}篇文章，{len(passed)}篇通过相关性阈值（情感分析后端: {self.sentiment.name}）")
+        return results
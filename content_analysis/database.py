@@ -1,17 +1,14 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+from core.config import settings
+from core.database import get_engine
 
-# 数据库连接URL
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./au_news.db")
+# 数据库连接URL（与其他模块使用同一配置）
+DATABASE_URL = settings.DATABASE_URL
 
-# 创建数据库引擎
-engine = create_engine(DATABASE_URL)
+# 创建数据库引擎（与数据采集模块使用同一数据库时共用一个引擎）
+engine = get_engine(DATABASE_URL)
 
 # 创建会话类
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
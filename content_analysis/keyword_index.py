@@ -0,0 +1,177 @@
+import logging
+import threading
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from data_ingestion.models import Article, ArticleKeyword, Keyword
+from .keyword_snapshot import current_version
+from .matcher import KeywordMatcher
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("keyword_index")
+
+# 每次IN查询/批量写入的行数
+BATCH_SIZE = 500
+
+
+class KeywordIndex:
+    """文章-关键词出现次数的稀疏索引
+
+    文章分析时记录所有关键词（包括停用的）的出现次数。之后：
+    - 修改权重、启停关键词：只需用计数矩阵与权重向量相乘重算相关性（rescore）；
+    - 新增或改名关键词：只扫描正文中包含该词的文章（rescan_keywords）；
+    - 删除关键词：删除对应的计数行后重算。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._matcher: Optional[KeywordMatcher] = None
+        self._ids: Dict[str, int] = {}  # 关键词 -> keyword_id
+
+    def _matcher_for(self, db: Session) -> Tuple[KeywordMatcher, Dict[str, int]]:
+        """所有关键词的匹配器，关键词版本变化时重建"""
+        version = current_version(db)
+        with self._lock:
+            if self._matcher is None or self._version != version:
+                ids = {word: keyword_id for keyword_id, word in db.execute(select(Keyword.id, Keyword.word))}
+                self._matcher = KeywordMatcher(ids)
+                self._ids = ids
+                self._version = version
+            return self._matcher, self._ids
+
+    def index_articles(self, db: Session, articles: Sequence[Tuple[int, str, str]]) -> int:
+        """重新统计文章中的关键词出现次数（不提交事务）
+
+        Args:
+            articles: (article_id, title, content) 列表
+
+        Returns:
+            写入的计数行数
+        """
+        if not articles:
+            return 0
+        matcher, ids = self._matcher_for(db)
+        rows = []
+        for article_id, title, content in articles:
+            for word, count in matcher.count(f"{title} {content}".lower()).items():
+                rows.append({"article_id": article_id, "keyword_id": ids[word], "count": count})
+
+        article_ids = [article_id for article_id, _, _ in articles]
+        for i in range(0, len(article_ids), BATCH_SIZE):
+            chunk = article_ids[i:i + BATCH_SIZE]
+            db.execute(delete(ArticleKeyword).where(ArticleKeyword.article_id.in_(chunk)))
+            db.execute(update(Article).where(Article.id.in_(chunk)).values(keywords_indexed=True))
+        if rows:
+            db.execute(ArticleKeyword.__table__.insert(), rows)
+        return len(rows)
+
+    def remove_keywords(self, db: Session, keyword_ids: Iterable[int]) -> None:
+        """删除关键词的计数行（不提交事务）"""
+        keyword_ids = list(keyword_ids)
+        if keyword_ids:
+            db.execute(delete(ArticleKeyword).where(ArticleKeyword.keyword_id.in_(keyword_ids)))
+
+    def rescan_keywords(self, db: Session, keyword_ids: Iterable[int]) -> int:
+        """重新统计指定关键词（新增或改名后）的出现次数（不提交事务）
+
+        先用 LIKE 在数据库中筛选出包含该词的已索引文章，只对这些文章做精确匹配。
+        """
+        keyword_ids = list(keyword_ids)
+        self.remove_keywords(db, keyword_ids)
+        total = 0
+        for keyword_id, word in db.execute(select(Keyword.id, Keyword.word).where(Keyword.id.in_(keyword_ids))).all():
+            needle = word.lower()
+            matcher = KeywordMatcher([word])
+            text = func.coalesce(Article.plain_text, Article.content)
+            query = select(Article.id, Article.title, text).where(Article.keywords_indexed == True)
+            if needle.isascii():
+                # SQLite 的 lower() 只处理ASCII，非ASCII关键词扫描全部已索引文章
+                query = query.where(or_(
+                    func.lower(Article.title).contains(needle, autoescape=True),
+                    func.lower(text).contains(needle, autoescape=True)
+                ))
+            candidates = db.execute(query.execution_options(yield_per=1000))
+            rows = []
+            for article_id, title, content in candidates:
+                count = matcher.count(f"{title} {content or ''}".lower()).get(word)
+                if count:
+                    rows.append({"article_id": article_id, "keyword_id": keyword_id, "count": count})
+            if rows:
+                db.execute(ArticleKeyword.__table__.insert(), rows)
+            total += len(rows)
+            logger.info(f"重新统计关键词 '{word}': {len(rows)}篇文章包含该词")
+        return total
+
+    def rescore(self, db: Session) -> Optional[Dict]:
+        """用计数矩阵和当前权重重算所有已索引文章的相关性，只写回有变化的文章（提交事务）
+
+        与 ContentAnalyzer.calculate_relevance 的公式一致：
+        min(Σ 权重 × 次数 / (激活关键词权重之和 × 3), 1)。
+        没有激活的关键词时（分析器会使用默认关键词）返回 None，由调用方完整重新评估。
+        """
+        weights = dict(db.execute(select(Keyword.id, Keyword.weight).where(Keyword.is_active == True)).all())
+        if not weights:
+            return None
+        max_possible_score = sum(weights.values()) * 3
+
+        # 大批量读写直接用底层连接，跳过ORM的行对象和逐行参数编译
+        conn = db.connection()
+        articles = conn.execute(
+            select(Article.__table__.c.id, Article.__table__.c.relevance_score)
+            .where(Article.__table__.c.keywords_indexed == True)
+            .order_by(Article.__table__.c.id)
+        ).all()
+        if not articles:
+            return {"status": "success", "rescored": 0, "updated": 0}
+        article_ids = np.fromiter((row[0] for row in articles), dtype=np.int64, count=len(articles))
+        current = np.fromiter(
+            (np.nan if row[1] is None else row[1] for row in articles), dtype=np.float64, count=len(articles)
+        )
+
+        # 计数行展开为扁平数组，避免 numpy 逐个探测 Row 对象
+        matrix = np.fromiter(
+            chain.from_iterable(conn.execute(select(
+                ArticleKeyword.__table__.c.article_id,
+                ArticleKeyword.__table__.c.keyword_id,
+                ArticleKeyword.__table__.c.count
+            ))),
+            dtype=np.int64
+        ).reshape(-1, 3)
+        totals = np.zeros(len(article_ids))
+        if len(matrix):
+            weight_vector = np.zeros(max(int(matrix[:, 1].max()), max(weights)) + 1)
+            weight_vector[list(weights)] = list(weights.values())
+            positions = np.searchsorted(article_ids, matrix[:, 0])
+            valid = (positions < len(article_ids)) & (article_ids[np.minimum(positions, len(article_ids) - 1)] == matrix[:, 0])
+            contributions = matrix[valid, 2] * weight_vector[matrix[valid, 1]]
+            totals = np.bincount(positions[valid], weights=contributions, minlength=len(article_ids))
+        scores = np.minimum(totals / max_possible_score, 1.0)
+
+        changed = np.isnan(current) | (np.abs(scores - current) > 1e-9)
+        table = Article.__table__
+        stmt = update(table).where(table.c.id == bindparam("b_id")).values(
+            relevance_score=bindparam("b_score"), updated_at=datetime.now()
+        )
+        updates = [
+            {"b_id": article_id, "b_score": score}
+            for article_id, score in zip(article_ids[changed].tolist(), scores[changed].tolist())
+        ]
+        for i in range(0, len(updates), BATCH_SIZE * 10):
+            conn.execute(stmt, updates[i:i + BATCH_SIZE * 10])
+        db.commit()
+        logger.info(f"重算了{len(article_ids)}篇文章的相关性，{len(updates)}篇有变化")
+        return {"status": "success", "rescored": len(article_ids), "updated": len(updates)}
+
+
+# 进程内共享的关键词索引
+keyword_index = KeywordIndex()
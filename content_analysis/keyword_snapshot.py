@@ -0,0 +1,110 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from data_ingestion.database import SessionLocal
+from data_ingestion.models import Keyword, KeywordSetVersion
+from .analysis_cache import analysis_cache
+from .analyzer import ContentAnalyzer
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("keyword_snapshot")
+
+# 数据库中没有激活关键词时使用的默认关键词
+FALLBACK_KEYWORD_WEIGHTS = {
+    "chinese students": 3.0,
+    "international students": 2.5,
+    "adelaide": 2.0,
+    "安全": 2.0,
+    "留学生": 3.0
+}
+
+
+def current_version(db: Session) -> int:
+    """读取关键词集合的版本号（从未修改过时为0）"""
+    version = db.execute(select(KeywordSetVersion.version).where(KeywordSetVersion.id == 1)).scalar()
+    return version or 0
+
+
+def bump_version(db: Session) -> None:
+    """递增关键词集合版本号（不提交事务，应与关键词修改在同一事务中提交）"""
+    updated = db.execute(
+        update(KeywordSetVersion).where(KeywordSetVersion.id == 1).values(version=KeywordSetVersion.version + 1)
+    ).rowcount
+    if not updated:
+        db.add(KeywordSetVersion(id=1, version=1))
+
+
+def load_keyword_weights(db: Session, default_weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """从数据库读取激活关键词的权重"""
+    keyword_weights = {
+        word: weight
+        for word, weight in db.execute(select(Keyword.word, Keyword.weight).where(Keyword.is_active == True))
+    }
+    return keyword_weights or dict(default_weights or FALLBACK_KEYWORD_WEIGHTS)
+
+
+class AnalyzerSnapshot:
+    """进程内共享的分析器快照
+
+    每次获取时只查询一次版本号，版本变化时才重新加载关键词并编译匹配器，
+    其他进程修改关键词后，下一次获取即可看到新的权重。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        default_weights: Optional[Dict[str, float]] = None,
+        cache=None
+    ):
+        self.session_factory = session_factory
+        self.default_weights = default_weights or FALLBACK_KEYWORD_WEIGHTS
+        # 情感分析结果缓存，关键词变化重建分析器时继续沿用
+        self.cache = cache
+        self.version: Optional[int] = None
+        self.analyzer: Optional[ContentAnalyzer] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Optional[Session] = None) -> ContentAnalyzer:
+        """返回与当前关键词版本一致的分析器"""
+        if db is None:
+            db = self.session_factory()
+            try:
+                return self._get(db)
+            finally:
+                db.close()
+        return self._get(db)
+
+    def _get(self, db: Session) -> ContentAnalyzer:
+        try:
+            version = current_version(db)
+        except Exception as e:
+            # 版本表不可用（例如独立部署的分析服务尚未建表），继续使用已有快照
+            logger.warning(f"读取关键词版本失败: {str(e)}")
+            db.rollback()
+            with self._lock:
+                if self.analyzer is None:
+                    self.analyzer = ContentAnalyzer(keyword_weights=dict(self.default_weights), cache=self.cache)
+                return self.analyzer
+
+        with self._lock:
+            if self.analyzer is not None and self.version == version:
+                return self.analyzer
+            # 先读版本再读关键词，加载到的关键词不会比版本号旧
+            keyword_weights = load_keyword_weights(db, self.default_weights)
+            self.analyzer = ContentAnalyzer(keyword_weights=keyword_weights, cache=self.cache)
+            self.version = version
+            logger.info(f"加载关键词快照 v{version}，共{len(keyword_weights)}个关键词")
+            return self.analyzer
+
+
+# 进程内共享的分析器快照
+analyzer_snapshot = AnalyzerSnapshot(cache=analysis_cache if settings.ANALYSIS_CACHE_ENABLED else None)
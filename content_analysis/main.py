@@ -1,10 +1,25 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from .analyzer import ContentAnalyzer
+from core.compression import GzipRequestMiddleware
+from core.config import settings
+from core.database import pool_stats
+from .analysis_cache import analysis_cache
+from .analyzer import DEFAULT_KEYWORD_WEIGHTS, stage_counters
+from .database import SessionLocal
+from .keyword_snapshot import AnalyzerSnapshot
 
 app = FastAPI(title="内容分析服务")
-analyzer = ContentAnalyzer()
+# 服务间的批量请求和响应体较大时gzip压缩
+app.add_middleware(GZipMiddleware, minimum_size=settings.SERVICE_GZIP_MIN_BYTES)
+app.add_middleware(GzipRequestMiddleware)
+# 使用数据库中的关键词，关键词版本变化时自动重建
+analyzer_snapshot = AnalyzerSnapshot(
+    SessionLocal,
+    default_weights=DEFAULT_KEYWORD_WEIGHTS,
+    cache=analysis_cache if settings.ANALYSIS_CACHE_ENABLED else None
+)
 
 class ArticleAnalysisRequest(BaseModel):
     article_id: Optional[int] = None
@@ -13,8 +28,9 @@ class ArticleAnalysisRequest(BaseModel):
 
 class AnalysisResult(BaseModel):
     relevance_score: float
-    sentiment: float
+    sentiment: Optional[float] = None  # 未通过相关性阈值时为空
     matched_keywords: List[str]
+    irrelevant: bool = False
 
 @app.get("/")
 def read_root():
@@ -24,6 +40,7 @@ def read_root():
 def analyze_article(request: ArticleAnalysisRequest):
     """分析单篇文章"""
     try:
+        analyzer = analyzer_snapshot.get()
         result = analyzer.analyze_article(request.title, request.content)
         return result
     except Exception as e:
@@ -33,10 +50,23 @@ def analyze_article(request: ArticleAnalysisRequest):
 def batch_analyze(articles: List[ArticleAnalysisRequest]):
     """批量分析文章"""
     try:
-        results = []
-        for article in articles:
-            result = analyzer.analyze_article(article.title, article.content)
-            results.append(result)
+        analyzer = analyzer_snapshot.get()
+        results = analyzer.analyze_articles([(article.title, article.content) for article in articles])
         return results
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/stage-stats")
+def stage_stats():
+    """各分析阶段处理的文章数"""
+    return stage_counters.stats()
+
+@app.get("/cache-stats")
+def cache_stats():
+    """分析缓存命中统计"""
+    return analysis_cache.stats()
+
+@app.get("/pool-stats")
+def database_pool_stats():
+    """数据库连接池状态"""
+    return pool_stats()
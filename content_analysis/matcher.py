@@ -0,0 +1,93 @@
+import re
+from typing import Dict, Iterable, List
+
+# 关键词字典树中标记词尾的键
+_END = ""
+
+
+def _is_word(ch: str) -> bool:
+    """与正则 \\w 的定义一致（Unicode字母数字或下划线）"""
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(node: Dict) -> str:
+    """把字典树转换为公共前缀合并后的正则（不含捕获组）"""
+    branches = []
+    for ch in sorted(k for k in node if k != _END):
+        branches.append(re.escape(ch) + _trie_pattern(node[ch]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        body = "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    """单次扫描统计多个关键词出现次数的匹配器
+
+    结果与对每个关键词分别执行 re.findall(r'\\b' + re.escape(keyword) + r'\\b', text) 完全一致：
+    按 \\b 判断词边界，同一关键词的匹配互不重叠，不同关键词之间可以重叠
+    （例如 "chinese students" 同时计入 "chinese"）。
+
+    构建时把所有关键词合并为一个前缀树形式的正则，用零宽前瞻在一次扫描中找出
+    所有可能的起点，只在这些位置上沿字典树确认具体命中了哪些关键词，
+    耗时主要取决于文本长度和实际命中数，而不是关键词数量。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        self._trie: Dict = {}
+        self._aliases: Dict[str, List[str]] = {}  # 小写关键词 -> 原关键词
+        self._fallback: List[str] = []  # 空关键词仍用原来的正则处理
+        for keyword in self.keywords:
+            lowered = keyword.lower()
+            if not lowered:
+                self._fallback.append(keyword)
+                continue
+            self._aliases.setdefault(lowered, []).append(keyword)
+            node = self._trie
+            for ch in lowered:
+                node = node.setdefault(ch, {})
+            node[_END] = lowered
+
+        pattern = _trie_pattern(self._trie)
+        # 关键词首字符决定了起点的 \b 条件，整体加一个 \b 即可过滤起点
+        self._candidates = re.compile(r"\b(?=" + pattern + ")") if pattern else None
+
+    def count(self, text: str) -> Dict[str, int]:
+        """统计各关键词在文本（应已转为小写）中的出现次数，只返回出现过的关键词"""
+        counts: Dict[str, int] = {}
+        if self._candidates is not None:
+            length = len(text)
+            last_end: Dict[str, int] = {}
+            for match in self._candidates.finditer(text):
+                start = match.start()
+                node = self._trie
+                pos = start
+                while pos < length:
+                    node = node.get(text[pos])
+                    if node is None:
+                        break
+                    pos += 1
+                    keyword = node.get(_END)
+                    if keyword is None:
+                        continue
+                    # 词尾的 \b：前后字符一个是单词字符、一个不是
+                    if _is_word(text[pos - 1]) == (pos < length and _is_word(text[pos])):
+                        continue
+                    # 与 findall 一致，同一关键词从上次匹配结束处继续查找
+                    if start < last_end.get(keyword, 0):
+                        continue
+                    last_end[keyword] = pos
+                    counts[keyword] = counts.get(keyword, 0) + 1
+
+        result = {}
+        for lowered, matches in counts.items():
+            for keyword in self._aliases[lowered]:
+                result[keyword] = matches
+        for keyword in self._fallback:
+            matches = len(re.findall(r"\b\b", text))
+            if matches:
+                result[keyword] = matches
+        return result
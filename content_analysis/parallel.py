@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from .analysis_cache import content_hash
+from .analyzer import ContentAnalyzer, stage_counters
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("parallel_analyzer")
+
+# 工作进程中的分析器，由 _init_worker 在进程启动时创建一次
+_worker_analyzer: Optional[ContentAnalyzer] = None
+
+
+def _init_worker(keyword_weights, sentiment_backend: str, relevance_threshold: float) -> None:
+    global _worker_analyzer
+    _worker_analyzer = ContentAnalyzer(
+        keyword_weights=keyword_weights,
+        sentiment_backend=sentiment_backend,
+        relevance_threshold=relevance_threshold
+    )
+
+
+def _analyze_chunk(chunk: List[Tuple[int, str, str]]) -> Tuple[List[Tuple[int, float, Optional[float]]], Dict[str, int]]:
+    """在工作进程中分析一批文章，只返回 (article_id, relevance_score, sentiment) 和这批的阶段计数"""
+    results = _worker_analyzer.analyze_articles([(title, content) for _, title, content in chunk])
+    scores = [
+        (article_id, result["relevance_score"], result["sentiment"])
+        for (article_id, _, _), result in zip(chunk, results)
+    ]
+    return scores, stage_counters.drain()
+
+
+class ParallelAnalyzer:
+    """多进程文章分析
+
+    进程池按关键词快照创建：工作进程启动时编译一次分析器，之后只传输文章文本和得分。
+    关键词快照变化时（分析器对象不同）重建进程池。
+    使用 spawn 启动方式，避免在有后台线程的Web进程中 fork。
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.workers = workers or settings.ANALYSIS_WORKERS
+        self.chunk_size = chunk_size or settings.ANALYSIS_CHUNK_SIZE
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._analyzer: Optional[ContentAnalyzer] = None
+        self._lock = threading.Lock()
+
+    def _pool_for(self, analyzer: ContentAnalyzer) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._analyzer is not analyzer:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(dict(analyzer.keyword_weights), analyzer.sentiment.name, analyzer.relevance_threshold)
+                )
+                self._analyzer = analyzer
+                logger.info(f"创建分析进程池: {self.workers}个进程，每批{self.chunk_size}篇")
+            return self._executor
+
+    def analyze(self, analyzer: ContentAnalyzer, articles: Sequence[Tuple[int, str, str]]) -> Iterator[Tuple[int, float, float]]:
+        """按批分发到进程池，逐篇返回 (article_id, relevance_score, sentiment)
+
+        未通过相关性阈值的文章 sentiment 为 None。
+        分析器带缓存时先在当前进程查缓存：命中的文章只计算相关性并最先返回，
+        其余文章按原顺序分批交给进程池（每批最多 chunk_size 篇，且不少于进程数批），结果写回缓存。
+        """
+        cache = analyzer.cache
+        keys = {}
+        if cache is not None:
+            keys = {article_id: content_hash(title, content) for article_id, title, content in articles}
+            cached = cache.get_many(keys.values(), analyzer.sentiment_version)
+            pending = []
+            for article_id, title, content in articles:
+                sentiment = cached.get(keys[article_id])
+                if sentiment is None:
+                    pending.append((article_id, title, content))
+                    continue
+                relevance_score, _ = analyzer.calculate_relevance(f"{title} {content}")
+                if analyzer.is_relevant(relevance_score):
+                    stage_counters.add(relevance=1, sentiment_cached=1)
+                    yield article_id, relevance_score, sentiment
+                else:
+                    stage_counters.add(relevance=1, gated=1)
+                    yield article_id, relevance_score, None
+            articles = pending
+
+        pool = self._pool_for(analyzer)
+        # 文章较少时也分成至少与进程数相同的批次，每个进程都有工作
+        chunk_size = max(1, min(self.chunk_size, -(-len(articles) // self.workers)))
+        chunks = [list(articles[i:i + chunk_size]) for i in range(0, len(articles), chunk_size)]
+        try:
+            for scores, counts in pool.map(_analyze_chunk, chunks):
+                stage_counters.add(**counts)
+                if cache is not None:
+                    cache.put_many(
+                        {keys[article_id]: sentiment for article_id, _, sentiment in scores if sentiment is not None},
+                        analyzer.sentiment_version
+                    )
+                yield from scores
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._analyzer = None
+
+
+# 进程内共享的进程池
+parallel_analyzer = ParallelAnalyzer()
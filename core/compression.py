@@ -0,0 +1,64 @@
+import zlib
+
+from .config import settings
+
+
+class GzipRequestMiddleware:
+    """解压 Content-Encoding: gzip 的请求体（服务间的批量请求）
+
+    解压后的大小超过 SERVICE_MAX_BODY_BYTES 时返回 413，数据损坏时返回 400。
+    响应压缩使用 Starlette 的 GZipMiddleware。
+    """
+
+    def __init__(self, app, max_size: int = None):
+        self.app = app
+        self.max_size = max_size or settings.SERVICE_MAX_BODY_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (b"content-encoding", b"gzip") not in [
+            (key.lower(), value.lower()) for key, value in scope["headers"]
+        ]:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(b"".join(chunks), self.max_size)
+        except zlib.error:
+            await self._reject(send, 400, b"invalid gzip body")
+            return
+        if decompressor.unconsumed_tail:
+            await self._reject(send, 413, b"request body too large")
+            return
+
+        headers = [
+            (key, value) for key, value in scope["headers"]
+            if key.lower() not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode()))
+        sent = False
+
+        async def receive_body():
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(dict(scope, headers=headers), receive_body, send)
+
+    @staticmethod
+    async def _reject(send, status: int, message: bytes) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain"), (b"content-length", str(len(message)).encode())]
+        })
+        await send({"type": "http.response.body", "body": message})
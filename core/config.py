@@ -1,6 +1,11 @@
 import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+# 加载 .env 中的环境变量（已设置的环境变量优先）
+load_dotenv()
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 class Settings:
@@ -9,6 +14,13 @@ class Settings:
     
     # 数据库配置
     DATABASE_URL: str = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/au_news.db")
+    # SQLite 连接调优（WAL 模式，每个连接建立时设置）
+    DB_BUSY_TIMEOUT: int = int(os.getenv("DB_BUSY_TIMEOUT", "30000"))  # 写锁被占用时的等待时间（毫秒）
+    DB_CACHE_MB: int = int(os.getenv("DB_CACHE_MB", "32"))  # 每个连接的页缓存大小
+    DB_MMAP_MB: int = int(os.getenv("DB_MMAP_MB", "256"))  # 内存映射读取的大小
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "0"))  # 连接池大小，0 表示按后台线程数自动计算
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # 连接池满时可额外打开的连接数
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # 等待空闲连接的超时（秒）
     
     # 应用配置
     DEBUG: bool = os.getenv("DEBUG", "True").lower() in ("true", "1", "t")
@@ -16,9 +28,82 @@ class Settings:
     
     # RSS采集配置
     RSS_COLLECTION_INTERVAL: int = int(os.getenv("RSS_COLLECTION_INTERVAL", "86400"))  # 默认为1天
-    
+    RSS_CONCURRENT_FETCH: bool = os.getenv("RSS_CONCURRENT_FETCH", "True").lower() in ("true", "1", "t")
+    RSS_FETCH_CONCURRENCY: int = int(os.getenv("RSS_FETCH_CONCURRENCY", "8"))  # 下载线程数
+    RSS_FETCH_TIMEOUT: float = float(os.getenv("RSS_FETCH_TIMEOUT", "20"))  # 单个源的下载超时（秒）
+    RSS_FETCH_MAX_PER_HOST: int = int(os.getenv("RSS_FETCH_MAX_PER_HOST", "2"))  # 同一主机的最大并发数
+    RSS_FETCH_HOST_INTERVAL: float = float(os.getenv("RSS_FETCH_HOST_INTERVAL", "1.0"))  # 同一主机的请求间隔（秒）
+    RSS_FETCH_USER_AGENT: str = os.getenv("RSS_FETCH_USER_AGENT", "AU-News-Collector/1.0")
+    RSS_FETCH_MAX_BYTES: int = int(os.getenv("RSS_FETCH_MAX_BYTES", str(20 * 1024 * 1024)))  # 单个feed的下载上限
+    RSS_STREAMING_PARSE: bool = os.getenv("RSS_STREAMING_PARSE", "True").lower() in ("true", "1", "t")
+    RSS_MAX_ENTRIES: int = int(os.getenv("RSS_MAX_ENTRIES", "200"))  # 每个源每次最多处理的条目数（可按源覆盖）
+    RSS_STORE_BATCH_SIZE: int = int(os.getenv("RSS_STORE_BATCH_SIZE", "200"))  # 每批查重/写入的条目数
+
+    # 历史存档导入配置（run_backfill.py）
+    BACKFILL_BATCH_SIZE: int = int(os.getenv("BACKFILL_BATCH_SIZE", "50000"))  # 每个事务查重/写入的记录数
+    BACKFILL_CACHE_MB: int = int(os.getenv("BACKFILL_CACHE_MB", "256"))  # 导入连接的SQLite页缓存大小
+
+    # 近似重复检测配置
+    NEAR_DUP_ENABLED: bool = os.getenv("NEAR_DUP_ENABLED", "True").lower() in ("true", "1", "t")
+    NEAR_DUP_THRESHOLD: float = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))  # 判定为重复的Jaccard相似度
+    NEAR_DUP_MIN_SHINGLES: int = int(os.getenv("NEAR_DUP_MIN_SHINGLES", "8"))  # 文本过短时不做检测
+    NEAR_DUP_INDEX_SIZE: int = int(os.getenv("NEAR_DUP_INDEX_SIZE", "200000"))  # 内存索引保留的最近签名数
+
+    # 定时任务调度配置
+    SCHEDULER_MAX_WORKERS: int = int(os.getenv("SCHEDULER_MAX_WORKERS", "4"))  # 同时执行的任务数上限
+    SCHEDULER_JITTER: float = float(os.getenv("SCHEDULER_JITTER", "0.1"))  # 下次运行时间随机推迟最多 间隔×该比例
+    SCHEDULER_HISTORY: int = int(os.getenv("SCHEDULER_HISTORY", "50"))  # 每个任务保留的运行记录数
+    PROCESS_PENDING_INTERVAL: int = int(os.getenv("PROCESS_PENDING_INTERVAL", "86400"))  # 未启用流水线时定期处理待分析文章的间隔（秒）
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "2"))  # 手动触发的后台任务同时执行的上限
+
+    # 按源自适应调度配置
+    INGEST_SCHEDULER_ENABLED: bool = os.getenv("INGEST_SCHEDULER_ENABLED", "True").lower() in ("true", "1", "t")
+    INGEST_TICK_INTERVAL: int = int(os.getenv("INGEST_TICK_INTERVAL", "30"))  # 检查到期源的间隔（秒）
+    INGEST_MIN_INTERVAL: int = int(os.getenv("INGEST_MIN_INTERVAL", "300"))  # 采集间隔下限（秒）
+    INGEST_MAX_INTERVAL: int = int(os.getenv("INGEST_MAX_INTERVAL", "86400"))  # 采集间隔上限（秒）
+    INGEST_MAX_BACKOFF: int = int(os.getenv("INGEST_MAX_BACKOFF", "86400"))  # 失败退避上限（秒）
+    INGEST_TARGET_NEW: float = float(os.getenv("INGEST_TARGET_NEW", "3"))  # 每次采集期望获得的新文章数
+    INGEST_SMOOTHING: float = float(os.getenv("INGEST_SMOOTHING", "0.5"))  # 间隔调整的平滑系数
+    INGEST_GROWTH_FACTOR: float = float(os.getenv("INGEST_GROWTH_FACTOR", "1.5"))  # 无新文章时间隔的放大倍数
+
+    # 采集遥测配置
+    TELEMETRY_ENABLED: bool = os.getenv("TELEMETRY_ENABLED", "True").lower() in ("true", "1", "t")
+    TELEMETRY_SUMMARY_WINDOW: int = int(os.getenv("TELEMETRY_SUMMARY_WINDOW", "50"))  # 汇总使用的最近采集次数
+    TELEMETRY_RAW_RETENTION: int = int(os.getenv("TELEMETRY_RAW_RETENTION", "48"))  # 原始记录保留小时数，之后按小时合并
+    TELEMETRY_HOURLY_RETENTION: int = int(os.getenv("TELEMETRY_HOURLY_RETENTION", "30"))  # 小时汇总保留天数，之后按天合并
+    TELEMETRY_DAILY_RETENTION: int = int(os.getenv("TELEMETRY_DAILY_RETENTION", "365"))  # 天汇总保留天数
+    TELEMETRY_COMPACT_INTERVAL: int = int(os.getenv("TELEMETRY_COMPACT_INTERVAL", "3600"))  # 降采样检查间隔（秒）
+
     # 文章处理配置
-    ARTICLE_RELEVANCE_THRESHOLD: float = float(os.getenv("ARTICLE_RELEVANCE_THRESHOLD", "0.1"))
+    # 低于该相关性的文章标记为不相关，不做情感分析（0表示不过滤）。
+    # 得分按 激活关键词权重之和×3 归一化，关键词多时单个关键词命中的得分很低，阈值不宜过高
+    ARTICLE_RELEVANCE_THRESHOLD: float = float(os.getenv("ARTICLE_RELEVANCE_THRESHOLD", "0.005"))
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", "0"))  # 分析进程数，0或1表示在当前进程中顺序分析
+    ANALYSIS_CHUNK_SIZE: int = int(os.getenv("ANALYSIS_CHUNK_SIZE", "100"))  # 每次发送给工作进程的最多文章数
+    ANALYSIS_PARALLEL_MIN: int = int(os.getenv("ANALYSIS_PARALLEL_MIN", "40"))  # 文章数达到该值才使用进程池（小批次的进程间传输不划算）
+    ANALYSIS_WRITE_BATCH: int = int(os.getenv("ANALYSIS_WRITE_BATCH", "500"))  # 分析结果每批写库的文章数
+    SENTIMENT_BACKEND: str = os.getenv("SENTIMENT_BACKEND", "textblob")  # textblob（参考实现）或 lexicon（向量化词典）
+    QUEUE_LEASE_SECONDS: int = int(os.getenv("QUEUE_LEASE_SECONDS", "300"))  # 领取待处理文章的租约时长（秒）
+    QUEUE_MAX_ATTEMPTS: int = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))  # 同一篇文章最多领取次数，超过后转为死信
+    # 采集到分析的流水线：新文章ID写入有界队列，分析线程按小批次领取
+    PIPELINE_ENABLED: bool = os.getenv("PIPELINE_ENABLED", "True").lower() in ("true", "1", "t")
+    PIPELINE_WORKERS: int = int(os.getenv("PIPELINE_WORKERS", "1"))  # 分析线程数
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "1000"))  # 队列满时丢弃通知，文章由定期扫描补上
+    PIPELINE_BATCH_SIZE: int = int(os.getenv("PIPELINE_BATCH_SIZE", "20"))  # 每个小批次最多的文章数
+    PIPELINE_BATCH_WAIT: float = float(os.getenv("PIPELINE_BATCH_WAIT", "0.5"))  # 凑满小批次最多等待的秒数
+    PIPELINE_SWEEP_INTERVAL: int = int(os.getenv("PIPELINE_SWEEP_INTERVAL", "60"))  # 没有通知时扫描待处理文章的间隔（秒）
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+    ANALYSIS_CACHE_SIZE: int = int(os.getenv("ANALYSIS_CACHE_SIZE", "50000"))  # 内存LRU层的最大条目数
+    ANALYSIS_CACHE_PERSIST: bool = os.getenv("ANALYSIS_CACHE_PERSIST", "True").lower() in ("true", "1", "t")  # 是否使用SQLite持久层
+    
+    # 服务间通信配置
+    SERVICE_CONNECT_TIMEOUT: float = float(os.getenv("SERVICE_CONNECT_TIMEOUT", "5"))  # 建立连接超时（秒）
+    SERVICE_READ_TIMEOUT: float = float(os.getenv("SERVICE_READ_TIMEOUT", "60"))  # 等待响应超时（秒），批量分析可能较慢
+    SERVICE_RETRIES: int = int(os.getenv("SERVICE_RETRIES", "3"))  # 重试次数：幂等请求在连接失败、超时或 502/503/504 时重试，POST 只在连接未建立时重试
+    SERVICE_RETRY_BACKOFF: float = float(os.getenv("SERVICE_RETRY_BACKOFF", "0.5"))  # 重试等待基数（秒），按次数翻倍并随机抖动
+    SERVICE_POOL_SIZE: int = int(os.getenv("SERVICE_POOL_SIZE", "10"))  # 每个服务保持的连接数
+    SERVICE_GZIP_MIN_BYTES: int = int(os.getenv("SERVICE_GZIP_MIN_BYTES", "16384"))  # 请求/响应体超过该大小时gzip压缩
+    SERVICE_MAX_BODY_BYTES: int = int(os.getenv("SERVICE_MAX_BODY_BYTES", str(64 * 1024 * 1024)))  # 解压后请求体的上限
     
     # 日志配置
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
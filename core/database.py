@@ -0,0 +1,159 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+from .config import settings
+from .logger import get_logger
+
+logger = get_logger("database")
+
+
+def default_pool_size() -> int:
+    """连接池大小：同时可能访问数据库的线程数（定时任务、手动任务、分析流水线）加上Web请求的余量"""
+    return settings.SCHEDULER_MAX_WORKERS + settings.JOB_MAX_WORKERS + settings.PIPELINE_WORKERS + 4
+
+
+def sqlite_pragmas(cache_mb: Optional[int] = None, mmap_mb: Optional[int] = None) -> List[str]:
+    """每个SQLite连接建立时执行的PRAGMA
+
+    WAL 让读取不再被写入阻塞（看板读取与后台写入并行），synchronous=NORMAL 在WAL下提交时不等待fsync
+    （断电最多丢失最近的事务，不会损坏数据库），busy_timeout 让写锁被占用时等待而不是立即报
+    "database is locked"。cache_size 为每个连接的页缓存。
+    """
+    cache_mb = settings.DB_CACHE_MB if cache_mb is None else cache_mb
+    mmap_mb = settings.DB_MMAP_MB if mmap_mb is None else mmap_mb
+    return [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"busy_timeout={settings.DB_BUSY_TIMEOUT}",
+        f"cache_size=-{cache_mb * 1024}",
+        f"mmap_size={mmap_mb * 1024 * 1024}"
+    ]
+
+
+class PoolMonitor:
+    """通过连接池事件统计连接的建立、取出和归还，供监控页面读取"""
+
+    def __init__(self, name: str, engine: Engine, max_overflow: Optional[int] = None):
+        self.name = name
+        self.engine = engine
+        self.max_overflow = max_overflow
+        self.connects = 0  # 新建的数据库连接数
+        self.checkouts = 0  # 累计取出次数
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._lock = threading.Lock()
+        event.listen(engine.pool, "connect", self._on_connect)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def stats(self) -> Dict:
+        pool = self.engine.pool
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "url": self.engine.url.render_as_string(hide_password=True),
+                "pool": type(pool).__name__,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "connects": self.connects
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=self.max_overflow,
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0)
+            )
+        return stats
+
+
+# 进程内创建的引擎（按名称），pool_stats 汇总它们的连接池状态
+_monitors: Dict[str, PoolMonitor] = {}
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.RLock()
+
+
+def create_tuned_engine(url: str, name: Optional[str] = None, cache_mb: Optional[int] = None,
+                        extra_pragmas: Iterable[str] = (), **kwargs) -> Engine:
+    """创建数据库引擎：SQLite 连接建立时执行调优PRAGMA，文件数据库和其他数据库按线程数设置连接池
+
+    Args:
+        name: 监控中显示的名称，默认为URL
+        cache_mb: 覆盖每个连接的页缓存大小
+        extra_pragmas: 额外的PRAGMA（如批量导入使用内存临时表）
+        kwargs: 传给 create_engine 的其他参数
+    """
+    parsed = make_url(url)
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory:
+        kwargs.setdefault("pool_size", settings.DB_POOL_SIZE or default_pool_size())
+        kwargs.setdefault("max_overflow", settings.DB_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.DB_POOL_TIMEOUT)
+        kwargs.setdefault("pool_pre_ping", parsed.get_backend_name() != "sqlite")
+    engine = create_engine(url, **kwargs)
+
+    if engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(cache_mb=cache_mb) + list(extra_pragmas)
+        if in_memory:
+            pragmas = [pragma for pragma in pragmas if not pragma.startswith("journal_mode")]
+
+        @event.listens_for(engine, "connect")
+        def _tune(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+            cursor.close()
+
+    name = name or engine.url.render_as_string(hide_password=True)
+    with _engines_lock:
+        _monitors[name] = PoolMonitor(name, engine, kwargs.get("max_overflow"))
+    return engine
+
+
+def normalize_url(url: str) -> str:
+    """规范化数据库URL，SQLite 文件数据库的相对路径转换为绝对路径
+
+    同一数据库的不同写法（如 sqlite:///./au_news.db 和绝对路径）得到同一个URL。
+    """
+    parsed = make_url(url)
+    database = parsed.database
+    if parsed.get_backend_name() == "sqlite" and database not in (None, "", ":memory:") and not database.startswith("file:"):
+        parsed = parsed.set(database=os.path.abspath(database))
+    return parsed.render_as_string(hide_password=False)
+
+
+def get_engine(url: str) -> Engine:
+    """按URL共享的引擎：同一进程中使用同一数据库的模块共用一个连接池"""
+    key = normalize_url(url)
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = create_tuned_engine(key)
+            logger.info(f"创建数据库引擎: {_engines[key].url.render_as_string(hide_password=True)}")
+        return _engines[key]
+
+
+def pool_stats() -> List[Dict]:
+    """各引擎的连接池状态"""
+    with _engines_lock:
+        monitors = list(_monitors.values())
+    return [monitor.stats() for monitor in monitors]
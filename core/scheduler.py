@@ -1,16 +1,43 @@
-import time
+import heapq
+import itertools
+import random
 import threading
-import asyncio
-from typing import Dict, Callable, Any, Optional, Union, List
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Callable, Any, Optional, List
 from datetime import datetime, timedelta
 
+from .config import settings
 from .logger import get_logger
 
 logger = get_logger("scheduler")
 
+class TaskRun:
+    """任务的一次运行记录"""
+
+    def __init__(self, task: str, started_at: datetime):
+        self.task = task
+        self.started_at = started_at
+        self.duration: Optional[float] = None  # 秒
+        self.status = "running"  # running, success, error
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task": self.task,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error
+        }
+
+
 class Task:
     """表示一个计划任务"""
-    
+
     def __init__(
         self,
         name: str,
@@ -18,7 +45,8 @@ class Task:
         interval: int,
         args: Optional[List] = None,
         kwargs: Optional[Dict[str, Any]] = None,
-        run_immediately: bool = False
+        run_immediately: bool = False,
+        history: Optional[int] = None
     ):
         self.name = name
         self.func = func
@@ -26,48 +54,83 @@ class Task:
         self.args = args or []
         self.kwargs = kwargs or {}
         self.run_immediately = run_immediately
-        self.last_run = None if run_immediately else datetime.now()
+        self.last_run: Optional[datetime] = None
+        self.next_run: Optional[datetime] = None
         self.is_running = False
-        self.thread = None
-    
-    def should_run(self) -> bool:
-        """检查任务是否应该运行"""
-        if self.last_run is None:
-            return True
-        
-        elapsed = (datetime.now() - self.last_run).total_seconds()
-        return elapsed >= self.interval
-    
-    async def execute_async(self) -> Any:
-        """异步执行任务"""
-        if asyncio.iscoroutinefunction(self.func):
-            return await self.func(*self.args, **self.kwargs)
-        else:
-            return self.func(*self.args, **self.kwargs)
-    
-    def execute(self) -> Any:
-        """同步执行任务"""
+        self.run_count = 0
+        self.error_count = 0
+        self.skipped_count = 0  # 到期时上一次运行尚未结束而跳过的次数
+        self.runs = deque(maxlen=history or settings.SCHEDULER_HISTORY)
+        self._generation = 0  # 重新排期后旧的堆条目失效
+
+    def execute(self) -> TaskRun:
+        """同步执行任务并记录本次运行（异常记录在运行记录中，不向外抛出）"""
+        run = TaskRun(self.name, datetime.now())
+        self.runs.append(run)
         self.is_running = True
+        start = time.perf_counter()
         try:
             result = self.func(*self.args, **self.kwargs)
-            self.last_run = datetime.now()
-            return result
+            run.status = "success"
+            run.result = None if result is None else str(result)[:500]
         except Exception as e:
+            run.status = "error"
+            run.error = str(e)
+            self.error_count += 1
             logger.error(f"任务 '{self.name}' 执行失败: {e}")
-            raise
         finally:
+            run.duration = time.perf_counter() - start
+            self.last_run = datetime.now()
+            self.run_count += 1
             self.is_running = False
+        return run
+
+    def to_dict(self) -> Dict[str, Any]:
+        last = self.runs[-1].to_dict() if self.runs else None
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "is_running": self.is_running,
+            "last_run": self.last_run,
+            "next_run": self.next_run,
+            "run_count": self.run_count,
+            "error_count": self.error_count,
+            "skipped_count": self.skipped_count,
+            "last": last
+        }
 
 
 class Scheduler:
-    """简单的任务调度器"""
-    
-    def __init__(self):
+    """任务调度器
+
+    按下次运行时间维护一个最小堆，调度线程在条件变量上等待到最早的任务到期
+    （添加或移除任务时被唤醒），到期任务交给有界线程池执行。同一任务上一次
+    运行尚未结束时本次跳过，不会重叠执行。每个任务保留最近的运行记录。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, jitter: Optional[float] = None):
         self.tasks: Dict[str, Task] = {}
         self.running = False
         self.thread = None
+        self.max_workers = max_workers or settings.SCHEDULER_MAX_WORKERS
+        self.jitter = settings.SCHEDULER_JITTER if jitter is None else jitter
+        self._heap: List = []  # (到期时间(monotonic), 序号, 任务名, 代数)
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
         logger.info("初始化调度器")
-    
+
+    def _schedule(self, task: Task, delay: float) -> None:
+        """安排任务在 delay 秒后运行（调用方持有锁）"""
+        task._generation += 1
+        task.next_run = datetime.now() + timedelta(seconds=delay)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), task.name, task._generation))
+        self._cond.notify()
+
+    def _next_delay(self, task: Task) -> float:
+        """下一次运行的间隔，加上随机抖动避免多个任务同时触发"""
+        return task.interval + random.uniform(0, task.interval * self.jitter)
+
     def add_task(
         self,
         name: str,
@@ -77,75 +140,114 @@ class Scheduler:
         kwargs: Optional[Dict[str, Any]] = None,
         run_immediately: bool = False
     ) -> Task:
-        """添加一个新任务"""
+        """添加一个新任务（同名任务会被替换）"""
         logger.info(f"添加任务: {name}, 间隔: {interval}秒")
         task = Task(name, func, interval, args, kwargs, run_immediately)
-        self.tasks[name] = task
+        with self._cond:
+            self.tasks[name] = task
+            self._schedule(task, 0 if run_immediately else self._next_delay(task))
         return task
-    
+
     def remove_task(self, name: str) -> bool:
-        """移除任务"""
-        if name in self.tasks:
-            logger.info(f"移除任务: {name}")
-            del self.tasks[name]
-            return True
+        """移除任务（正在执行的运行会继续完成）"""
+        with self._cond:
+            if name in self.tasks:
+                logger.info(f"移除任务: {name}")
+                del self.tasks[name]
+                self._cond.notify()
+                return True
         return False
-    
+
+    def run_now(self, name: str) -> bool:
+        """让任务立即运行一次，之后按间隔继续"""
+        with self._cond:
+            task = self.tasks.get(name)
+            if task is None:
+                return False
+            self._schedule(task, 0)
+            return True
+
     def get_task(self, name: str) -> Optional[Task]:
         """获取指定任务"""
         return self.tasks.get(name)
-    
+
     def list_tasks(self) -> Dict[str, Task]:
         """列出所有任务"""
         return self.tasks
-    
+
+    def history(self, name: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的运行记录（新的在前），name 为空时合并所有任务"""
+        with self._cond:
+            tasks = [self.tasks[name]] if name in self.tasks else ([] if name else list(self.tasks.values()))
+            runs = [run for task in tasks for run in list(task.runs)]
+        runs.sort(key=lambda run: run.started_at, reverse=True)
+        return [run.to_dict() for run in runs[:limit]]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """各任务的状态，按下次运行时间排序"""
+        with self._cond:
+            tasks = [task.to_dict() for task in self.tasks.values()]
+        return sorted(tasks, key=lambda task: task["next_run"] or datetime.max)
+
     def start(self) -> None:
         """启动调度器"""
         if self.running:
             logger.warning("调度器已在运行")
             return
-            
+
         self.running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
         self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
-        logger.info("调度器已启动")
-    
+        logger.info(f"调度器已启动，最多同时执行{self.max_workers}个任务")
+
     def stop(self) -> None:
-        """停止调度器"""
+        """停止调度器（不等待正在执行的任务）"""
         if not self.running:
             logger.warning("调度器未运行")
             return
-            
-        self.running = False
+
+        with self._cond:
+            self.running = False
+            self._cond.notify()
         if self.thread:
             self.thread.join(timeout=1)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         logger.info("调度器已停止")
-    
+
     def _run(self) -> None:
-        """运行调度器主循环"""
-        while self.running:
-            for name, task in self.tasks.items():
-                if task.is_running:
+        """运行调度器主循环：等待最早到期的任务，提交到线程池并安排下一次运行"""
+        with self._cond:
+            while self.running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, name, generation = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
                     continue
-                    
-                if task.should_run():
+                heapq.heappop(self._heap)
+                task = self.tasks.get(name)
+                if task is None or task._generation != generation:
+                    continue  # 任务已移除或已重新排期
+
+                if task.is_running:
+                    task.skipped_count += 1
+                    logger.warning(f"任务 '{name}' 上一次运行尚未结束，跳过本次")
+                else:
                     logger.info(f"执行任务: {name}")
-                    thread = threading.Thread(
-                        target=self._run_task,
-                        args=(task,),
-                        daemon=True
-                    )
-                    thread.start()
-            
-            time.sleep(1)  # 检查间隔
-    
+                    task.is_running = True
+                    self._executor.submit(self._run_task, task)
+                self._schedule(task, self._next_delay(task))
+
     def _run_task(self, task: Task) -> None:
-        """在单独的线程中运行任务"""
-        try:
-            task.execute()
-        except Exception as e:
-            logger.error(f"任务 '{task.name}' 线程执行失败: {e}")
+        """在线程池中运行任务"""
+        run = task.execute()
+        logger.info(f"任务 '{task.name}' 完成: {run.status}，耗时{run.duration:.2f}秒")
 
 
 # 创建全局调度器实例
-scheduler = Scheduler() 
\ No newline at end of file
+scheduler = Scheduler()
@@ -0,0 +1,339 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Column, MetaData, Table, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import create_tuned_engine
+from . import database, models
+from .checkpoint import advance_checkpoint, finish_checkpoint, resume_checkpoint
+from .normalize import plain_text
+from .rss_collector import insert_articles_ignore
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("backfill")
+
+# 本批记录的guid_hash，查重时与 articles 做一次连接查询（临时表只在当前连接可见）
+_batch_keys = Table(
+    "backfill_keys", MetaData(),
+    Column("guid_hash", BigInteger, primary_key=True),
+    prefixes=["TEMPORARY"]
+)
+
+# 存档记录中各列可用的字段名，依次尝试
+GUID_FIELDS = ("guid", "id", "link", "url")
+CONTENT_FIELDS = ("content", "description", "summary")
+URL_FIELDS = ("url", "link")
+PUBLISHED_FIELDS = ("published_at", "published", "pubDate", "date")
+
+# 导入时写入的列（record_to_row 产出的键），SQLite 插入时按此顺序取值，日期时间列在最后
+_ROW_COLUMNS = (
+    "guid", "guid_hash", "title", "content", "plain_text", "plain_text_length", "source", "url",
+    "language", "status", "keywords_indexed", "attempts"
+)
+_INSERT_COLUMNS = _ROW_COLUMNS + ("published_at", "created_at", "updated_at")
+_SQLITE_INSERT = (
+    f"INSERT INTO articles ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))}) "
+    "ON CONFLICT (guid) DO NOTHING"
+)
+_row_values = itemgetter(*_ROW_COLUMNS)
+
+
+def _first(record: Dict, fields: Tuple[str, ...]):
+    for field in fields:
+        value = record.get(field)
+        if value:
+            return value
+    return None
+
+
+def parse_published(value) -> Optional[datetime]:
+    """解析发布时间（ISO 8601、RFC 822 或Unix时间戳），带时区的转换为UTC，无法解析时返回None"""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).isdigit():
+            return datetime.fromtimestamp(int(value), timezone.utc).replace(tzinfo=None)
+        value = str(value).strip()
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def record_to_row(record: Dict, default_source: Optional[str] = None) -> Optional[Dict]:
+    """把存档中的一条记录转换为articles表的一行，缺少guid、标题、来源或发布时间时返回None"""
+    guid = _first(record, GUID_FIELDS)
+    title = record.get("title")
+    source = record.get("source") or default_source
+    published_at = parse_published(_first(record, PUBLISHED_FIELDS))
+    if not guid or not title or not source or published_at is None:
+        return None
+    guid = str(guid)
+    content = _first(record, CONTENT_FIELDS) or ""
+    text = plain_text(content)
+    return {
+        "guid": guid,
+        "guid_hash": models.guid_key(guid),
+        "title": title,
+        "content": content,
+        "plain_text": text,
+        "plain_text_length": len(text),
+        "source": source,
+        "url": _first(record, URL_FIELDS) or guid,
+        "published_at": published_at,
+        "language": record.get("language") or "en",
+        "status": "pending",
+        "keywords_indexed": False,
+        "attempts": 0
+    }
+
+
+def archive_format(path: str) -> str:
+    """按扩展名判断存档格式（jsonl 或 csv，可带 .gz）"""
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"无法识别的存档格式: {path}（请用 --format 指定 jsonl 或 csv）")
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_records(path: str, fmt: Optional[str] = None, skip: int = 0) -> Iterator[Optional[Dict]]:
+    """流式读取存档中的记录，跳过前 skip 条（断点续传）
+
+    JSONL 每个非空行是一条记录，无法解析的行产出 None（仍计入记录序号）；
+    CSV 第一行为表头。跳过的记录不做解析。
+    """
+    fmt = fmt or archive_format(path)
+    with _open_text(path) as f:
+        if fmt == "jsonl":
+            position = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                position += 1
+                if position <= skip:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield record if isinstance(record, dict) else None
+        elif fmt == "csv":
+            csv.field_size_limit(sys.maxsize)
+            for position, record in enumerate(csv.DictReader(f), 1):
+                if position > skip:
+                    yield record
+        else:
+            raise ValueError(f"不支持的存档格式: {fmt}")
+
+
+def checkpoint_key(path: str) -> Tuple[str, str]:
+    """存档的断点名称和上下文：同一路径的文件大小或修改时间变化时从头导入"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    name = "backfill:" + hashlib.sha1(path.encode()).hexdigest()[:16]
+    return name, f"{stat.st_size}:{int(stat.st_mtime)}:{path}"[:200]
+
+
+def create_backfill_engine(url: Optional[str] = None, cache_mb: Optional[int] = None) -> Engine:
+    """为批量导入调优的数据库引擎
+
+    在通用的连接调优（WAL、synchronous=NORMAL、busy_timeout 等，见 core.database）之外，
+    导入连接使用内存临时表和更大的页缓存。
+    """
+    return create_tuned_engine(
+        url or database.DATABASE_URL,
+        name="backfill",
+        cache_mb=cache_mb or settings.BACKFILL_CACHE_MB,
+        extra_pragmas=("temp_store=MEMORY",)
+    )
+
+
+class ArchiveBackfill:
+    """把历史存档（JSONL / CSV）批量导入 articles 表
+
+    每批（默认5万条）记录在一个事务中处理：批内按guid去重，把整批的guid_hash写入临时表
+    与 articles 连接查询一次找出已有文章，再用一条 executemany 插入新文章（guid唯一约束兜底）。
+    断点（已读取的记录序号）与这批文章在同一事务中提交，中断后重新运行从断点继续。
+    导入的文章状态为 pending，由分析流水线的定期扫描或 on_inserted 回调分析；
+    历史文章不做近似重复检测。
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        source: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        on_inserted: Optional[Callable[[List[int]], None]] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ):
+        """
+        Args:
+            source: 记录中没有 source 字段时使用的来源名称
+            on_inserted: 每批提交后调用，参数为新文章ID列表（如送去分析）
+            progress: 每批提交后调用，参数为当前统计
+        """
+        self.engine = engine
+        self.source = source
+        self.batch_size = batch_size or settings.BACKFILL_BATCH_SIZE
+        self.on_inserted = on_inserted
+        self.progress = progress
+
+    @staticmethod
+    def _existing_guids(db: Session, rows: List[Dict]) -> set:
+        """把本批的guid_hash写入临时表，用一次连接查询找出已存在的guid"""
+        conn = db.connection()
+        _batch_keys.create(conn, checkfirst=True)
+        conn.execute(_batch_keys.delete())
+        keys = [(row["guid_hash"],) for row in rows]
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("INSERT OR IGNORE INTO backfill_keys (guid_hash) VALUES (?)", keys)
+        else:
+            conn.execute(_batch_keys.insert(), [{"guid_hash": key} for key in {key for key, in keys}])
+        article = models.Article
+        return set(conn.execute(
+            select(article.guid).join(_batch_keys, article.guid_hash == _batch_keys.c.guid_hash)
+        ).scalars())
+
+    @staticmethod
+    def _insert(db: Session, rows: List[Dict]) -> int:
+        """插入新文章（不提交事务），返回插入的行数
+
+        SQLite 直接把参数元组交给驱动执行 executemany，省去逐行的参数处理（导入阶段的主要开销），
+        日期时间写成与 SQLAlchemy 相同的文本格式。
+        """
+        conn = db.connection()
+        if conn.dialect.name != "sqlite":
+            return insert_articles_ignore(db, rows)
+        now = datetime.now().isoformat(" ", "microseconds")
+        params = [
+            (*_row_values(row), row["published_at"].isoformat(" ", "microseconds"), now, now)
+            for row in rows
+        ]
+        return conn.exec_driver_sql(_SQLITE_INSERT, params).rowcount
+
+    def _write_batch(self, db: Session, rows: Dict[str, Dict], stats: Dict) -> List[int]:
+        """查重并插入一批文章（不提交事务），需要回调时返回新文章ID"""
+        if not rows:
+            return []
+        candidates = list(rows.values())
+        existing = self._existing_guids(db, candidates)
+        new_rows = [row for row in candidates if row["guid"] not in existing]
+        stats["duplicates"] += len(candidates) - len(new_rows)
+        if not new_rows:
+            return []
+
+        article = models.Article
+        last_id = db.execute(select(func.max(article.id))).scalar() or 0
+        inserted = self._insert(db, new_rows)
+        stats["inserted"] += inserted
+        stats["duplicates"] += len(new_rows) - inserted
+        if self.on_inserted is None or not inserted:
+            return []
+        return list(db.execute(
+            select(article.id)
+            .join(_batch_keys, article.guid_hash == _batch_keys.c.guid_hash)
+            .where(article.id > last_id)
+            .order_by(article.id)
+        ).scalars())
+
+    def run(self, path: str, fmt: Optional[str] = None, resume: bool = True) -> Dict:
+        """导入一个存档文件
+
+        Args:
+            fmt: jsonl 或 csv，为空时按扩展名判断
+            resume: 是否从上次中断的位置继续
+        """
+        name, context = checkpoint_key(path)
+        db = Session(bind=self.engine)
+        try:
+            checkpoint = resume_checkpoint(db, name, context, resume)
+            db.commit()
+            skipped = checkpoint.last_id
+            position = skipped
+            # write_time 为查重、插入和提交的耗时（不含读取和解析）
+            stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "skipped": skipped, "write_time": 0.0}
+            start = time.perf_counter()
+
+            def commit_batch(rows: Dict[str, Dict]) -> None:
+                write_start = time.perf_counter()
+                new_ids = self._write_batch(db, rows, stats)
+                advance_checkpoint(checkpoint, position, len(rows))
+                db.commit()
+                stats["write_time"] += time.perf_counter() - write_start
+                if new_ids:
+                    self.on_inserted(new_ids)
+                if self.progress:
+                    self.progress(self._summary(stats, time.perf_counter() - start))
+
+            rows: Dict[str, Dict] = {}
+            for record in iter_records(path, fmt, skip=skipped):
+                position += 1
+                stats["read"] += 1
+                row = record_to_row(record, self.source) if record is not None else None
+                if row is None:
+                    stats["invalid"] += 1
+                elif row["guid"] in rows:
+                    stats["duplicates"] += 1
+                else:
+                    rows[row["guid"]] = row
+                if stats["read"] % self.batch_size == 0:
+                    commit_batch(rows)
+                    rows = {}
+            commit_batch(rows)
+            finish_checkpoint(checkpoint)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"导入存档 {path} 失败（已提交的批次会从断点继续）: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"存档 {path} 导入完成: 读取{stats['read']}条，新增{stats['inserted']}篇，"
+            f"重复{stats['duplicates']}，无效{stats['invalid']}，耗时{elapsed:.1f}秒"
+        )
+        return dict(self._summary(stats, elapsed), status="success")
+
+    @staticmethod
+    def _summary(stats: Dict, elapsed: float) -> Dict:
+        """统计加上总速度（读取记录数/秒）和写入速度（新增文章数/写库秒数）"""
+        return dict(
+            stats,
+            elapsed=elapsed,
+            rate=stats["read"] / elapsed if elapsed else 0.0,
+            write_rate=stats["inserted"] / stats["write_time"] if stats["write_time"] else 0.0
+        )
@@ -0,0 +1,44 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from .models import JobCheckpoint
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("checkpoint")
+
+
+def resume_checkpoint(db: Session, name: str, context: str, resume: bool = True) -> JobCheckpoint:
+    """取得任务的断点（不提交事务）
+
+    上一轮未完成且参数一致时沿用断点继续，否则从头开始新的一轮。
+    """
+    checkpoint = db.get(JobCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=name)
+        db.add(checkpoint)
+    elif resume and checkpoint.finished_at is None and checkpoint.context == context:
+        logger.info(f"任务 {name} 从断点继续: ID > {checkpoint.last_id}，已处理{checkpoint.processed}")
+        return checkpoint
+    checkpoint.last_id = 0
+    checkpoint.processed = 0
+    checkpoint.context = context
+    checkpoint.started_at = datetime.now()
+    checkpoint.finished_at = None
+    return checkpoint
+
+
+def advance_checkpoint(checkpoint: JobCheckpoint, last_id: int, count: int) -> None:
+    """记录一批处理完成（不提交事务，应与这批结果在同一事务中提交）"""
+    checkpoint.last_id = last_id
+    checkpoint.processed = (checkpoint.processed or 0) + count
+
+
+def finish_checkpoint(checkpoint: JobCheckpoint) -> None:
+    """标记本轮完成（不提交事务），下一次运行从头开始"""
+    checkpoint.finished_at = datetime.now()
@@ -1,17 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, inspect, select, text, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+from core.config import settings
+from core.database import get_engine
 
-# 数据库连接URL
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./au_news.db")
+# 数据库连接URL（与其他模块使用同一配置）
+DATABASE_URL = settings.DATABASE_URL
 
-# 创建数据库引擎
-engine = create_engine(DATABASE_URL)
+# 创建数据库引擎（WAL 和连接池配置见 core.database，同一数据库的模块共用一个引擎）
+engine = get_engine(DATABASE_URL)
 
 # 创建会话类
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -25,4 +23,84 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _default_literal(value) -> str:
+    """把列的默认值渲染为DDL字面量"""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def upgrade_schema(bind=None):
+    """为已存在的表补充模型中新增的列和索引
+
+    create_all 只会创建缺失的表，已有数据库需要通过 ALTER TABLE 补列。
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=bind.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" DEFAULT {_default_literal(column.default.arg)}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+def backfill_guid_hashes(bind=None, batch_size: int = 5000):
+    """为升级前已存在的文章补算 guid_hash"""
+    from .models import Article, guid_key
+    bind = bind or engine
+    stmt = (
+        update(Article.__table__)
+        .where(Article.__table__.c.id == bindparam("article_id"))
+        .values(guid_hash=bindparam("hash"))
+    )
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(
+                select(Article.id, Article.guid).where(Article.guid_hash.is_(None)).limit(batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            conn.execute(stmt, [{"article_id": row.id, "hash": guid_key(row.guid)} for row in rows])
+
+def backfill_plain_text(bind=None, batch_size: int = 1000):
+    """为升级前已存在的文章生成纯文本列"""
+    from .models import Article
+    from .normalize import plain_text
+    bind = bind or engine
+    stmt = (
+        update(Article.__table__)
+        .where(Article.__table__.c.id == bindparam("article_id"))
+        .values(plain_text=bindparam("text"), plain_text_length=bindparam("length"))
+    )
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(
+                select(Article.id, Article.content).where(Article.plain_text.is_(None)).limit(batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            params = []
+            for row in rows:
+                text = plain_text(row.content)
+                params.append({"article_id": row.id, "text": text, "length": len(text)})
+            conn.execute(stmt, params)
+
+def init_db(bind=None):
+    """创建数据表并升级已有表结构"""
+    from . import models  # 确保所有模型已注册
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    upgrade_schema(bind)
+    backfill_guid_hashes(bind)
+    backfill_plain_text(bind)
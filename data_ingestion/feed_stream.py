@@ -0,0 +1,127 @@
+import logging
+from typing import Dict, Iterator, Optional
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser, tostring
+
+import feedparser
+from feedparser.datetimes import _parse_date
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("feed_stream")
+
+# 每次送入解析器的字节数
+CHUNK_SIZE = 64 * 1024
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+XHTML = "{http://www.w3.org/1999/xhtml}"
+
+ENTRY_TAGS = {"item", RSS1 + "item", ATOM + "entry"}
+
+
+def _text(element, *tags) -> Optional[str]:
+    """返回第一个存在且非空的子元素文本"""
+    for tag in tags:
+        child = element.find(tag)
+        if child is not None and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+def _local_copy(element):
+    """去掉XHTML命名空间的元素副本，序列化后与 feedparser 的输出一致"""
+    copy = Element(element.tag.rsplit("}", 1)[-1], element.attrib)
+    copy.text, copy.tail = element.text, element.tail
+    copy.extend(_local_copy(child) for child in element)
+    return copy
+
+
+def _atom_text(element, tag) -> Optional[str]:
+    """Atom 文本构造：type="xhtml" 时内容在 div 子元素中，序列化为HTML"""
+    child = element.find(tag)
+    if child is None or child.get("type") != "xhtml":
+        return _text(element, tag)
+    div = child.find(XHTML + "div")
+    if div is None:
+        return _text(element, tag)
+    html = (div.text or "") + "".join(tostring(_local_copy(node), encoding="unicode") for node in div)
+    return html.strip() or None
+
+
+def _atom_link(element) -> Optional[str]:
+    for link in element.findall(ATOM + "link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href")
+    return None
+
+
+def _to_entry(element) -> feedparser.FeedParserDict:
+    """把 item/entry 元素转换为与 feedparser 条目兼容的字典"""
+    if element.tag == ATOM + "entry":
+        link = _atom_link(element)
+        entry = feedparser.FeedParserDict(
+            id=_text(element, ATOM + "id"),
+            link=link,
+            title=_text(element, ATOM + "title") or "",
+            description=_atom_text(element, ATOM + "summary") or ""
+        )
+        content = _atom_text(element, ATOM + "content")
+        date = _text(element, ATOM + "published", ATOM + "updated")
+    else:
+        ns = RSS1 if element.tag.startswith(RSS1) else ""
+        link = _text(element, ns + "link")
+        entry = feedparser.FeedParserDict(
+            id=_text(element, "guid") or element.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"),
+            link=link,
+            title=_text(element, ns + "title") or "",
+            description=_text(element, ns + "description") or ""
+        )
+        content = _text(element, CONTENT_ENCODED)
+        date = _text(element, "pubDate", DC_DATE)
+
+    if content:
+        entry["content"] = [feedparser.FeedParserDict(value=content)]
+    if date:
+        entry["published_parsed"] = _parse_date(date)
+    return entry
+
+
+def iter_feed_entries(content: bytes, headers: Optional[Dict[str, str]] = None) -> Iterator[feedparser.FeedParserDict]:
+    """按文档顺序增量解析RSS/Atom条目
+
+    解析器分块读取已下载的响应体（由下载器限制在 RSS_FETCH_MAX_BYTES 以内），
+    每个条目生成后立即释放对应的XML元素，解析树不随feed大小增长；
+    调用方停止迭代（如遇到高水位）时不会再解析剩余部分，但响应体已经完整下载。
+    遇到格式不规范的feed时回退到 feedparser 完整解析。
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    yielded = 0
+    try:
+        for offset in range(0, len(content), CHUNK_SIZE):
+            parser.feed(content[offset:offset + CHUNK_SIZE])
+            for event, element in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = element
+                    continue
+                if element.tag in ENTRY_TAGS:
+                    entry = _to_entry(element)
+                    element.clear()
+                    # 从父元素中移除已处理的条目，避免根元素持续增长
+                    for parent in (root, root.find("channel")):
+                        if parent is not None and len(parent) and parent[-1] is element:
+                            parent.remove(element)
+                    yielded += 1
+                    yield entry
+        parser.close()
+    except ParseError as e:
+        # feedparser 能容忍未定义实体、截断等问题，跳过已经输出的条目继续
+        logger.warning(f"feed在第{yielded}个条目后不再是规范的XML，回退到feedparser: {e}")
+        for entry in feedparser.parse(content, response_headers=headers or {}).entries[yielded:]:
+            yield entry
@@ -0,0 +1,175 @@
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from core.config import settings
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("feed_fetcher")
+
+
+class FetchResult:
+    """单次下载的结果"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: Optional[int] = None,
+        content: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        elapsed: float = 0.0,
+        error: Optional[str] = None
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.elapsed = elapsed  # 秒
+        self.error = error
+        self.truncated = False  # 是否因超过大小上限而截断
+        self.entries = None  # 由工作线程填充的待入库条目，None表示未解析
+        self.newest_guid: Optional[str] = None  # feed中第一个（最新的）条目guid
+        self.content_hash: Optional[str] = None
+        self.parse_time = 0.0  # 解析耗时（秒）
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and self.status_code < 400
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+class HostThrottle:
+    """按主机限制并发数和请求间隔，避免对同一站点造成压力"""
+
+    def __init__(self, max_per_host: int, min_interval: float):
+        self.max_per_host = max(1, max_per_host)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    def acquire(self, host: str) -> None:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+        semaphore.acquire()
+
+        # 预约下一个可用时间片，再在锁外等待
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def release(self, host: str) -> None:
+        self._semaphores[host].release()
+
+
+class FeedFetcher:
+    """RSS下载器，使用有界线程池并发下载，不接触数据库"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_per_host: Optional[int] = None,
+        host_interval: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.RSS_FETCH_CONCURRENCY
+        self.timeout = timeout or settings.RSS_FETCH_TIMEOUT
+        self.max_bytes = max_bytes or settings.RSS_FETCH_MAX_BYTES
+        self.throttle = HostThrottle(
+            max_per_host or settings.RSS_FETCH_MAX_PER_HOST,
+            settings.RSS_FETCH_HOST_INTERVAL if host_interval is None else host_interval
+        )
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session不保证线程安全，每个线程使用自己的会话
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = settings.RSS_FETCH_USER_AGENT
+            self._local.session = session
+        return session
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """下载单个RSS源，超时时间覆盖整个下载过程，超过 max_bytes 的部分被截断"""
+        host = urlparse(url).netloc
+        self.throttle.acquire(host)
+        start = time.monotonic()
+        deadline = start + self.timeout
+        try:
+            response = self._session().get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            )
+            truncated = False
+            try:
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=65536):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        truncated = True
+                        logger.warning(f"{url} 超过{self.max_bytes}字节，截断处理")
+                        break
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"下载超过{self.timeout}秒")
+                content = b"".join(chunks)[:self.max_bytes]
+            finally:
+                response.close()
+
+            result = FetchResult(
+                url,
+                status_code=response.status_code,
+                content=content,
+                headers=dict(response.headers),
+                elapsed=time.monotonic() - start
+            )
+            result.truncated = truncated
+            return result
+        except Exception as e:
+            return FetchResult(url, error=str(e), elapsed=time.monotonic() - start)
+        finally:
+            self.throttle.release(host)
+
+    def fetch_many(
+        self,
+        jobs: Iterable[Tuple[int, str, Optional[Dict[str, str]]]],
+        postprocess: Optional[Callable[[int, FetchResult], None]] = None
+    ) -> Iterator[Tuple[int, FetchResult]]:
+        """并发下载多个RSS源，按完成顺序返回 (key, 结果)
+
+        jobs 为 (key, url, 请求头) 列表。postprocess(key, result) 在工作线程中
+        执行（例如解析），调用方只负责写库。
+        """
+        def task(key: int, url: str, headers: Optional[Dict[str, str]]) -> FetchResult:
+            result = self.fetch(url, headers=headers)
+            if postprocess is not None and result.ok:
+                try:
+                    postprocess(key, result)
+                except Exception as e:
+                    result.error = f"解析失败: {e}"
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rss-fetch") as executor:
+            futures = {executor.submit(task, key, url, headers): key for key, url, headers in jobs}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,73 @@
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .fetcher import FeedFetcher
+from .rss_collector import RSSCollector
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("ingest_scheduler")
+
+
+class IngestScheduler:
+    """按源到期时间调度RSS采集
+
+    每次 run_due 从数据库查询 next_fetch_at 已到期的激活源并采集。
+    不在内存中维护到期堆：为了看到新增、停用或改期的源（包括其他进程的修改），
+    每次检查都要读数据库，源的数量又很少，直接按到期时间查询即可。
+    采集间隔和失败退避由 schedule_policy 在写库时计算并持久化，
+    因此调度器重启后可以从数据库恢复状态。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        fetcher: Optional[FeedFetcher] = None
+    ):
+        self.session_factory = session_factory
+        self.fetcher = fetcher or FeedFetcher()
+
+    @staticmethod
+    def due_source_ids(db: Session, now: Optional[datetime] = None) -> List[int]:
+        """已到期的激活源，从未采集的源最先，其余按到期时间先后"""
+        source = models.RSSSource
+        rows = (
+            db.query(source.id)
+            .filter(
+                source.is_active == True,
+                or_(source.next_fetch_at.is_(None), source.next_fetch_at <= (now or datetime.now()))
+            )
+            .order_by(source.next_fetch_at.is_not(None), source.next_fetch_at, source.id)
+            .all()
+        )
+        return [source_id for (source_id,) in rows]
+
+    def run_due(self) -> Dict:
+        """采集所有到期的源（作为 core.scheduler 的周期任务调用）"""
+        db = self.session_factory()
+        try:
+            due_ids = self.due_source_ids(db)
+            if not due_ids:
+                return {"status": "idle", "fetched": 0}
+
+            logger.info(f"{len(due_ids)}个RSS源到期，开始采集")
+            results = RSSCollector(db, self.fetcher).fetch_sources(due_ids)
+            new_articles = sum(r.get("new_articles", 0) for r in results)
+            errors = sum(1 for r in results if r.get("status") == "error")
+            logger.info(f"到期源采集完成: {len(results)}个源, 新文章{new_articles}篇, 失败{errors}个")
+            return {"status": "success", "fetched": len(results), "new_articles": new_articles, "errors": errors}
+        finally:
+            db.close()
+
+
+# 创建全局采集调度器实例
+ingest_scheduler = IngestScheduler()
@@ -1,16 +1,28 @@
 from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.orm import Session
 from typing import List, Dict
 import os
 
 from . import models, database
 from .rss_collector import RSSCollector
-from .database import engine
+from .database import init_db
+from .work_queue import article_queue, bulk_update_articles
+from core.compression import GzipRequestMiddleware
+from core.config import settings
+from core.database import pool_stats
 
 # 创建数据表
-models.Base.metadata.create_all(bind=engine)
+init_db()
 
 app = FastAPI(title="数据采集服务")
+# 服务间的批量请求和响应体较大时gzip压缩
+app.add_middleware(GZipMiddleware, minimum_size=settings.SERVICE_GZIP_MIN_BYTES)
+app.add_middleware(GzipRequestMiddleware)
+
+# 分析结果可以写回的列
+UPDATABLE_FIELDS = {"relevance_score", "sentiment", "status", "summary"}
+ARTICLE_STATUSES = {"pending", "processed", "irrelevant", "published", "duplicate", "failed"}
 
 # 依赖项：获取数据库会话
 def get_db():
@@ -67,10 +79,49 @@ def list_articles(limit: int = 10, db: Session = Depends(get_db)):
             "source": article.source,
             "published_at": article.published_at,
             "url": article.url,
-            "status": article.status
+            "status": article.status,
+            "plain_text": article.text
         })
     return result
 
+@app.get("/articles/pending")
+def list_pending_articles(after_id: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """按ID游标分页获取待处理文章（含正文），下一页传入返回的 next_cursor"""
+    limit = max(1, min(limit, 1000))
+    articles = (
+        db.query(models.Article.id, models.Article.title, models.Article.plain_text, models.Article.content)
+        .filter(models.Article.status == "pending", models.Article.id > after_id)
+        .order_by(models.Article.id)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "articles": [
+            {"id": article_id, "title": title, "plain_text": text if text is not None else (content or "")}
+            for article_id, title, text, content in articles
+        ],
+        "next_cursor": articles[-1][0] if len(articles) == limit else None
+    }
+
+def validate_update_rows(rows: List[Dict]) -> List[Dict]:
+    """检查写回的行：每行包含 id，只有可更新的列和有效的状态，否则返回400"""
+    for row in rows:
+        if "id" not in row:
+            raise HTTPException(status_code=400, detail="每行都需要 id")
+        unknown = set(row) - UPDATABLE_FIELDS - {"id"}
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"不能更新的字段: {', '.join(sorted(unknown))}")
+        if "status" in row and row["status"] not in ARTICLE_STATUSES:
+            raise HTTPException(status_code=400, detail=f"无效的状态: {row['status']}")
+    return rows
+
+@app.post("/articles/bulk-update")
+def bulk_update(rows: List[Dict], db: Session = Depends(get_db)):
+    """在一个事务中批量更新文章的分析结果，每行包含 id 以及要更新的列"""
+    updated = bulk_update_articles(db, validate_update_rows(rows))
+    db.commit()
+    return {"status": "success", "updated": updated}
+
 @app.post("/articles/{article_id}/update")
 def update_article(article_id: int, data: Dict, db: Session = Depends(get_db)):
     """更新文章信息"""
@@ -88,6 +139,51 @@ def update_article(article_id: int, data: Dict, db: Session = Depends(get_db)):
     
     return {"status": "success", "message": f"文章 {article_id} 已更新"}
 
+@app.post("/queue/claim")
+def claim_articles(data: Dict, db: Session = Depends(get_db)):
+    """领取待处理文章（租约），返回令牌和文章内容"""
+    worker_id = data.get("worker_id") or "unknown"
+    try:
+        limit = max(1, min(int(data.get("limit", 10)), 1000))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="limit 必须是整数")
+    token, articles = article_queue.claim(db, worker_id, limit)
+    return {
+        "token": token,
+        "lease_seconds": article_queue.lease_seconds,
+        "articles": [
+            {"id": article.id, "title": article.title, "plain_text": article.text}
+            for article in articles
+        ]
+    }
+
+@app.post("/queue/{token}/heartbeat")
+def heartbeat_claim(token: str, db: Session = Depends(get_db)):
+    """延长租约"""
+    return {"held": article_queue.heartbeat(db, token)}
+
+@app.post("/queue/{token}/complete")
+def complete_claim(token: str, rows: List[Dict], db: Session = Depends(get_db)):
+    """写回分析结果并释放租约，租约已失效的文章不会被写入"""
+    written = article_queue.complete(db, token, validate_update_rows(rows))
+    db.commit()
+    return {"written": written}
+
+@app.post("/queue/{token}/fail")
+def fail_claim(token: str, data: Dict, db: Session = Depends(get_db)):
+    """处理失败，释放租约（达到重试上限的文章转为死信）"""
+    return article_queue.fail(db, token, str(data.get("error", "")))
+
+@app.get("/queue/stats")
+def queue_stats(db: Session = Depends(get_db)):
+    """队列状态"""
+    return article_queue.stats(db)
+
+@app.get("/pool-stats")
+def database_pool_stats():
+    """数据库连接池状态"""
+    return pool_stats()
+
 
 if __name__ == "__main__":
     import uvicorn
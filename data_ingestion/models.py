@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+import hashlib
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, Text, ForeignKey, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -11,11 +12,27 @@ class RSSSource(Base):
     name = Column(String(100), nullable=False)
     url = Column(Text, nullable=False)
     last_fetched = Column(DateTime, nullable=True)
-    fetch_interval = Column(Integer, default=3600)  # 默认1小时
+    fetch_interval = Column(Integer, default=3600)  # 默认1小时，由调度器按发布频率自适应调整
+    next_fetch_at = Column(DateTime, nullable=True)  # 下次计划采集时间
+    max_entries = Column(Integer, nullable=True)  # 每次最多处理的条目数，为空时使用全局配置
+    high_water_guid_hash = Column(BigInteger, nullable=True)  # 上次采集时最新条目的guid_key，遇到即停止解析
     is_active = Column(Boolean, default=True)
     error_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.now)
 
+    # 条件请求（ETag / Last-Modified）缓存
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # 上次响应体的sha256
+    last_content_length = Column(Integer, default=0)  # 上次响应体字节数
+    last_parse_time = Column(Float, default=0.0)  # 上次解析耗时（秒）
+
+    # 节省统计
+    not_modified_count = Column(Integer, default=0)  # 304次数
+    unchanged_count = Column(Integer, default=0)  # 响应体未变化次数
+    bytes_saved = Column(Integer, default=0)  # 节省的下载字节数
+    parse_time_saved = Column(Float, default=0.0)  # 节省的解析时间（秒）
+
 
 class Article(Base):
     """新闻文章模型"""
@@ -23,8 +40,11 @@ class Article(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     guid = Column(String(255), unique=True, nullable=False)
+    guid_hash = Column(BigInteger, index=True, nullable=True)  # guid的64位紧凑哈希，用于快速查重
     title = Column(Text, nullable=False)
     content = Column(Text)
+    plain_text = Column(Text)  # 去掉HTML、规范化后的正文，分析、搜索和查重读取此列
+    plain_text_length = Column(Integer)
     summary = Column(Text)
     source = Column(String(100), nullable=False)
     url = Column(Text, nullable=False)
@@ -34,7 +54,96 @@ class Article(Base):
     sentiment = Column(Float, nullable=True)  # -1.0 to 1.0
     relevance_score = Column(Float, nullable=True)  # 0.0 to 1.0
     language = Column(String(10), default='en')
-    status = Column(String(20), default='pending')  # pending, processed, published
+    status = Column(String(20), default='pending', index=True)  # pending, processed, irrelevant, published, duplicate, failed
+    canonical_id = Column(Integer, ForeignKey("articles.id"), nullable=True, index=True)  # 近似重复时指向规范文章
+    keywords_indexed = Column(Boolean, default=False)  # 是否已在 article_keywords 中记录关键词出现次数
+    # 待处理队列的租约：领取时写入令牌和到期时间，到期未完成的文章可被其他工作者重新领取
+    claim_token = Column(String(32), nullable=True, index=True)
+    claimed_by = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)  # 已领取次数，超过上限后转为 failed（死信）
+    last_error = Column(Text, nullable=True)
+
+    @property
+    def text(self) -> str:
+        """分析、搜索使用的正文：优先读取纯文本列，未规范化的旧数据退回原始内容"""
+        return self.plain_text if self.plain_text is not None else (self.content or "")
+
+
+class ArticleKeyword(Base):
+    """文章中各关键词的出现次数（稀疏矩阵，只记录出现过的关键词）
+
+    记录所有关键词（包括停用的），修改权重或启停关键词后可直接由计数重算相关性。
+    """
+    __tablename__ = "article_keywords"
+
+    article_id = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id"), primary_key=True, index=True)
+    count = Column(Integer, default=1)  # 关键词在文章中出现次数
+
+
+class ArticleSignature(Base):
+    """文章MinHash签名（仅规范文章），用于近似重复检测"""
+    __tablename__ = "article_signatures"
+
+    article_id = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    minhash = Column(LargeBinary, nullable=False)  # 32个uint32
+
+
+class SourceFetchStat(Base):
+    """RSS源采集遥测（滚动时间序列）
+
+    resolution 为0的是单次采集的原始记录，过期后按小时、再按天合并为汇总行，
+    汇总行中的耗时/字节数等为合计值，延迟分位数为合并时的估计值。
+    """
+    __tablename__ = "source_fetch_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, ForeignKey("rss_sources.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # 原始记录为采集时间，汇总行为时间桶起点
+    resolution = Column(Integer, default=0)  # 0、3600 或 86400（秒）
+    samples = Column(Integer, default=1)
+    errors = Column(Integer, default=0)
+    unchanged = Column(Integer, default=0)  # 304 或响应体未变化的次数
+    truncated = Column(Integer, default=0)  # 响应体超过大小上限被截断的次数
+    wall_time = Column(Float, default=0.0)  # 下载耗时合计（秒）
+    latency_p50 = Column(Float, default=0.0)
+    latency_p95 = Column(Float, default=0.0)
+    bytes = Column(Integer, default=0)
+    entries = Column(Integer, default=0)  # 解析出的条目数
+    new_articles = Column(Integer, default=0)
+    parse_time = Column(Float, default=0.0)
+    db_time = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index("ix_source_fetch_stats_source_bucket", "source_id", "resolution", "bucket_start"),
+    )
+
+
+class SourceFetchSummary(Base):
+    """每个源最近采集情况的预计算汇总，供 /sources 页面直接读取"""
+    __tablename__ = "source_fetch_summaries"
+
+    source_id = Column(Integer, ForeignKey("rss_sources.id"), primary_key=True)
+    samples = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    truncated = Column(Integer, default=0)
+    latency_p50 = Column(Float, default=0.0)
+    latency_p95 = Column(Float, default=0.0)
+    avg_bytes = Column(Float, default=0.0)
+    avg_entries = Column(Float, default=0.0)
+    new_ratio = Column(Float, default=0.0)  # 新文章数 / 解析条目数
+    parse_time = Column(Float, default=0.0)  # 平均解析耗时（秒）
+    db_time = Column(Float, default=0.0)  # 平均写库耗时（秒）
+    updated_at = Column(DateTime, default=datetime.now)
+
+
+def guid_key(guid: str) -> int:
+    """计算guid的紧凑查重键（md5前8字节，有符号64位整数）
+
+    哈希可能碰撞，查重时需再比较guid本身。
+    """
+    return int.from_bytes(hashlib.md5(guid.encode()).digest()[:8], "big", signed=True)
 
 
 class Keyword(Base):
@@ -46,4 +155,58 @@ class Keyword(Base):
     category = Column(String(50), default="general")
     weight = Column(Float, default=1.0)  # 关键词权重
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.now)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.now)
+
+
+class KeywordSetVersion(Base):
+    """关键词集合的版本号（单行表），关键词每次增删改都会递增
+
+    各进程缓存编译好的分析器，只在版本号变化时重新加载关键词。
+    """
+    __tablename__ = "keyword_set_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class AnalysisCacheEntry(Base):
+    """分析结果缓存（持久层），按规范化后的标题+正文哈希和分析器版本索引
+
+    只缓存计算代价高的情感得分；相关性由当前关键词重新计算（一次扫描）。
+    """
+    __tablename__ = "analysis_cache"
+
+    content_hash = Column(String(40), primary_key=True)  # sha1
+    version = Column(String(50), primary_key=True)  # 情感分析后端及其版本
+    sentiment = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+
+
+class JobCheckpoint(Base):
+    """长时间批处理任务的断点（每个任务一行），中断后从 last_id 之后继续"""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)  # 已处理到的最大ID
+    processed = Column(Integer, default=0, nullable=False)  # 本轮已处理数量
+    context = Column(String(200))  # 影响结果的参数（如关键词版本），不一致时从头开始
+    started_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    finished_at = Column(DateTime)  # 为空表示上一轮未完成
+
+
+class JobRun(Base):
+    """后台任务（采集、处理、重新评估等）的运行记录"""
+    __tablename__ = "job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), default="running")  # running, success, error, interrupted
+    started_at = Column(DateTime, default=datetime.now, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)  # 秒
+    items = Column(Integer, nullable=True)  # 处理的条目数（文章、新文章等）
+    throughput = Column(Float, nullable=True)  # 每秒处理的条目数
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
@@ -0,0 +1,181 @@
+import html
+import logging
+import random
+import re
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from . import models
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("near_duplicate")
+
+# MinHash参数：32个哈希函数分成8段，每段4个值。
+# Jaccard相似度为0.7的文章成为候选的概率约0.89，0.8时约0.996，0.3时约0.06。
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+MAX_SHINGLES = 2000  # 长文只取前面的词组，签名已足够稳定
+
+_rng = random.Random(20240601)  # 固定种子，保证持久化的签名在不同进程间可比较
+_PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def shingles(title: str, content: str) -> List[str]:
+    """标题和正文归一化后的词二元组"""
+    text = html.unescape(_TAG_RE.sub(" ", f"{title} {content or ''}")).lower()
+    tokens = _TOKEN_RE.findall(text)[:MAX_SHINGLES + 1]
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def minhash(features: Iterable[str]) -> Optional[Tuple[int, ...]]:
+    """计算MinHash签名，特征过少时返回None"""
+    values = {zlib.crc32(f.encode()) for f in features}
+    if len(values) < settings.NEAR_DUP_MIN_SHINGLES:
+        return None
+    return tuple(
+        min(((a * v + b) % MERSENNE_PRIME) & MAX_HASH for v in values)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def band_keys(signature: Tuple[int, ...]) -> List[int]:
+    return [hash(signature[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """由签名估计的Jaccard相似度"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def pack(signature: Tuple[int, ...]) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def unpack(data: bytes) -> Tuple[int, ...]:
+    return tuple(array("I", data))
+
+
+class MinHashIndex:
+    """内存中的MinHash LSH索引
+
+    只保留最近 NEAR_DUP_INDEX_SIZE 个规范文章的签名（转载通常在几天内出现），
+    签名同时持久化在 article_signatures 表中，进程重启时从数据库加载最近的窗口。
+    每次查询只比较同桶候选，耗时与已存储签名总数无关。
+    """
+
+    def __init__(self, max_size: Optional[int] = None, threshold: Optional[float] = None):
+        self.max_size = max_size or settings.NEAR_DUP_INDEX_SIZE
+        self.threshold = threshold or settings.NEAR_DUP_THRESHOLD
+        self._signatures: "OrderedDict[int, bytes]" = OrderedDict()  # article_id -> 打包的签名
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def load(self, db: Session) -> None:
+        """从数据库加载最近的签名"""
+        rows = (
+            db.query(models.ArticleSignature.article_id, models.ArticleSignature.minhash)
+            .order_by(models.ArticleSignature.article_id.desc())
+            .limit(self.max_size)
+            .all()
+        )
+        with self._lock:
+            for article_id, data in reversed(rows):
+                self._add(article_id, unpack(data))
+            self.loaded = True
+        logger.info(f"加载了{len(rows)}个文章签名")
+
+    def invalidate(self) -> None:
+        """丢弃内存索引（例如事务回滚后），下次使用时从数据库重新加载"""
+        with self._lock:
+            self._signatures.clear()
+            self._buckets = [{} for _ in range(BANDS)]
+            self.loaded = False
+
+    def _add(self, article_id: int, signature: Tuple[int, ...]) -> None:
+        self._signatures[article_id] = pack(signature)
+        for band, key in zip(self._buckets, band_keys(signature)):
+            band.setdefault(key, []).append(article_id)
+        while len(self._signatures) > self.max_size:
+            old_id, old_data = self._signatures.popitem(last=False)
+            for band, key in zip(self._buckets, band_keys(unpack(old_data))):
+                bucket = band.get(key)
+                if bucket:
+                    bucket.remove(old_id)
+                    if not bucket:
+                        del band[key]
+
+    def add(self, article_id: int, signature: Tuple[int, ...]) -> None:
+        with self._lock:
+            self._add(article_id, signature)
+
+    def find(self, signature: Tuple[int, ...]) -> Optional[int]:
+        """返回相似度最高且不低于阈值的规范文章ID"""
+        best_id, best_score = None, self.threshold
+        with self._lock:
+            seen = set()
+            for band, key in zip(self._buckets, band_keys(signature)):
+                for article_id in band.get(key, ()):
+                    if article_id in seen:
+                        continue
+                    seen.add(article_id)
+                    score = similarity(signature, unpack(self._signatures[article_id]))
+                    if score >= best_score:
+                        best_id, best_score = article_id, score
+        return best_id
+
+
+def link_near_duplicates(db: Session, index: MinHashIndex, articles: List[Tuple[int, str, str]]) -> int:
+    """为新入库的文章计算签名，把近似重复的文章关联到规范文章（不提交事务）
+
+    Args:
+        articles: (article_id, title, content) 列表
+
+    Returns:
+        被标记为重复的文章数
+    """
+    if not index.loaded:
+        index.load(db)
+
+    duplicates = []
+    signatures = []
+    for article_id, title, content in articles:
+        signature = minhash(shingles(title, content))
+        if signature is None:
+            continue
+        canonical_id = index.find(signature)
+        if canonical_id is not None:
+            duplicates.append({"id": article_id, "canonical_id": canonical_id, "status": "duplicate"})
+            continue
+        index.add(article_id, signature)
+        signatures.append({"article_id": article_id, "minhash": pack(signature)})
+
+    if signatures:
+        db.execute(models.ArticleSignature.__table__.insert(), signatures)
+    if duplicates:
+        db.bulk_update_mappings(models.Article, duplicates)
+        logger.info(f"发现{len(duplicates)}篇近似重复文章")
+    return len(duplicates)
+
+
+# 进程内共享的索引
+near_duplicate_index = MinHashIndex()
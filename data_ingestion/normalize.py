@@ -0,0 +1,31 @@
+import html
+import re
+import unicodedata
+
+# 整块丢弃的元素（脚本、样式等不属于正文）
+_DROP_RE = re.compile(r"<(script|style|noscript|iframe|svg)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->|<!\[CDATA\[|\]\]>", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+# 零宽字符和软连字符，去掉后不影响显示
+_INVISIBLE_RE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+
+
+def plain_text(content: str) -> str:
+    """把RSS中的HTML正文转换为紧凑的纯文本
+
+    去掉脚本/样式块、注释和所有标签（标签处替换为空格），解码HTML实体，
+    做 NFKC Unicode 规范化（全角字符、连字等转为普通形式），合并连续空白。
+    """
+    if not content:
+        return ""
+    text = _DROP_RE.sub(" ", content)
+    if "<!" in text or "]]>" in text:
+        text = _COMMENT_RE.sub(" ", text)
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    # 纯ASCII文本不需要Unicode规范化，也不含零宽字符
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+        text = _INVISIBLE_RE.sub("", text)
+    # split() 按任意空白切分，比正则逐个替换空白快一个数量级（存档导入时是主要开销）
+    return " ".join(text.split())
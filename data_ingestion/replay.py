@@ -0,0 +1,200 @@
+import base64
+import gzip
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .fetcher import FeedFetcher, FetchResult
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("feed_replay")
+
+_ITEM_RE = re.compile(rb"<(item|entry)\b.*?</\1>", re.S)
+_ID_RE = re.compile(rb"(<(?:guid|id|link)\b[^>/]*>)([^<]*)(</)")
+_HREF_RE = re.compile(rb'(<link\b[^>]*href=")([^"]*)(")')
+
+
+class FeedArchive:
+    """压缩的feed响应存档（gzip JSON Lines，每行一次响应）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, result: FetchResult) -> None:
+        record = {
+            "url": result.url,
+            "status_code": result.status_code,
+            "headers": result.headers,
+            "content": base64.b64encode(result.content).decode("ascii"),
+            "elapsed": result.elapsed,
+            "error": result.error,
+            "recorded_at": datetime.now().isoformat()
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            # 追加写入会形成多成员gzip文件，读取时按顺序解压即可
+            with gzip.open(self.path, "ab") as f:
+                f.write(line)
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """按URL分组读取所有记录（保持录制顺序）"""
+        records = defaultdict(list)
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    record["content"] = base64.b64decode(record["content"])
+                    records[record["url"]].append(record)
+        return dict(records)
+
+
+class RecordingFetcher(FeedFetcher):
+    """正常下载，同时把原始响应（含响应头）写入存档"""
+
+    def __init__(self, archive: FeedArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        # 录制时不发送条件请求头，保证存档中是完整响应
+        result = super().fetch(url)
+        self.archive.append(result)
+        return result
+
+
+def scale_feed(content: bytes, factor: int) -> bytes:
+    """把feed中的每个条目复制 factor 份（guid/link 加后缀以保持唯一），用于模拟大feed"""
+    if factor <= 1:
+        return content
+
+    def replicate(match):
+        item = match.group(0)
+        copies = [item]
+        for i in range(1, factor):
+            suffix = f"#copy{i}".encode()
+            copy = _ID_RE.sub(lambda m: m.group(1) + m.group(2) + suffix + m.group(3), item)
+            copy = _HREF_RE.sub(lambda m: m.group(1) + m.group(2) + suffix + m.group(3), copy)
+            copies.append(copy)
+        return b"".join(copies)
+
+    return _ITEM_RE.sub(replicate, content)
+
+
+class ReplayFetcher(FeedFetcher):
+    """从存档回放feed响应的下载器，可注入 RSSCollector，完全离线
+
+    Args:
+        records: FeedArchive.load() 的结果
+        latency: 每次请求的固定延迟（秒）
+        jitter: 在固定延迟上增加的随机延迟上限（秒）
+        error_rate: 返回错误的概率（一半为网络异常，一半为HTTP 500）
+        size_factor: 条目复制倍数
+        seed: 随机种子，便于复现
+    """
+
+    def __init__(
+        self,
+        records: Dict[str, List[Dict]],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        size_factor: int = 1,
+        seed: Optional[int] = None,
+        **kwargs
+    ):
+        kwargs.setdefault("host_interval", 0.0)
+        super().__init__(**kwargs)
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.size_factor = size_factor
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._served: Dict[str, int] = defaultdict(int)
+        self._scaled: Dict[int, bytes] = {}
+
+    def _next_record(self, url: str) -> Optional[Dict]:
+        records = self.records.get(url)
+        if not records:
+            return None
+        with self._lock:
+            index = self._served[url]
+            self._served[url] += 1
+        # 多次录制按顺序回放，用完后停留在最后一次
+        return records[min(index, len(records) - 1)]
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        start = time.monotonic()
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.error_rate / 2:
+            return FetchResult(url, error="回放: 模拟的网络错误", elapsed=time.monotonic() - start)
+        if roll < self.error_rate:
+            return FetchResult(url, status_code=500, elapsed=time.monotonic() - start)
+
+        record = self._next_record(url)
+        if record is None:
+            return FetchResult(url, status_code=404, elapsed=time.monotonic() - start)
+        if record.get("error"):
+            return FetchResult(url, error=record["error"], elapsed=time.monotonic() - start)
+
+        response_headers = dict(record.get("headers") or {})
+        etag = response_headers.get("ETag") or response_headers.get("etag")
+        if etag and headers and headers.get("If-None-Match") == etag:
+            return FetchResult(url, status_code=304, headers=response_headers, elapsed=time.monotonic() - start)
+
+        key = id(record)
+        content = self._scaled.get(key)
+        if content is None:
+            content = scale_feed(record["content"], self.size_factor)
+            with self._lock:
+                self._scaled[key] = content
+        return FetchResult(
+            url,
+            status_code=record.get("status_code") or 200,
+            content=content,
+            headers=response_headers,
+            elapsed=time.monotonic() - start
+        )
+
+
+def synthesize_archive(path: str, sources: int = 4, entries: int = 50, passes: int = 3, seed: int = 0) -> None:
+    """生成合成存档：每个源录制 passes 次，每次都比上一次多出若干新条目"""
+    rng = random.Random(seed)
+    # 词表足够大，避免合成文章之间被判定为近似重复
+    words = ["students", "adelaide", "university", "visa", "housing", "policy"] + [f"word{i}" for i in range(5000)]
+    archive = FeedArchive(path)
+    for s in range(sources):
+        url = f"https://replay.example/{s}/feed.xml"
+        for p in range(passes):
+            newest = entries + p * max(1, entries // 10)
+            items = []
+            for i in range(newest - 1, newest - 1 - entries, -1):
+                body = " ".join(rng.choice(words) for _ in range(60))
+                items.append(
+                    f"<item><title>Source {s} story {i}</title>"
+                    f"<link>https://replay.example/{s}/{i}</link><guid>replay-{s}-{i}</guid>"
+                    f"<description>{body}</description>"
+                    f"<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></item>"
+                )
+            content = f"<?xml version='1.0'?><rss version='2.0'><channel><title>Replay {s}</title>{''.join(items)}</channel></rss>"
+            result = FetchResult(url, status_code=200, content=content.encode(),
+                                 headers={"Content-Type": "application/rss+xml", "ETag": f'"{s}-{p}"'})
+            archive.append(result)
+    logger.info(f"生成合成存档 {path}: {sources}个源, 每源{passes}次录制")
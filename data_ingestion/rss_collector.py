@@ -1,9 +1,20 @@
 import feedparser
 import hashlib
+import time
 from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 import logging
 from . import models, database
+from . import schedule_policy, telemetry
+from .fetcher import FeedFetcher, FetchResult
+from .feed_stream import iter_feed_entries
+from .near_duplicate import link_near_duplicates, near_duplicate_index
+from .normalize import plain_text
+from core.config import settings
 
 # 设置日志
 logging.basicConfig(
@@ -12,83 +23,355 @@ logging.basicConfig(
 )
 logger = logging.getLogger("rss_collector")
 
+# 每次IN查询的最大guid数量，避免超过SQLite的参数上限
+GUID_LOOKUP_BATCH = 500
+
+# 新文章提交后的回调，参数为新文章ID列表（如分析流水线），在采集线程中调用，不应阻塞
+new_article_listeners: List[Callable[[List[int]], None]] = []
+
+
+def insert_articles_ignore(db: Session, rows: List[Dict]) -> int:
+    """批量插入文章（不提交事务），guid已存在的行被忽略，返回插入的行数"""
+    table = models.Article.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=["guid"])
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(table).on_conflict_do_nothing(index_elements=["guid"])
+    else:
+        stmt = table.insert().prefix_with("IGNORE")
+    result = db.execute(stmt, rows)
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+
 class RSSCollector:
-    """RSS源数据采集器"""
-    
-    def __init__(self, db: Session):
+    """RSS源数据采集器
+
+    下载可以并发进行，但所有数据库写入都在调用线程中完成，
+    共享的 Session 不会被多个线程同时使用。
+    """
+
+    def __init__(self, db: Session, fetcher: Optional[FeedFetcher] = None):
         self.db = db
-    
+        self.fetcher = fetcher or FeedFetcher()
+        self._index_dirty = False  # 当前事务是否已修改近似重复索引
+        self._new_ids: List[int] = []  # 当前事务中新写入的文章ID，提交后通知订阅者
+
+    @staticmethod
+    def _conditional_headers(source: models.RSSSource) -> Dict[str, str]:
+        """根据上次响应构造条件请求头"""
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+        return headers
+
+    @staticmethod
+    def _feed_plan(source: models.RSSSource) -> Dict:
+        """工作线程解析时需要的源信息（在写库线程中预先读取）"""
+        return {
+            "known_hash": source.content_hash,
+            "high_water": source.high_water_guid_hash,
+            "limit": source.max_entries or settings.RSS_MAX_ENTRIES
+        }
+
+    @staticmethod
+    def _iter_entries(result: FetchResult):
+        if settings.RSS_STREAMING_PARSE:
+            return iter_feed_entries(result.content, result.headers)
+        return iter(feedparser.parse(result.content, response_headers=result.headers).entries)
+
+    @classmethod
+    def _parse_feed(cls, result: FetchResult, plan: Optional[Dict] = None) -> None:
+        """计算响应体哈希并解析（可在工作线程中执行，不访问数据库）
+
+        304 响应或响应体与上次相同时跳过解析。条目按文档顺序（最新在前）处理，
+        遇到上次采集的最新条目（高水位）或达到条目上限时停止。
+        """
+        plan = plan or {}
+        if result.not_modified:
+            return
+        result.content_hash = hashlib.sha256(result.content).hexdigest()
+        if plan.get("known_hash") and result.content_hash == plan["known_hash"]:
+            return
+
+        high_water = plan.get("high_water")
+        limit = plan.get("limit") or settings.RSS_MAX_ENTRIES
+        start = time.perf_counter()
+        entries = []
+        for entry in cls._iter_entries(result):
+            guid = entry.get('id') or entry.get('link')
+            if result.newest_guid is None:
+                result.newest_guid = guid
+            if high_water is not None and guid and models.guid_key(guid) == high_water:
+                break
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+        result.entries = entries
+        result.parse_time = time.perf_counter() - start
+
     def fetch_rss_feed(self, source_id: int):
         """获取单个RSS源的数据"""
         # 获取数据源信息
         source = self.db.query(models.RSSSource).filter(models.RSSSource.id == source_id).first()
-        
+
         if not source or not source.is_active:
             logger.warning(f"RSS源 {source_id} 不存在或未激活")
             return {"status": "skipped", "source_id": source_id}
-        
+
+        logger.info(f"开始获取RSS源: {source.name} ({source.url})")
+        result = self.fetcher.fetch(source.url, headers=self._conditional_headers(source))
+        if result.ok:
+            try:
+                self._parse_feed(result, self._feed_plan(source))
+            except Exception as e:
+                result.error = f"解析失败: {e}"
+        return self._store_feed(source, result)
+
+    def _record_unchanged(self, source: models.RSSSource, result: FetchResult) -> None:
+        """记录条件请求命中，累计节省的带宽和解析时间"""
+        if result.not_modified:
+            source.not_modified_count = (source.not_modified_count or 0) + 1
+            source.bytes_saved = (source.bytes_saved or 0) + (source.last_content_length or 0)
+        else:
+            source.unchanged_count = (source.unchanged_count or 0) + 1
+        source.parse_time_saved = (source.parse_time_saved or 0.0) + (source.last_parse_time or 0.0)
+        logger.info(f"RSS源 {source.name} 未变化，跳过解析")
+
+    @staticmethod
+    def _remember_validators(source: models.RSSSource, result: FetchResult) -> None:
+        """保存响应中的 ETag / Last-Modified
+
+        304 响应可能只带更新后的部分校验信息，缺少的沿用已保存的值。
+        """
+        etag = result.headers.get("ETag") or result.headers.get("etag")
+        last_modified = result.headers.get("Last-Modified") or result.headers.get("last-modified")
+        if etag or not result.not_modified:
+            source.etag = etag
+        if last_modified or not result.not_modified:
+            source.last_modified = last_modified
+
+    def _remember_response(self, source: models.RSSSource, result: FetchResult) -> None:
+        """保存本次响应的缓存校验信息"""
+        self._remember_validators(source, result)
+        # 截断的响应体不完整，不作为下次判断"未变化"的依据
+        source.content_hash = None if result.truncated else result.content_hash
+        source.last_content_length = len(result.content)
+        source.last_parse_time = result.parse_time
+
+    @staticmethod
+    def _entry_to_row(source: models.RSSSource, entry) -> Optional[Dict]:
+        """把feed条目转换为articles表的一行"""
+        # 生成唯一标识
+        guid = entry.get('id') or entry.get('link')
+        if not guid:
+            return None
+
+        # 提取发布日期
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            published_date = datetime(*entry.published_parsed[:6])
+        else:
+            published_date = datetime.now()
+
+        # 提取描述/内容
+        content = entry.get('description', '')
+        if hasattr(entry, 'content') and entry.content:
+            content = entry.content[0].value
+        # 入库时做一次规范化，之后各阶段直接读取纯文本
+        text = plain_text(content)
+
+        return {
+            "guid": guid,
+            "guid_hash": models.guid_key(guid),
+            "title": entry.get('title', ''),
+            "content": content,
+            "plain_text": text,
+            "plain_text_length": len(text),
+            "source": source.name,
+            "url": entry.get('link', ''),
+            "published_at": published_date,
+            "language": 'en',
+            "status": 'pending'
+        }
+
+    def _existing_guids(self, rows: List[Dict]) -> Set[str]:
+        """用一次集合查询（按紧凑哈希）找出已存在的guid"""
+        existing = set()
+        for i in range(0, len(rows), GUID_LOOKUP_BATCH):
+            chunk = rows[i:i + GUID_LOOKUP_BATCH]
+            matches = self.db.execute(
+                select(models.Article.guid).where(
+                    models.Article.guid_hash.in_({row["guid_hash"] for row in chunk})
+                )
+            ).scalars()
+            existing.update(matches)
+        return existing
+
+    def _insert_ignore(self, rows: List[Dict]) -> int:
+        """批量插入文章，依赖guid唯一约束忽略冲突"""
+        return insert_articles_ignore(self.db, rows)
+
+    def _store_entries(self, source: models.RSSSource, entries) -> int:
+        """查重并批量写入条目，返回新增文章数（不提交事务）"""
+        rows = {}
+        for entry in entries:
+            row = self._entry_to_row(source, entry)
+            if row and row["guid"] not in rows:
+                rows[row["guid"]] = row
+        if not rows:
+            return 0
+
+        candidates = list(rows.values())
+        existing = self._existing_guids(candidates)
+        new_rows = [row for row in candidates if row["guid"] not in existing]
+        if not new_rows:
+            return 0
+
+        for row in new_rows:
+            logger.info(f"发现新文章: {row['title']}")
+        inserted = self._insert_ignore(new_rows)
+        if not inserted:
+            return 0
+        by_guid = {row["guid"]: row for row in new_rows}
+        articles = [
+            (article_id, by_guid[guid]["title"], by_guid[guid]["plain_text"])
+            for article_id, guid in self.db.execute(
+                select(models.Article.id, models.Article.guid)
+                .where(models.Article.guid_hash.in_({row["guid_hash"] for row in new_rows}))
+                .order_by(models.Article.id)
+            )
+            if guid in by_guid
+        ]
+        self._new_ids.extend(article_id for article_id, _, _ in articles)
+        if settings.NEAR_DUP_ENABLED:
+            self._link_duplicates(articles)
+        return inserted
+
+    def _link_duplicates(self, articles: List[tuple]) -> None:
+        """把新文章（(id, title, plain_text) 列表）中与已有文章近似重复的关联到规范文章"""
+        self._index_dirty = True
+        link_near_duplicates(self.db, near_duplicate_index, articles)
+
+    def _publish_new_articles(self) -> None:
+        """事务提交后把新文章ID交给订阅者（回调出错不影响采集）"""
+        new_ids, self._new_ids = self._new_ids, []
+        if not new_ids:
+            return
+        for listener in list(new_article_listeners):
+            try:
+                listener(new_ids)
+            except Exception as e:
+                logger.error(f"通知新文章失败: {str(e)}")
+
+    def _store_feed(self, source: models.RSSSource, result: FetchResult) -> Dict:
+        """把下载结果写入数据库（只能在持有会话的线程中调用）"""
+        start = time.perf_counter()
         try:
-            # 解析RSS feed
-            logger.info(f"开始获取RSS源: {source.name} ({source.url})")
-            feed = feedparser.parse(source.url)
+            if result.error:
+                raise RuntimeError(result.error)
+            if not result.ok:
+                raise RuntimeError(f"HTTP {result.status_code}")
+
+            if result.not_modified or result.entries is None:
+                self._record_unchanged(source, result)
+                self._remember_validators(source, result)
+                now = datetime.now()
+                schedule_policy.plan_success(source, 0, now)
+                source.last_fetched = now
+                source.error_count = 0
+                self._record_telemetry(source, result, 0, start)
+                self.db.commit()
+                return {"status": "success", "source_id": source.id, "new_articles": 0, "not_modified": True}
+
+            if result.truncated:
+                logger.warning(f"RSS源 {source.name} 的响应体超过{settings.RSS_FETCH_MAX_BYTES}字节被截断，只处理了截断前的条目")
+
+            # 分批查重和写入，每批内存占用固定
             new_articles = 0
-            
-            for entry in feed.entries[:10]:  # 限制为最新的10条
-                # 生成唯一标识
-                guid = entry.get('id') or entry.get('link')
-                guid_hash = hashlib.md5(guid.encode()).hexdigest()
-                
-                # 检查是否已存在
-                existing = self.db.query(models.Article).filter_by(guid=guid).first()
-                if existing:
-                    continue
-                
-                # 提取发布日期
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_date = datetime(*entry.published_parsed[:6])
-                else:
-                    published_date = datetime.now()
-                
-                # 提取描述/内容
-                content = entry.get('description', '')
-                if hasattr(entry, 'content') and entry.content:
-                    content = entry.content[0].value
-                
-                # 创建新文章记录
-                article = models.Article(
-                    guid=guid,
-                    title=entry.title,
-                    content=content,
-                    source=source.name,
-                    url=entry.link,
-                    published_at=published_date,
-                    language='en',
-                    status='pending'
-                )
-                self.db.add(article)
-                logger.info(f"发现新文章: {entry.title}")
-                new_articles += 1
-            
-            # 更新源的最后获取时间
-            source.last_fetched = datetime.now()
+            batch_size = settings.RSS_STORE_BATCH_SIZE
+            for i in range(0, len(result.entries), batch_size):
+                new_articles += self._store_entries(source, result.entries[i:i + batch_size])
+            if result.newest_guid:
+                source.high_water_guid_hash = models.guid_key(result.newest_guid)
+
+            # 更新源的最后获取时间和缓存校验信息
+            self._remember_response(source, result)
+            now = datetime.now()
+            schedule_policy.plan_success(source, new_articles, now)
+            source.last_fetched = now
             source.error_count = 0
+            self._record_telemetry(source, result, new_articles, start)
             self.db.commit()
-            
-            return {"status": "success", "source_id": source_id, "new_articles": new_articles}
-            
+            self._index_dirty = False
+            self._publish_new_articles()
+
+            return {"status": "success", "source_id": source.id, "new_articles": new_articles}
+
         except Exception as e:
+            self.db.rollback()
+            self._new_ids = []
+            if self._index_dirty:
+                near_duplicate_index.invalidate()
+                self._index_dirty = False
             logger.error(f"获取RSS源 {source.name} 失败: {str(e)}")
-            source.error_count += 1
+            source.error_count = (source.error_count or 0) + 1
+            schedule_policy.plan_failure(source, datetime.now())
+            self._record_telemetry(source, result, 0, start, error=True)
             self.db.commit()
-            return {"status": "error", "source_id": source_id, "message": str(e)}
-    
-    def fetch_all_active_sources(self):
-        """获取所有激活的RSS源"""
+            return {"status": "error", "source_id": source.id, "message": str(e)}
+
+    def _record_telemetry(self, source: models.RSSSource, result: FetchResult, new_articles: int,
+                          start: float, error: bool = False) -> None:
+        """记录本次采集的遥测数据（写库耗时截至提交前）"""
+        if settings.TELEMETRY_ENABLED:
+            telemetry.record_fetch(self.db, source, result, new_articles, time.perf_counter() - start, error)
+
+    def fetch_all_active_sources(self, concurrent: Optional[bool] = None) -> List[Dict]:
+        """获取所有激活的RSS源
+
+        Args:
+            concurrent: 是否并发下载，None 时使用 settings.RSS_CONCURRENT_FETCH
+        """
         sources = self.db.query(models.RSSSource).filter_by(is_active=True).all()
-        results = []
-        
-        for source in sources:
-            result = self.fetch_rss_feed(source.id)
-            results.append(result)
-        
-        return results
\ No newline at end of file
+        return self._fetch_sources(sources, concurrent)
+
+    def fetch_sources(self, source_ids: List[int], concurrent: Optional[bool] = None) -> List[Dict]:
+        """获取指定的（激活的）RSS源"""
+        if not source_ids:
+            return []
+        sources = (
+            self.db.query(models.RSSSource)
+            .filter(models.RSSSource.id.in_(source_ids), models.RSSSource.is_active == True)
+            .all()
+        )
+        return self._fetch_sources(sources, concurrent)
+
+    def _fetch_sources(self, sources: List[models.RSSSource], concurrent: Optional[bool]) -> List[Dict]:
+        if concurrent is None:
+            concurrent = settings.RSS_CONCURRENT_FETCH
+
+        if not concurrent or len(sources) <= 1:
+            results = [self.fetch_rss_feed(source.id) for source in sources]
+            self._compact_telemetry()
+            return results
+
+        # 并发下载和解析，逐个在当前线程写库
+        by_id = {source.id: source for source in sources}
+        plans = {source.id: self._feed_plan(source) for source in sources}
+        jobs = [(source.id, source.url, self._conditional_headers(source)) for source in sources]
+        logger.info(f"并发获取{len(jobs)}个RSS源，并发数: {self.fetcher.max_workers}")
+
+        results_by_id = {}
+        for source_id, result in self.fetcher.fetch_many(
+            jobs, postprocess=lambda key, result: self._parse_feed(result, plans[key])
+        ):
+            results_by_id[source_id] = self._store_feed(by_id[source_id], result)
+
+        self._compact_telemetry()
+        # 保持与顺序模式相同的结果顺序
+        return [results_by_id[source.id] for source in sources]
+
+    def _compact_telemetry(self) -> None:
+        if settings.TELEMETRY_ENABLED:
+            telemetry.maybe_compact(self.db)
@@ -0,0 +1,50 @@
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from core.config import settings
+from . import models
+
+
+def clamp_interval(seconds: float) -> int:
+    """把采集间隔限制在配置的上下限之间"""
+    return int(min(max(seconds, settings.INGEST_MIN_INTERVAL), settings.INGEST_MAX_INTERVAL))
+
+
+def adapt_interval(current: int, new_articles: int, elapsed: Optional[float]) -> int:
+    """根据源的实际发布频率调整采集间隔
+
+    有新文章时，按观测到的发布速率估算积累 INGEST_TARGET_NEW 篇新文章所需的时间，
+    并与当前间隔做指数平滑；没有新文章时按 INGEST_GROWTH_FACTOR 逐步拉长间隔。
+    """
+    if new_articles > 0 and elapsed:
+        ideal = elapsed * settings.INGEST_TARGET_NEW / new_articles
+        alpha = settings.INGEST_SMOOTHING
+        return clamp_interval(alpha * ideal + (1 - alpha) * current)
+    if elapsed is None:
+        return clamp_interval(current)
+    return clamp_interval(current * settings.INGEST_GROWTH_FACTOR)
+
+
+def backoff_delay(interval: int, error_count: int, jitter: Optional[float] = None) -> int:
+    """连续失败时的指数退避时间（秒）
+
+    随机推迟最多 退避时间×jitter（默认 SCHEDULER_JITTER），同时失败的源（如网络中断）不会在同一时刻重试。
+    """
+    jitter = settings.SCHEDULER_JITTER if jitter is None else jitter
+    exponent = min(max(error_count - 1, 0), 16)
+    delay = min(clamp_interval(interval) * (2 ** exponent), settings.INGEST_MAX_BACKOFF)
+    return int(delay + random.uniform(0, delay * jitter))
+
+
+def plan_success(source: models.RSSSource, new_articles: int, now: datetime) -> None:
+    """采集成功后更新源的采集间隔和下次采集时间（需在更新 last_fetched 之前调用）"""
+    elapsed = (now - source.last_fetched).total_seconds() if source.last_fetched else None
+    source.fetch_interval = adapt_interval(source.fetch_interval or settings.INGEST_MIN_INTERVAL, new_articles, elapsed)
+    source.next_fetch_at = now + timedelta(seconds=source.fetch_interval)
+
+
+def plan_failure(source: models.RSSSource, now: datetime) -> None:
+    """采集失败后按错误次数推迟下次采集"""
+    delay = backoff_delay(source.fetch_interval or settings.INGEST_MIN_INTERVAL, source.error_count or 0)
+    source.next_fetch_at = now + timedelta(seconds=delay)
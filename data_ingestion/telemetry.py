@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from . import models
+from .fetcher import FetchResult
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("fetch_telemetry")
+
+HOUR = 3600
+DAY = 86400
+
+_compact_lock = threading.Lock()
+_last_compact = 0.0
+
+
+def percentile(pairs: Iterable[Tuple[float, int]], q: float) -> float:
+    """加权分位数（最近秩），pairs 为 (值, 权重)"""
+    ordered = sorted(pairs)
+    total = sum(weight for _, weight in ordered)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for value, weight in ordered:
+        seen += weight
+        if seen >= rank:
+            return value
+    return ordered[-1][0]
+
+
+def record_fetch(
+    db: Session,
+    source: models.RSSSource,
+    result: FetchResult,
+    new_articles: int = 0,
+    db_time: float = 0.0,
+    error: bool = False
+) -> None:
+    """写入一条原始遥测记录并刷新源的汇总（不提交事务）"""
+    db.add(models.SourceFetchStat(
+        source_id=source.id,
+        bucket_start=datetime.now(),
+        resolution=0,
+        samples=1,
+        errors=1 if error else 0,
+        unchanged=1 if not error and (result.not_modified or result.entries is None) else 0,
+        truncated=1 if result.truncated else 0,
+        wall_time=result.elapsed or 0.0,
+        latency_p50=result.elapsed or 0.0,
+        latency_p95=result.elapsed or 0.0,
+        bytes=len(result.content or b""),
+        entries=len(result.entries or ()),
+        new_articles=new_articles,
+        parse_time=result.parse_time or 0.0,
+        db_time=db_time
+    ))
+    db.flush()
+    refresh_summary(db, source.id)
+
+
+def refresh_summary(db: Session, source_id: int) -> models.SourceFetchSummary:
+    """用最近 TELEMETRY_SUMMARY_WINDOW 次原始记录重算源的汇总"""
+    rows = db.execute(
+        select(models.SourceFetchStat)
+        .where(models.SourceFetchStat.source_id == source_id, models.SourceFetchStat.resolution == 0)
+        .order_by(models.SourceFetchStat.bucket_start.desc())
+        .limit(settings.TELEMETRY_SUMMARY_WINDOW)
+    ).scalars().all()
+
+    summary = db.get(models.SourceFetchSummary, source_id)
+    if summary is None:
+        summary = models.SourceFetchSummary(source_id=source_id)
+        db.add(summary)
+
+    ok = [row for row in rows if not row.errors]
+    latencies = [(row.wall_time, 1) for row in ok]
+    entries = sum(row.entries for row in ok)
+    summary.samples = len(rows)
+    summary.errors = len(rows) - len(ok)
+    summary.truncated = sum(row.truncated or 0 for row in rows)
+    summary.latency_p50 = percentile(latencies, 0.5)
+    summary.latency_p95 = percentile(latencies, 0.95)
+    summary.avg_bytes = sum(row.bytes for row in ok) / len(ok) if ok else 0.0
+    summary.avg_entries = entries / len(ok) if ok else 0.0
+    summary.new_ratio = sum(row.new_articles for row in ok) / entries if entries else 0.0
+    summary.parse_time = sum(row.parse_time for row in ok) / len(ok) if ok else 0.0
+    summary.db_time = sum(row.db_time for row in ok) / len(ok) if ok else 0.0
+    summary.updated_at = datetime.now()
+    return summary
+
+
+def _floor(moment: datetime, resolution: int) -> datetime:
+    if resolution == DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _merge(rows: List[models.SourceFetchStat], resolution: int) -> Dict:
+    """把同一源、同一时间桶的记录合并为一行"""
+    ok = [row for row in rows if row.samples > row.errors]
+    return {
+        "source_id": rows[0].source_id,
+        "bucket_start": _floor(rows[0].bucket_start, resolution),
+        "resolution": resolution,
+        "samples": sum(row.samples for row in rows),
+        "errors": sum(row.errors for row in rows),
+        "unchanged": sum(row.unchanged for row in rows),
+        "truncated": sum(row.truncated or 0 for row in rows),
+        "wall_time": sum(row.wall_time for row in rows),
+        "latency_p50": percentile(((row.latency_p50, row.samples - row.errors) for row in ok), 0.5),
+        "latency_p95": percentile(((row.latency_p95, row.samples - row.errors) for row in ok), 0.95),
+        "bytes": sum(row.bytes for row in rows),
+        "entries": sum(row.entries for row in rows),
+        "new_articles": sum(row.new_articles for row in rows),
+        "parse_time": sum(row.parse_time for row in rows),
+        "db_time": sum(row.db_time for row in rows)
+    }
+
+
+def _downsample(db: Session, from_resolution: int, to_resolution: int, cutoff: datetime) -> int:
+    """把早于 cutoff（已对齐到桶边界）的记录合并为更粗粒度的汇总行"""
+    table = models.SourceFetchStat
+    condition = (table.resolution == from_resolution) & (table.bucket_start < cutoff)
+    rows = db.execute(select(table).where(condition)).scalars().all()
+    if not rows:
+        return 0
+
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.source_id, _floor(row.bucket_start, to_resolution))].append(row)
+    db.execute(delete(table).where(condition))
+    db.execute(table.__table__.insert(), [_merge(group, to_resolution) for group in groups.values()])
+    return len(rows)
+
+
+def compact(db: Session, now: Optional[datetime] = None) -> Dict:
+    """降采样：原始记录 -> 小时汇总 -> 天汇总，并删除过期的天汇总"""
+    now = now or datetime.now()
+    raw = _downsample(db, 0, HOUR, _floor(now - timedelta(hours=settings.TELEMETRY_RAW_RETENTION), HOUR))
+    hourly = _downsample(db, HOUR, DAY, _floor(now - timedelta(days=settings.TELEMETRY_HOURLY_RETENTION), DAY))
+    expired = db.execute(
+        delete(models.SourceFetchStat).where(
+            models.SourceFetchStat.resolution == DAY,
+            models.SourceFetchStat.bucket_start < now - timedelta(days=settings.TELEMETRY_DAILY_RETENTION)
+        )
+    ).rowcount
+    db.commit()
+    if raw or hourly or expired:
+        logger.info(f"遥测降采样: 合并原始记录{raw}条, 小时汇总{hourly}条, 删除过期记录{expired}条")
+    return {"raw": raw, "hourly": hourly, "expired": expired}
+
+
+def maybe_compact(db: Session) -> None:
+    """距上次降采样超过 TELEMETRY_COMPACT_INTERVAL 时执行一次"""
+    global _last_compact
+    with _compact_lock:
+        if _last_compact and time.monotonic() - _last_compact < settings.TELEMETRY_COMPACT_INTERVAL:
+            return
+        _last_compact = time.monotonic()
+    try:
+        compact(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"遥测降采样失败: {str(e)}")
+
+
+def summaries(db: Session) -> Dict[int, models.SourceFetchSummary]:
+    """所有源的预计算汇总，按 source_id 索引"""
+    return {summary.source_id: summary for summary in db.query(models.SourceFetchSummary).all()}
@@ -0,0 +1,217 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from . import models
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("work_queue")
+
+
+def bulk_update_articles(db: Session, rows: List[Dict], values: Optional[Dict] = None, where=None) -> int:
+    """按ID批量更新文章（不提交事务），返回实际更新的行数
+
+    列相同的行用一条 executemany UPDATE 写入（通常只有一两种列组合），行中没有的列保持不变。
+
+    Args:
+        rows: 每行包含 id 以及要更新的列
+        values: 所有行统一写入的列
+        where: 额外的更新条件（如仍持有租约）
+    """
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(key for key in row if key != "id")), []).append(row)
+
+    table = models.Article.__table__
+    updated = 0
+    for columns, group in groups.items():
+        stmt_values = {column: bindparam(f"_{column}") for column in columns}
+        stmt_values.update(values or {})
+        if not stmt_values:
+            continue
+        stmt = update(table).where(table.c.id == bindparam("_id")).values(stmt_values)
+        if where is not None:
+            stmt = stmt.where(where)
+        params = [{f"_{key}": row[key] for key in ["id", *columns]} for row in group]
+        count = db.execute(stmt, params).rowcount
+        updated += count if count is not None and count >= 0 else len(group)
+    return updated
+
+
+def default_worker_id() -> str:
+    """主机名+进程号，用于在日志和队列状态中区分工作者"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ArticleQueue:
+    """基于 articles 表的待处理文章队列（领取/租约）
+
+    工作者用一条 UPDATE 原子地领取一批文章：写入本次领取的令牌、租约到期时间并增加领取次数，
+    之后按令牌读取领取到的文章。多个进程或主机共用一个数据库时不会重复领取。
+    - 处理较久时调用 heartbeat 延长租约；
+    - 完成时按令牌写回结果，租约已被他人接手的文章不会被覆盖；
+    - 工作者崩溃时租约到期，文章可被重新领取；领取次数达到上限的文章转为 failed（死信）。
+    """
+
+    def __init__(self, lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.lease_seconds = lease_seconds or settings.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.QUEUE_MAX_ATTEMPTS
+
+    def _available(self, now: datetime):
+        article = models.Article
+        return and_(
+            article.status == "pending",
+            or_(article.lease_expires_at.is_(None), article.lease_expires_at < now)
+        )
+
+    def claim(self, db: Session, worker_id: str, limit: int,
+              ids: Optional[Iterable[int]] = None) -> Tuple[Optional[str], List[models.Article]]:
+        """领取最多 limit 篇待处理文章（提交事务），返回 (令牌, 文章列表)，没有可领取的文章时令牌为 None
+
+        Args:
+            ids: 只在这些文章中领取（如刚采集到的文章），为空时按ID顺序领取
+        """
+        now = datetime.now()
+        self.dead_letter(db, now)
+        article = models.Article
+        token = uuid.uuid4().hex
+        candidates = select(article.id).where(self._available(now), func.coalesce(article.attempts, 0) < self.max_attempts)
+        if ids is not None:
+            candidates = candidates.where(article.id.in_(list(ids)))
+        ids = candidates.order_by(article.id).limit(limit).scalar_subquery()
+        # 子查询和更新在同一条语句中执行，SQLite 的写锁保证两个工作者不会领到同一行；
+        # 条件中再次检查租约，避免在支持行级并发的数据库上重复领取
+        claimed = db.execute(
+            update(article)
+            .where(article.id.in_(ids), self._available(now))
+            .values(
+                claim_token=token,
+                claimed_by=worker_id,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                attempts=func.coalesce(article.attempts, 0) + 1
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return None, []
+        articles = db.query(article).filter(article.claim_token == token).order_by(article.id).all()
+        logger.info(f"{worker_id} 领取了{len(articles)}篇待处理文章")
+        return token, articles
+
+    def heartbeat(self, db: Session, token: str) -> int:
+        """延长本次领取的租约（提交事务），返回仍持有的文章数"""
+        article = models.Article
+        held = db.execute(
+            update(article)
+            .where(article.claim_token == token, article.status == "pending")
+            .values(lease_expires_at=datetime.now() + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return held
+
+    def complete(self, db: Session, token: str, rows: List[Dict]) -> int:
+        """写回分析结果并释放租约（不提交事务），只更新仍由该令牌持有的文章
+
+        Args:
+            rows: 每行包含 id 以及要更新的列（relevance_score、sentiment、status 等）
+
+        Returns:
+            实际写回的文章数
+        """
+        if not rows:
+            return 0
+        # 成功后清零领取次数，文章以后重新进入队列（如相关性变化）时重新计数
+        written = bulk_update_articles(
+            db, rows,
+            values=dict(claim_token=None, claimed_by=None, lease_expires_at=None, attempts=0, last_error=None),
+            where=models.Article.__table__.c.claim_token == token
+        )
+        if written < len(rows):
+            logger.warning(f"{len(rows) - written}篇文章的租约已失效，结果未写回")
+        return written
+
+    def fail(self, db: Session, token: str, error: str) -> Dict:
+        """处理失败时释放本次领取的文章（提交事务）：未达上限的可重试，达到上限的转为死信"""
+        article = models.Article
+        held = (article.claim_token == token) & (article.status == "pending")
+        dead = db.execute(
+            update(article)
+            .where(held, article.attempts >= self.max_attempts)
+            .values(status="failed", claim_token=None, lease_expires_at=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        retry = db.execute(
+            update(article)
+            .where(held)
+            .values(claim_token=None, claimed_by=None, lease_expires_at=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if dead:
+            logger.error(f"{dead}篇文章多次处理失败，已转为死信: {error}")
+        return {"retry": retry, "failed": dead}
+
+    def dead_letter(self, db: Session, now: Optional[datetime] = None) -> int:
+        """租约已到期且领取次数达到上限的文章（工作者多次崩溃）转为死信（提交事务）"""
+        now = now or datetime.now()
+        article = models.Article
+        dead = db.execute(
+            update(article)
+            .where(
+                article.status == "pending",
+                article.lease_expires_at < now,
+                article.attempts >= self.max_attempts
+            )
+            .values(status="failed", claim_token=None, lease_expires_at=None,
+                    last_error=func.coalesce(article.last_error, "租约多次到期未完成"))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if dead:
+            logger.error(f"{dead}篇文章租约多次到期未完成，已转为死信")
+        return dead
+
+    def requeue_failed(self, db: Session, ids: Optional[Iterable[int]] = None) -> int:
+        """把死信文章重新放回队列（提交事务），ids 为空时处理所有死信"""
+        article = models.Article
+        condition = article.status == "failed"
+        if ids is not None:
+            condition = condition & article.id.in_(list(ids))
+        requeued = db.execute(
+            update(article).where(condition)
+            .values(status="pending", attempts=0, claimed_by=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return requeued
+
+    def stats(self, db: Session) -> Dict:
+        """队列状态：可领取、租约中、死信的文章数"""
+        now = datetime.now()
+        article = models.Article
+        leased = (article.status == "pending") & (article.lease_expires_at >= now)
+        pending, leased_count, failed = db.execute(
+            select(
+                func.count().filter(article.status == "pending"),
+                func.count().filter(leased),
+                func.count().filter(article.status == "failed")
+            )
+        ).one()
+        return {"available": pending - leased_count, "leased": leased_count, "failed": failed}
+
+
+# 进程内共享的队列
+article_queue = ArticleQueue()
@@ -1,17 +1,14 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from core.config import settings
+from core.database import get_engine
 from core.logger import get_logger
 
 logger = get_logger("database")
 
-# 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # 仅适用于SQLite
-)
+# 创建数据库引擎（文件数据库的连接池允许跨线程使用连接）
+engine = get_engine(settings.DATABASE_URL)
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
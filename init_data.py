@@ -1,6 +1,6 @@
 import logging
 from sqlalchemy.orm import Session
-from data_ingestion.database import SessionLocal as DataSessionLocal, engine as data_engine
+from data_ingestion.database import SessionLocal as DataSessionLocal, init_db
 from data_ingestion.models import Base as DataBase, Article, RSSSource, Keyword
 
 # 设置日志
@@ -11,7 +11,7 @@ logging.basicConfig(
 logger = logging.getLogger("init_data")
 
 # 创建数据表
-DataBase.metadata.create_all(bind=data_engine)
+init_db()
 
 def init_rss_sources():
     """初始化一些澳大利亚新闻的RSS源"""
@@ -82,7 +82,7 @@ def init_keywords():
 
 if __name__ == "__main__":
     # 确保数据表已创建
-    DataBase.metadata.create_all(bind=data_engine)
+    init_db()
     
     # 初始化RSS源
     init_rss_sources()
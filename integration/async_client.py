@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from core.config import settings
+from .service_client import RETRY_STATUS, encode_body, retry_delay
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("async_service_client")
+
+class AsyncServiceClient:
+    """服务间通信的异步客户端（httpx）
+
+    与 ServiceClient 的超时、重试和压缩规则相同；多个请求可以在同一连接池上并发，
+    用 async with 管理连接池的生命周期。
+    """
+
+    def __init__(self, base_url: str, timeout: Optional[httpx.Timeout] = None, retries: Optional[int] = None):
+        self.base_url = base_url
+        self.retries = settings.SERVICE_RETRIES if retries is None else retries
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout or httpx.Timeout(settings.SERVICE_READ_TIMEOUT, connect=settings.SERVICE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.SERVICE_POOL_SIZE,
+                max_keepalive_connections=settings.SERVICE_POOL_SIZE
+            )
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Any] = None,
+                            idempotent: Optional[bool] = None) -> Any:
+        """发送HTTP请求，可重试的错误按退避重试，其他错误直接抛出
+        
+        Args:
+            idempotent: 重复发送是否安全，默认GET为是、POST为否
+        """
+        url = f"/{endpoint.lstrip('/')}"
+        if idempotent is None:
+            idempotent = method.lower() == 'get'
+        if method.lower() == 'get':
+            kwargs = {"params": data}
+        elif method.lower() == 'post':
+            body, headers = encode_body(data)
+            kwargs = {"content": body, "headers": headers}
+        else:
+            raise ValueError(f"不支持的HTTP方法: {method}")
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.request(method.upper(), url, **kwargs)
+                if not idempotent or response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                # 连接失败、超时；读取超时或连接中断时服务端可能已经执行了请求，非幂等请求只在连接未建立时重试
+                not_sent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if attempt >= self.retries or not (idempotent or not_sent):
+                    logger.error(f"请求失败 ({self.base_url}{url})，已重试{attempt}次: {str(e)}")
+                    raise
+                error = str(e)
+            except httpx.HTTPError as e:
+                logger.error(f"请求失败 ({self.base_url}{url}): {str(e)}")
+                raise
+            delay = retry_delay(attempt)
+            logger.warning(f"请求失败 ({self.base_url}{url}): {error}，{delay:.2f}秒后重试")
+            await asyncio.sleep(delay)
+
+class AsyncContentAnalysisClient(AsyncServiceClient):
+    """内容分析服务异步客户端"""
+
+    def __init__(self, base_url: str = "http://localhost:8002", **kwargs):
+        super().__init__(base_url, **kwargs)
+
+    async def analyze_article(self, article_id: int, title: str, content: str) -> Dict:
+        """分析单篇文章"""
+        data = {
+            "article_id": article_id,
+            "title": title,
+            "content": content
+        }
+        return await self._make_request('post', '/analyze', data, idempotent=True)
+
+    async def batch_analyze(self, articles: List[Dict]) -> List[Dict]:
+        """批量分析文章"""
+        return await self._make_request('post', '/batch-analyze', articles, idempotent=True)
+
+class AsyncDataIngestionClient(AsyncServiceClient):
+    """数据采集服务异步客户端"""
+
+    def __init__(self, base_url: str = "http://localhost:8001", **kwargs):
+        super().__init__(base_url, **kwargs)
+
+    async def get_pending_articles(self, after_id: int = 0, limit: int = 100) -> Dict:
+        """按ID游标获取一页待处理文章（含正文）"""
+        return await self._make_request('get', '/articles/pending', {"after_id": after_id, "limit": limit})
+
+    async def bulk_update_articles(self, rows: List[Dict]) -> Dict:
+        """在一个事务中批量更新文章"""
+        return await self._make_request('post', '/articles/bulk-update', rows, idempotent=True)
+
+    async def claim_articles(self, worker_id: str, limit: int = 10) -> Dict:
+        """领取待处理文章，返回 {"token": ..., "articles": [...]}"""
+        return await self._make_request('post', '/queue/claim', {"worker_id": worker_id, "limit": limit})
+
+    async def complete_articles(self, token: str, rows: List[Dict]) -> Dict:
+        """写回分析结果并释放租约"""
+        return await self._make_request('post', f'/queue/{token}/complete', rows)
+
+    async def fail_articles(self, token: str, error: str) -> Dict:
+        """处理失败，释放租约"""
+        return await self._make_request('post', f'/queue/{token}/fail', {"error": error})
@@ -1,6 +1,9 @@
+import asyncio
 import logging
+import os
+import socket
 import time
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .service_client import ContentAnalysisClient, DataIngestionClient
 
 # 设置日志
@@ -13,60 +16,163 @@ logger = logging.getLogger("integration_processor")
 class IntegrationProcessor:
     """集成处理器，用于协调不同服务之间的工作流"""
     
-    def __init__(self):
+    def __init__(self, worker_id: str = None):
         self.content_client = ContentAnalysisClient()
         self.data_client = DataIngestionClient()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    
+    @staticmethod
+    def _analysis_requests(articles: List[Dict]) -> List[Dict]:
+        """领取到的文章转换为批量分析请求"""
+        return [
+            {"article_id": article["id"], "title": article["title"], "content": article.get("plain_text", "")}
+            for article in articles
+        ]
+    
+    @staticmethod
+    def _result_rows(articles: List[Dict], analysis_results: List[Dict]) -> List[Dict]:
+        """分析结果转换为写回的行"""
+        rows = []
+        for article, result in zip(articles, analysis_results):
+            row = {
+                "id": article["id"],
+                "relevance_score": result["relevance_score"],
+                "sentiment": result.get("sentiment"),
+                "status": "processed"
+            }
+            if result.get("irrelevant"):
+                # 未通过相关性阈值，没有情感得分
+                row["status"] = "irrelevant"
+            rows.append(row)
+        return rows
     
     def process_pending_articles(self, limit: int = 10) -> Dict:
-        """处理待分析的文章"""
+        """领取并处理待分析的文章，多个处理器同时运行时不会重复分析"""
+        token = None
         try:
-            # 获取最新的待处理文章
-            articles = self.data_client.get_articles(limit=limit)
+            # 领取一批待处理文章（带租约）
+            claim = self.data_client.claim_articles(self.worker_id, limit=limit)
+            token = claim.get("token")
+            pending_articles = claim.get("articles", [])
             
-            if not articles:
+            if not token or not pending_articles:
                 logger.info("没有发现待处理的文章")
                 return {"status": "success", "processed": 0}
-            
-            # 只处理状态为pending的文章
-            pending_articles = [a for a in articles if a.get('status') == 'pending']
-            
-            if not pending_articles:
-                logger.info(f"没有发现状态为'pending'的文章")
-                return {"status": "success", "processed": 0}
                 
-            logger.info(f"发现{len(pending_articles)}篇待处理文章")
-            
-            # 准备批量分析请求
-            analysis_requests = []
-            for article in pending_articles:
-                analysis_requests.append({
-                    "article_id": article["id"],
-                    "title": article["title"],
-                    "content": article.get("content", "")
-                })
+            logger.info(f"领取了{len(pending_articles)}篇待处理文章")
             
             # 批量分析文章
-            analysis_results = self.content_client.batch_analyze(analysis_requests)
+            analysis_results = self.content_client.batch_analyze(self._analysis_requests(pending_articles))
             
-            # 处理结果
-            processed_count = 0
-            for i, result in enumerate(analysis_results):
-                article_id = pending_articles[i]["id"]
-                
-                # 准备更新数据
-                update_data = {
-                    "relevance_score": result["relevance_score"],
-                    "sentiment": result["sentiment"],
-                    "status": "processed"
-                }
-                
-                # 更新文章信息
-                self.data_client.update_article(article_id, update_data)
-                processed_count += 1
+            # 一次请求写回全部结果并释放租约
+            rows = self._result_rows(pending_articles, analysis_results)
+            processed_count = self.data_client.complete_articles(token, rows)["written"]
                 
             logger.info(f"成功处理了{processed_count}篇文章")
             return {"status": "success", "processed": processed_count}
             
         except Exception as e:
             logger.error(f"处理文章时出错: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            if token:
+                try:
+                    # 释放租约，文章可被重试或转为死信
+                    self.data_client.fail_articles(token, str(e))
+                except Exception as release_error:
+                    logger.error(f"释放租约失败，等待租约到期: {str(release_error)}")
+            return {"status": "error", "message": str(e)}
+    
+    async def process_pending_pipelined(self, limit: int = 10, max_batches: Optional[int] = None) -> Dict:
+        """领取、分析、写回三个阶段重叠执行，直到没有待处理文章
+        
+        分析一批的同时领取下一批并写回上一批，阶段之间的队列只容纳一批（背压）。
+        某一批分析或写回失败时释放它的租约，其他批次继续。需要安装 httpx。
+        
+        Args:
+            limit: 每批领取的文章数
+            max_batches: 最多处理的批数，为空时处理到队列为空
+        """
+        from .async_client import AsyncContentAnalysisClient, AsyncDataIngestionClient
+        
+        claimed: asyncio.Queue = asyncio.Queue(maxsize=1)
+        analyzed: asyncio.Queue = asyncio.Queue(maxsize=1)
+        counts = {"batches": 0, "processed": 0, "failed_batches": 0}
+        stopped = asyncio.Event()  # 下游阶段意外退出后不再领取新批次
+        
+        async with AsyncDataIngestionClient() as data_client, AsyncContentAnalysisClient() as content_client:
+            async def release(token: str, error: Exception) -> None:
+                counts["failed_batches"] += 1
+                logger.error(f"处理文章时出错: {str(error)}")
+                try:
+                    await data_client.fail_articles(token, str(error))
+                except Exception as release_error:
+                    logger.error(f"释放租约失败，等待租约到期: {str(release_error)}")
+            
+            async def claim_stage() -> None:
+                try:
+                    while not stopped.is_set() and (max_batches is None or counts["batches"] < max_batches):
+                        claim = await data_client.claim_articles(self.worker_id, limit=limit)
+                        if not claim.get("token") or not claim.get("articles"):
+                            break
+                        counts["batches"] += 1
+                        await claimed.put(claim)
+                finally:
+                    await claimed.put(None)
+            
+            async def analyze_stage() -> None:
+                finished = False
+                current = None  # 正在分析的批次
+                try:
+                    while (current := await claimed.get()) is not None:
+                        try:
+                            results = await content_client.batch_analyze(self._analysis_requests(current["articles"]))
+                            rows = self._result_rows(current["articles"], results)
+                        except Exception as e:
+                            await release(current["token"], e)
+                        else:
+                            await analyzed.put((current["token"], rows))
+                        current = None
+                    finished = True
+                finally:
+                    if not finished:
+                        # 本阶段意外退出时停止领取，并释放正在分析和队列中已领取的批次，领取阶段不会阻塞在队列上
+                        stopped.set()
+                        if current is not None:
+                            await release(current["token"], RuntimeError("分析阶段已退出"))
+                        while (claim := await claimed.get()) is not None:
+                            await release(claim["token"], RuntimeError("分析阶段已退出"))
+                    await analyzed.put(None)
+            
+            async def complete_stage() -> None:
+                finished = False
+                item = None
+                try:
+                    while (item := await analyzed.get()) is not None:
+                        token, rows = item
+                        try:
+                            counts["processed"] += (await data_client.complete_articles(token, rows))["written"]
+                        except Exception as e:
+                            await release(token, e)
+                        item = None
+                    finished = True
+                finally:
+                    if not finished:
+                        stopped.set()
+                        if item is not None:
+                            await release(item[0], RuntimeError("写回阶段已退出"))
+                        while (item := await analyzed.get()) is not None:
+                            await release(item[0], RuntimeError("写回阶段已退出"))
+            
+            # 任一阶段出错时，其他阶段处理或释放完已领取的批次后结束
+            errors = [
+                result for result in await asyncio.gather(
+                    claim_stage(), analyze_stage(), complete_stage(), return_exceptions=True
+                )
+                if isinstance(result, BaseException)
+            ]
+            if errors:
+                message = str(errors[0]) or type(errors[0]).__name__
+                logger.error(f"流水线处理出错: {message}")
+                return {"status": "error", "message": message, **counts}
+        
+        logger.info(f"流水线处理了{counts['batches']}批，共{counts['processed']}篇文章")
+        return {"status": "success", **counts}
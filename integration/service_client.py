@@ -1,6 +1,13 @@
+import gzip
+import json
+import random
+import time
 import requests
 import logging
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from typing import Dict, List, Any, Optional, Tuple
+from core.config import settings
 
 # 设置日志
 logging.basicConfig(
@@ -9,29 +16,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger("service_client")
 
+# 可以重试的响应状态（网关错误、服务暂不可用）
+RETRY_STATUS = {502, 503, 504}
+
+def encode_body(data: Any) -> Tuple[bytes, Dict[str, str]]:
+    """把请求数据编码为JSON，较大的请求体（如批量分析）gzip压缩"""
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= settings.SERVICE_GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+def request_not_sent(error: requests.exceptions.RequestException) -> bool:
+    """请求是否确定没有发到服务端（连接未建立），只有这种错误可以重试非幂等的POST"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def retry_delay(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间：指数退避加完全随机抖动，避免多个工作者同时重试"""
+    return random.uniform(0, settings.SERVICE_RETRY_BACKOFF * (2 ** attempt))
+
 class ServiceClient:
-    """服务间通信客户端"""
+    """服务间通信客户端
+
+    使用保持连接的会话（连接池）复用TCP连接，请求带超时；幂等请求在连接失败、超时和
+    502/503/504 时按指数退避加抖动重试，非幂等请求（如领取文章）只在连接未建立时重试，
+    较大的请求体gzip压缩（响应由服务端按大小压缩）。
+    """
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, timeout: Optional[Tuple[float, float]] = None, retries: Optional[int] = None):
         self.base_url = base_url
+        self.timeout = timeout or (settings.SERVICE_CONNECT_TIMEOUT, settings.SERVICE_READ_TIMEOUT)
+        self.retries = settings.SERVICE_RETRIES if retries is None else retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.SERVICE_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        self.session.close()
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Any] = None,
+                      idempotent: Optional[bool] = None) -> Any:
+        """发送HTTP请求，可重试的错误按退避重试，其他错误直接抛出
         
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-        """发送HTTP请求"""
+        Args:
+            idempotent: 重复发送是否安全，默认GET为是、POST为否
+        """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        if idempotent is None:
+            idempotent = method.lower() == 'get'
+        if method.lower() == 'get':
+            kwargs = {"params": data}
+        elif method.lower() == 'post':
+            body, headers = encode_body(data)
+            kwargs = {"data": body, "headers": headers}
+        else:
+            raise ValueError(f"不支持的HTTP方法: {method}")
         
-        try:
-            if method.lower() == 'get':
-                response = requests.get(url, params=data)
-            elif method.lower() == 'post':
-                response = requests.post(url, json=data)
-            else:
-                raise ValueError(f"不支持的HTTP方法: {method}")
-                
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"请求失败 ({url}): {str(e)}")
-            raise
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.request(method.upper(), url, timeout=self.timeout, **kwargs)
+                if not idempotent or response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # 读取超时或连接中断时服务端可能已经执行了请求，非幂等请求不重试
+                if attempt >= self.retries or not (idempotent or request_not_sent(e)):
+                    logger.error(f"请求失败 ({url})，已重试{attempt}次: {str(e)}")
+                    raise
+                error = str(e)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"请求失败 ({url}): {str(e)}")
+                raise
+            delay = retry_delay(attempt)
+            logger.warning(f"请求失败 ({url}): {error}，{delay:.2f}秒后重试")
+            time.sleep(delay)
 
 class ContentAnalysisClient(ServiceClient):
     """内容分析服务客户端"""
@@ -46,11 +110,11 @@ class ContentAnalysisClient(ServiceClient):
             "title": title,
             "content": content
         }
-        return self._make_request('post', '/analyze', data)
+        return self._make_request('post', '/analyze', data, idempotent=True)
     
     def batch_analyze(self, articles: List[Dict]) -> List[Dict]:
         """批量分析文章"""
-        return self._make_request('post', '/batch-analyze', articles)
+        return self._make_request('post', '/batch-analyze', articles, idempotent=True)
 
 class DataIngestionClient(ServiceClient):
     """数据采集服务客户端"""
@@ -64,4 +128,28 @@ class DataIngestionClient(ServiceClient):
     
     def update_article(self, article_id: int, data: Dict) -> Dict:
         """更新文章信息"""
-        return self._make_request('post', f'/articles/{article_id}/update', data)
\ No newline at end of file
+        return self._make_request('post', f'/articles/{article_id}/update', data, idempotent=True)
+    
+    def get_pending_articles(self, after_id: int = 0, limit: int = 100) -> Dict:
+        """按ID游标获取一页待处理文章（含正文），返回 {"articles": [...], "next_cursor": ...}"""
+        return self._make_request('get', '/articles/pending', {"after_id": after_id, "limit": limit})
+    
+    def bulk_update_articles(self, rows: List[Dict]) -> Dict:
+        """在一个事务中批量更新文章，每行包含 id 以及要更新的列"""
+        return self._make_request('post', '/articles/bulk-update', rows, idempotent=True)
+    
+    def claim_articles(self, worker_id: str, limit: int = 10) -> Dict:
+        """领取待处理文章，返回 {"token": ..., "articles": [...]}"""
+        return self._make_request('post', '/queue/claim', {"worker_id": worker_id, "limit": limit})
+    
+    def heartbeat(self, token: str) -> Dict:
+        """延长租约"""
+        return self._make_request('post', f'/queue/{token}/heartbeat', idempotent=True)
+    
+    def complete_articles(self, token: str, rows: List[Dict]) -> Dict:
+        """写回分析结果并释放租约"""
+        return self._make_request('post', f'/queue/{token}/complete', rows)
+    
+    def fail_articles(self, token: str, error: str) -> Dict:
+        """处理失败，释放租约"""
+        return self._make_request('post', f'/queue/{token}/fail', {"error": error})
\ No newline at end of file
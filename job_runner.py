@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from data_ingestion.database import SessionLocal
+from data_ingestion.models import JobRun
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("job_runner")
+
+# 从任务结果中读取处理条目数的字段，依次尝试
+ITEM_KEYS = ("processed", "reevaluated", "new_articles", "rescored")
+
+
+def count_items(result: Any) -> Optional[int]:
+    """从任务结果中取处理的条目数：字典取第一个计数字段，列表（如各源的采集结果）求和"""
+    if isinstance(result, dict):
+        for key in ITEM_KEYS:
+            if isinstance(result.get(key), int):
+                return result[key]
+        return None
+    if isinstance(result, list):
+        counts = [count_items(item) for item in result]
+        return sum(count for count in counts if count is not None)
+    return None
+
+
+class JobRunner:
+    """手动触发的后台任务执行器
+
+    任务在有界线程池中执行，每次运行写入 job_runs 表（开始/结束时间、条目数、吞吐量、
+    结果或错误）。同名任务正在执行（或排队）时再次触发会合并到这次运行，不会重叠执行；
+    rerun=True 的任务在执行期间再次触发时，本次结束后再运行一次（多次触发只补一次）。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or settings.JOB_MAX_WORKERS, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Optional[int]] = {}  # 任务名 -> 运行记录ID（排队时为空）
+        self._started: Set[str] = set()  # 已开始执行（不在排队）的任务
+        self._rerun: Dict[str, Callable[[], Any]] = {}  # 结束后需要再运行一次的任务
+
+    def submit(self, job: str, func: Callable[[], Any], rerun: bool = False) -> bool:
+        """提交任务，返回是否合并到已有运行
+
+        只在内存中登记，运行记录由工作线程写入，可以在事件循环中直接调用（写锁被占用时也不会阻塞）。
+
+        Args:
+            rerun: 任务已开始执行时，结束后再运行一次，用于执行期间输入又发生变化的任务
+        """
+        with self._lock:
+            if job in self._in_flight:
+                if rerun and job in self._started:
+                    self._rerun[job] = func
+                    logger.info(f"任务 {job} 正在执行，结束后再运行一次")
+                else:
+                    logger.info(f"任务 {job} 正在执行，本次触发已合并")
+                return True
+            self._in_flight[job] = None
+        self.executor.submit(self._execute, job, func)
+        return False
+
+    def is_running(self, job: str) -> bool:
+        with self._lock:
+            return job in self._in_flight
+
+    def _start_run(self, job: str) -> int:
+        db = self.session_factory()
+        try:
+            run = JobRun(job=job, status="running", started_at=datetime.now())
+            db.add(run)
+            db.commit()
+            return run.id
+        finally:
+            db.close()
+
+    def _execute(self, job: str, func: Callable[[], Any]) -> None:
+        run_id = None
+        try:
+            run_id = self._start_run(job)
+        except Exception as e:
+            # 运行记录写入失败不影响任务本身
+            logger.error(f"记录任务 {job} 的运行失败: {str(e)}")
+        with self._lock:
+            self._in_flight[job] = run_id
+            self._started.add(job)
+        start = time.perf_counter()
+        values: Dict[str, Any] = {}
+        try:
+            result = func()
+            values["result"] = str(result)[:2000]
+            if isinstance(result, dict) and result.get("status") == "error":
+                # 处理器出错时返回错误结果而不抛出异常
+                values.update(status="error", error=str(result.get("message")))
+            else:
+                values["status"] = "success"
+            values["items"] = count_items(result)
+        except Exception as e:
+            logger.error(f"任务 {job} 执行失败: {str(e)}")
+            values.update(status="error", error=str(e))
+        duration = time.perf_counter() - start
+        values.update(finished_at=datetime.now(), duration=duration)
+        if values.get("items") is not None and duration > 0:
+            values["throughput"] = values["items"] / duration
+        if run_id is not None:
+            try:
+                self._finish_run(run_id, values)
+            except Exception as e:
+                logger.error(f"记录任务 {job} 的运行结果失败（运行#{run_id}）: {str(e)}")
+        with self._lock:
+            self._in_flight.pop(job, None)
+            self._started.discard(job)
+            follow_up = self._rerun.pop(job, None)
+        logger.info(f"任务 {job} 完成（运行#{run_id}）: {values['status']}，耗时{duration:.2f}秒，条目数 {values.get('items')}")
+        if follow_up is not None:
+            self.submit(job, follow_up)
+
+    def _finish_run(self, run_id: int, values: Dict[str, Any]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(update(JobRun).where(JobRun.id == run_id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+    def recover(self) -> int:
+        """把上次进程退出时仍在运行的记录标记为中断（启动时调用）"""
+        db = self.session_factory()
+        try:
+            interrupted = db.execute(
+                update(JobRun).where(JobRun.status == "running").values(status="interrupted", finished_at=datetime.now())
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if interrupted:
+            logger.warning(f"{interrupted}个任务在上次退出时未完成，已标记为中断")
+        return interrupted
+
+    def recent_runs(self, limit: int = 20) -> List[JobRun]:
+        """最近的运行记录（新的在前）"""
+        db = self.session_factory()
+        try:
+            return db.query(JobRun).order_by(JobRun.id.desc()).limit(limit).all()
+        finally:
+            db.close()
+
+
+# 进程内共享的任务执行器
+job_runner = JobRunner()
@@ -1,11 +1,21 @@
 import logging
+import threading
 import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from content_analysis.analyzer import ContentAnalyzer
+from content_analysis.keyword_index import keyword_index
+from content_analysis.keyword_snapshot import analyzer_snapshot
+from content_analysis.parallel import parallel_analyzer
+from core.config import settings
+from data_ingestion.checkpoint import advance_checkpoint, finish_checkpoint, resume_checkpoint
 from data_ingestion.database import SessionLocal
-from data_ingestion.models import Article, Keyword
+from data_ingestion.models import Article
+from data_ingestion.work_queue import article_queue, default_worker_id
 
 # 设置日志
 logging.basicConfig(
@@ -14,72 +24,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger("local_processor")
 
+class LatencyTracker:
+    """文章从写入数据库（采集）到分析结果写回的端到端延迟（进程内统计最近的文章）"""
+    
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+    
+    def record(self, created_at: Iterable[Optional[datetime]], finished_at: Optional[datetime] = None) -> None:
+        finished_at = finished_at or datetime.now()
+        samples = [(finished_at - created).total_seconds() for created in created_at if created is not None]
+        with self._lock:
+            self._samples.extend(samples)
+            self.count += len(samples)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        if not samples:
+            return {"count": count, "p50": None, "p95": None, "max": None}
+        return {
+            "count": count,
+            "p50": samples[len(samples) // 2],
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max": samples[-1]
+        }
+
 class LocalProcessor:
     """本地处理器，直接处理数据库中的文章，不通过HTTP请求"""
     
-    def __init__(self):
+    def __init__(self, worker_id: Optional[str] = None):
         self.analyzer = None  # 延迟初始化
+        self.worker_id = worker_id or default_worker_id()
     
     def get_analyzer(self, db: Session) -> ContentAnalyzer:
-        """获取或创建内容分析器，使用数据库中的关键词"""
-        if not self.analyzer:
-            # 从数据库获取活跃的关键词
-            keywords = db.query(Keyword).filter(Keyword.is_active == True).all()
-            
-            # 创建关键词权重字典
-            keyword_weights = {}
-            for kw in keywords:
-                keyword_weights[kw.word] = kw.weight
-            
-            # 如果没有关键词，添加一些默认关键词
-            if not keyword_weights:
-                keyword_weights = {
-                    "chinese students": 3.0,
-                    "international students": 2.5,
-                    "adelaide": 2.0,
-                    "安全": 2.0,
-                    "留学生": 3.0
-                }
-            
-            # 创建分析器
-            self.analyzer = ContentAnalyzer(keyword_weights=keyword_weights)
-            logger.info(f"初始化分析器，使用{len(keyword_weights)}个关键词")
-        
+        """获取与数据库中当前关键词一致的内容分析器
+
+        分析器由进程内共享的快照提供，关键词版本变化时才会重新构建。
+        """
+        self.analyzer = analyzer_snapshot.get(db)
         return self.analyzer
     
-    def process_pending_articles(self, limit: int = 10) -> Dict:
-        """处理待分析的文章"""
+    def score_articles(self, analyzer: ContentAnalyzer, articles: List[Article]) -> Iterator[Tuple[int, float, Optional[float]]]:
+        """逐篇返回 (article_id, relevance_score, sentiment)，未通过相关性阈值的文章 sentiment 为 None"""
+        return self.score_items(analyzer, [(article.id, article.title, article.text) for article in articles])
+    
+    def score_items(self, analyzer: ContentAnalyzer, items: List[Tuple[int, str, str]]) -> Iterator[Tuple[int, float, Optional[float]]]:
+        """与 score_articles 相同，输入为 (article_id, title, content) 列表
+
+        配置了多个分析进程且文章数达到 ANALYSIS_PARALLEL_MIN 时使用进程池，否则在当前进程中批量分析。
+        """
+        if settings.ANALYSIS_WORKERS > 1 and len(items) >= settings.ANALYSIS_PARALLEL_MIN:
+            logger.info(f"使用{settings.ANALYSIS_WORKERS}个进程并行分析{len(items)}篇文章")
+            yield from parallel_analyzer.analyze(analyzer, items)
+            return
+        results = analyzer.analyze_articles([(title, content) for _, title, content in items])
+        for (article_id, _, _), result in zip(items, results):
+            yield article_id, result["relevance_score"], result["sentiment"]
+    
+    @staticmethod
+    def _write_batch(db: Session, rows: List[Dict], texts: Optional[Dict[int, Tuple[str, str]]] = None) -> None:
+        """批量写入分析结果并提交，同时记录这批文章的关键词出现次数"""
+        if rows:
+            db.bulk_update_mappings(Article, rows)
+            if texts is not None:
+                keyword_index.index_articles(db, [(row["id"], *texts[row["id"]]) for row in rows])
+            db.commit()
+    
+    @staticmethod
+    def _complete_batch(db: Session, token: str, rows: List[Dict], texts: Dict[int, Tuple[str, str]]) -> int:
+        """写回仍持有租约的文章的分析结果，记录关键词计数并提交，然后续租"""
+        written = article_queue.complete(db, token, rows)
+        keyword_index.index_articles(db, [(row["id"], *texts[row["id"]]) for row in rows])
+        db.commit()
+        article_queue.heartbeat(db, token)
+        return written
+    
+    def process_pending_articles(self, limit: int = 10, ids: Optional[Iterable[int]] = None) -> Dict:
+        """处理待分析的文章
+        
+        通过队列领取文章，多个工作者（后台线程、手动任务、其他进程或主机）同时运行时
+        不会重复分析同一篇文章。处理出错时释放租约，文章稍后重试，多次失败转为死信。
+        
+        Args:
+            ids: 只处理这些文章（如流水线收到的新文章），为空时按ID顺序领取
+        """
         try:
             db = SessionLocal()
             
             try:
-                # 获取最新的待处理文章
-                pending_articles = db.query(Article).filter(Article.status == "pending").limit(limit).all()
+                # 领取待处理文章
+                token, pending_articles = article_queue.claim(db, self.worker_id, limit, ids=ids)
                 
                 if not pending_articles:
                     logger.info("没有发现待处理的文章")
                     return {"status": "success", "processed": 0}
                     
-                logger.info(f"发现{len(pending_articles)}篇待处理文章")
+                logger.info(f"领取了{len(pending_articles)}篇待处理文章")
                 
-                # 获取分析器(使用数据库中的关键词)
-                analyzer = self.get_analyzer(db)
-                
-                # 处理文章
-                processed_count = 0
-                for article in pending_articles:
-                    # 分析文章
-                    result = analyzer.analyze_article(article.title, article.content or "")
+                try:
+                    # 获取分析器(使用数据库中的关键词)
+                    analyzer = self.get_analyzer(db)
                     
-                    # 更新文章信息
-                    article.relevance_score = result["relevance_score"]
-                    article.sentiment = result["sentiment"]
-                    article.status = "processed"
+                    # 处理文章，分析结果分批写库，每批写入后续租
+                    texts = {article.id: (article.title, article.text) for article in pending_articles}
+                    created_at = [article.created_at for article in pending_articles]
+                    processed_count = 0
+                    rows = []
+                    for article_id, relevance_score, sentiment in self.score_articles(analyzer, pending_articles):
+                        rows.append({
+                            "id": article_id,
+                            "relevance_score": relevance_score,
+                            "sentiment": sentiment,
+                            "status": "processed" if sentiment is not None else "irrelevant"
+                        })
+                        if len(rows) >= settings.ANALYSIS_WRITE_BATCH:
+                            processed_count += self._complete_batch(db, token, rows, texts)
+                            rows = []
                     
-                    processed_count += 1
-                
-                # 提交所有更改
-                db.commit()
+                    # 提交剩余的更改
+                    processed_count += self._complete_batch(db, token, rows, texts)
+                    analysis_latency.record(created_at)
+                except Exception as e:
+                    db.rollback()
+                    article_queue.fail(db, token, str(e))
+                    raise
                     
                 logger.info(f"成功处理了{processed_count}篇文章")
                 return {"status": "success", "processed": processed_count}
@@ -91,52 +162,160 @@ class LocalProcessor:
             logger.error(f"处理文章时出错: {str(e)}")
             return {"status": "error", "message": str(e)}
     
-    def reevaluate_articles(self, limit: int = 500) -> Dict:
-        """根据最新关键词重新评估已处理的文章"""
+    def reevaluate_articles(self, limit: Optional[int] = None, resume: bool = True) -> Dict:
+        """根据最新关键词重新评估已处理的文章
+        
+        按ID分页（id > 上一批最大ID）只读取需要的列，每批分析后写库、记录断点并提交，
+        内存占用和单个写事务的长度只与批大小有关。中断后再次运行从断点继续，
+        关键词、阈值或情感分析器变化时从头开始。
+        
+        Args:
+            limit: 本次最多评估的文章数，为空时评估到最后；未评估的部分下次运行继续
+            resume: 是否从上一轮未完成的断点继续
+        """
         try:
             db = SessionLocal()
             
             try:
-                # 强制初始化一个新的分析器，使用最新的关键词
-                self.analyzer = None
+                # 获取使用最新关键词的分析器
                 analyzer = self.get_analyzer(db)
+                context = f"keywords:{analyzer_snapshot.version};threshold:{analyzer.relevance_threshold};{analyzer.sentiment_version}"
+                checkpoint = resume_checkpoint(db, "reevaluate_articles", context, resume=resume)
+                db.commit()
                 
-                # 获取已处理的文章
-                processed_articles = db.query(Article).filter(Article.status == "processed").limit(limit).all()
+                # 已处理的文章（包括不相关的，关键词变化后可能变为相关）
+                reevaluable = Article.status.in_(("processed", "irrelevant"))
+                total = db.query(func.count(Article.id)).filter(reevaluable, Article.id > checkpoint.last_id).scalar()
+                if limit is not None:
+                    total = min(total, limit)
                 
-                if not processed_articles:
-                    logger.info("没有发现已处理的文章")
+                if not total:
+                    finish_checkpoint(checkpoint)
+                    db.commit()
+                    logger.info("没有发现需要重新评估的文章")
                     return {"status": "success", "reevaluated": 0}
                     
-                logger.info(f"重新评估{len(processed_articles)}篇已处理文章")
+                logger.info(f"重新评估{total}篇已处理文章（从ID {checkpoint.last_id} 之后开始）")
                 
-                # 重新评估文章
                 reevaluated_count = 0
-                for article in processed_articles:
-                    # 分析文章
-                    result = analyzer.analyze_article(article.title, article.content or "")
-                    
-                    # 更新文章信息
-                    old_relevance = article.relevance_score
-                    old_sentiment = article.sentiment
-                    article.relevance_score = result["relevance_score"]
-                    article.sentiment = result["sentiment"]
+                finished = False
+                while reevaluated_count < total:
+                    page_size = min(settings.ANALYSIS_WRITE_BATCH, total - reevaluated_count)
+                    page = db.query(
+                        Article.id, Article.title, func.coalesce(Article.plain_text, Article.content),
+                        Article.relevance_score, Article.sentiment
+                    ).filter(reevaluable, Article.id > checkpoint.last_id).order_by(Article.id).limit(page_size).all()
+                    if not page:
+                        finished = True
+                        break
                     
-                    # 记录变化
-                    if old_relevance != article.relevance_score or old_sentiment != article.sentiment:
-                        logger.debug(f"文章#{article.id} 评分变化: 相关性 {old_relevance:.2f} -> {article.relevance_score:.2f}, 情感 {old_sentiment:.2f} -> {article.sentiment:.2f}")
+                    old_scores = {article_id: (relevance, sentiment) for article_id, _, _, relevance, sentiment in page}
+                    texts = {article_id: (title, content or "") for article_id, title, content, _, _ in page}
+                    rows = []
+                    for article_id, relevance_score, sentiment in self.score_items(analyzer, [(article_id, *text) for article_id, text in texts.items()]):
+                        row = {"id": article_id, "relevance_score": relevance_score, "status": "irrelevant"}
+                        if sentiment is not None:
+                            # 不相关的文章保留原有情感得分
+                            row.update(sentiment=sentiment, status="processed")
+                        rows.append(row)
+                        
+                        # 记录变化
+                        old_relevance, old_sentiment = old_scores[article_id]
+                        if old_relevance != relevance_score or (sentiment is not None and old_sentiment != sentiment):
+                            logger.debug(f"文章#{article_id} 评分变化: 相关性 {old_relevance} -> {relevance_score:.2f}, 情感 {old_sentiment} -> {sentiment}")
                     
-                    reevaluated_count += 1
+                    # 结果和断点在同一事务中提交
+                    advance_checkpoint(checkpoint, page[-1][0], len(rows))
+                    self._write_batch(db, rows, texts)
+                    reevaluated_count += len(rows)
+                    logger.info(f"重新评估进度: {reevaluated_count}/{total}")
+                    if len(page) < page_size:
+                        finished = True
+                        break
                 
-                # 提交所有更改
-                db.commit()
+                if finished or limit is None:
+                    finish_checkpoint(checkpoint)
+                    db.commit()
                     
                 logger.info(f"成功重新评估了{reevaluated_count}篇文章")
-                return {"status": "success", "reevaluated": reevaluated_count}
+                return {"status": "success", "reevaluated": reevaluated_count, "last_id": checkpoint.last_id}
+                
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+                
+        except Exception as e:
+            logger.error(f"重新评估文章时出错（已完成的批次已保存断点）: {str(e)}")
+            return {"status": "error", "message": str(e)}
+    
+    @staticmethod
+    def _apply_relevance_gate(db: Session) -> Dict:
+        """相关性变化后调整状态：低于阈值的已处理文章标记为不相关，
+        超过阈值的不相关文章改回待处理（由后续处理补做情感分析）"""
+        threshold = settings.ARTICLE_RELEVANCE_THRESHOLD
+        demoted = db.query(Article).filter(
+            Article.status == "processed",
+            Article.keywords_indexed == True,
+            Article.relevance_score < threshold
+        ).update({"status": "irrelevant"}, synchronize_session=False)
+        promoted = db.query(Article).filter(
+            Article.status == "irrelevant",
+            Article.relevance_score >= threshold
+        ).update({"status": "pending"}, synchronize_session=False)
+        db.commit()
+        if demoted or promoted:
+            logger.info(f"相关性阈值 {threshold}: {demoted}篇标记为不相关，{promoted}篇改回待处理")
+        return {"irrelevant": demoted, "requeued": promoted}
+    
+    def rescore_relevance(self, rescan_keyword_ids: Optional[Iterable[int]] = None) -> Dict:
+        """关键词变化后由已记录的关键词计数重算相关性，不重新分析文章
+
+        Args:
+            rescan_keyword_ids: 新增或改名的关键词，只重新统计这些词（只扫描包含该词的文章）
+
+        已处理但还没有关键词计数的文章先补充计数。没有激活的关键词时
+        （分析器使用默认关键词）退回到完整的重新评估。
+        """
+        try:
+            db = SessionLocal()
+            
+            try:
+                if rescan_keyword_ids:
+                    keyword_index.rescan_keywords(db, rescan_keyword_ids)
+                    db.commit()
                 
+                # 补充旧文章的关键词计数
+                indexed_count = 0
+                while True:
+                    articles = db.query(Article.id, Article.title, func.coalesce(Article.plain_text, Article.content)).filter(
+                        Article.status.in_(("processed", "irrelevant")),
+                        Article.keywords_indexed.isnot(True)
+                    ).limit(settings.ANALYSIS_WRITE_BATCH).all()
+                    if not articles:
+                        break
+                    keyword_index.index_articles(db, [(article_id, title, content or "") for article_id, title, content in articles])
+                    db.commit()
+                    indexed_count += len(articles)
+                if indexed_count:
+                    logger.info(f"补充了{indexed_count}篇文章的关键词计数")
+                
+                result = keyword_index.rescore(db)
+                if result is not None:
+                    result.update(self._apply_relevance_gate(db))
             finally:
                 db.close()
+            
+            if result is None:
+                logger.info("没有激活的关键词，改为完整重新评估")
+                return self.reevaluate_articles()
+            return result
                 
         except Exception as e:
-            logger.error(f"重新评估文章时出错: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            logger.error(f"重算相关性时出错: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+
+# 进程内共享的端到端延迟统计
+analysis_latency = LatencyTracker()
@@ -7,19 +7,29 @@ from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 import threading
-import time
 
 # 导入各个模块
-from data_ingestion.database import SessionLocal as DataSessionLocal, engine as data_engine
-from data_ingestion.models import Base as DataBase, Article, RSSSource, Keyword
+from data_ingestion.database import SessionLocal as DataSessionLocal, init_db
+from data_ingestion.models import Base as DataBase, Article, RSSSource, Keyword, SourceFetchStat, SourceFetchSummary
+from data_ingestion import telemetry
 from data_ingestion.rss_collector import RSSCollector
-from content_analysis.analyzer import ContentAnalyzer
+from data_ingestion.ingest_scheduler import ingest_scheduler
+from data_ingestion.work_queue import article_queue
+from core.config import settings
+from core.database import pool_stats
+from core.scheduler import scheduler
+from content_analysis.analysis_cache import analysis_cache
+from content_analysis.analyzer import ContentAnalyzer, stage_counters
+from content_analysis.keyword_index import keyword_index
+from content_analysis.keyword_snapshot import analyzer_snapshot, bump_version
 from local_processor import LocalProcessor
+from analysis_pipeline import analysis_pipeline
+from job_runner import job_runner
 
 # 创建数据表
-DataBase.metadata.create_all(bind=data_engine)
+init_db()
 
 # 创建FastAPI应用
 app = FastAPI(title="澳大利亚新闻简报系统")
@@ -61,29 +71,41 @@ def get_db():
     finally:
         db.close()
 
-# 后台任务进程
-background_processor = None
+# 定时处理待分析文章（未启用分析流水线时使用）
+def process_pending_task():
+    result = LocalProcessor().process_pending_articles(limit=20)
+    if result["status"] != "success":
+        raise RuntimeError(result.get("message"))
+    return result
 
-def background_processing():
-    """后台处理循环"""
-    logger.info("启动后台处理服务")
-    processor = LocalProcessor()
-    
-    while True:
-        try:
-            logger.info("执行定时处理...")
-            processor.process_pending_articles(limit=20)
-            time.sleep(86400)  # 每24小时执行一次
-        except Exception as e:
-            logger.error(f"后台处理出错: {str(e)}")
-            time.sleep(300)  # 出错后等待5分钟再试
-
-# 启动后台处理
+# 启动后台处理：启用时使用采集到分析的流水线，新文章几秒内完成分析；否则由调度器定期处理
 def start_background_processor():
-    global background_processor
-    if background_processor is None or not background_processor.is_alive():
-        background_processor = threading.Thread(target=background_processing, daemon=True)
-        background_processor.start()
+    if settings.PIPELINE_ENABLED:
+        analysis_pipeline.start()
+        return
+    if scheduler.get_task("process_pending") is None:
+        scheduler.add_task(
+            "process_pending",
+            process_pending_task,
+            interval=settings.PROCESS_PENDING_INTERVAL,
+            run_immediately=True
+        )
+    if not scheduler.running:
+        scheduler.start()
+
+# 启动按源自适应的RSS采集调度
+def start_ingest_scheduler():
+    if not settings.INGEST_SCHEDULER_ENABLED:
+        return
+    if scheduler.get_task("rss_ingest") is None:
+        scheduler.add_task(
+            "rss_ingest",
+            ingest_scheduler.run_due,
+            interval=settings.INGEST_TICK_INTERVAL,
+            run_immediately=True
+        )
+    if not scheduler.running:
+        scheduler.start()
 
 # 路由：首页
 @app.get("/", response_class=HTMLResponse)
@@ -128,10 +150,13 @@ async def news_list(
     
     # 应用筛选条件
     if search:
-        query = query.filter(Article.title.like(f"%{search}%"))
+        query = query.filter(Article.title.like(f"%{search}%") | Article.plain_text.like(f"%{search}%"))
     
     if status:
         query = query.filter(Article.status == status)
+    else:
+        # 默认隐藏近似重复的转载文章
+        query = query.filter(Article.status != "duplicate")
     
     # 应用排序
     if sort_by == "relevance":
@@ -167,9 +192,18 @@ async def view_article(request: Request, article_id: int, db: Session = Depends(
     if not article:
         raise HTTPException(status_code=404, detail="文章未找到")
     
+    # 近似重复的转载文章
+    canonical_id = article.canonical_id or article.id
+    related = (
+        db.query(Article)
+        .filter((Article.canonical_id == canonical_id) | (Article.id == canonical_id), Article.id != article.id)
+        .order_by(Article.published_at)
+        .all()
+    )
+    
     return templates.TemplateResponse(
         "article.html",
-        {"request": request, "article": article}
+        {"request": request, "article": article, "related": related}
     )
 
 # 路由：重新评估单篇文章
@@ -180,29 +214,32 @@ async def reevaluate_single_article(article_id: int, db: Session = Depends(get_d
     if not article:
         raise HTTPException(status_code=404, detail="文章未找到")
     
-    # 创建处理器
-    processor = LocalProcessor()
-    
-    # 强制重新初始化分析器以获取最新关键词
-    processor.analyzer = None
-    analyzer = processor.get_analyzer(db)
+    # 获取使用最新关键词的分析器（关键词未变化时复用已编译的快照）
+    analyzer = analyzer_snapshot.get(db)
     
     # 分析文章
-    result = analyzer.analyze_article(article.title, article.content or "")
+    result = analyzer.analyze_article(article.title, article.text)
     
     # 更新文章信息
     old_relevance = article.relevance_score
     old_sentiment = article.sentiment
     article.relevance_score = result["relevance_score"]
-    article.sentiment = result["sentiment"]
+    if result.get("irrelevant"):
+        # 未通过相关性阈值，不做情感分析
+        if article.status == "processed":
+            article.status = "irrelevant"
+    else:
+        article.sentiment = result["sentiment"]
+        if article.status == "irrelevant":
+            article.status = "processed"
     
     # 提交更改
     db.commit()
     
     # 记录变化
     logger.info(f"重新评估文章 #{article_id}: {article.title}")
-    logger.info(f"相关性得分: {old_relevance:.2f} -> {article.relevance_score:.2f}")
-    logger.info(f"情感倾向: {old_sentiment:.2f} -> {article.sentiment:.2f}")
+    logger.info(f"相关性得分: {old_relevance} -> {article.relevance_score:.2f}")
+    logger.info(f"情感倾向: {old_sentiment} -> {article.sentiment}")
     
     return RedirectResponse(f"/news/{article_id}", status_code=303)
 
@@ -210,9 +247,12 @@ async def reevaluate_single_article(article_id: int, db: Session = Depends(get_d
 @app.get("/sources", response_class=HTMLResponse)
 async def sources_list(request: Request, db: Session = Depends(get_db)):
     sources = db.query(RSSSource).order_by(RSSSource.id).all()
+    # 采集遥测读取预计算的汇总，不扫描原始记录
+    stats = telemetry.summaries(db)
     
     # 检测每个源的健康状况
     for source in sources:
+        source.stats = stats.get(source.id)
         # 如果错误计数大于3且最近一次抓取失败 或者 从未成功抓取过
         if (source.error_count > 3) or (source.last_fetched is None and source.created_at and (datetime.datetime.now() - source.created_at).days > 1):
             source.health_status = "unhealthy"
@@ -288,6 +328,8 @@ async def delete_source(source_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="RSS源未找到")
     
     source_name = source.name
+    db.query(SourceFetchStat).filter(SourceFetchStat.source_id == source_id).delete()
+    db.query(SourceFetchSummary).filter(SourceFetchSummary.source_id == source_id).delete()
     db.delete(source)
     db.commit()
     
@@ -323,9 +365,30 @@ async def keywords_list(request: Request, db: Session = Depends(get_db)):
         {"request": request, "keywords": keywords, "categories": categories}
     )
 
+# 等待重新统计的关键词，多次修改合并到一次重算
+_rescan_keyword_ids: Set[int] = set()
+_rescan_lock = threading.Lock()
+
+def run_rescore() -> Dict:
+    with _rescan_lock:
+        keyword_ids = sorted(_rescan_keyword_ids)
+        _rescan_keyword_ids.clear()
+    result = LocalProcessor().rescore_relevance(keyword_ids or None)
+    if result.get("status") == "error":
+        # 失败时保留这些关键词，下次重算时重新统计
+        with _rescan_lock:
+            _rescan_keyword_ids.update(keyword_ids)
+    return result
+
+# 关键词变化后在后台由关键词计数重算相关性（重算期间的修改在结束后再算一次）
+def start_rescore(rescan_keyword_ids: Optional[List[int]] = None):
+    with _rescan_lock:
+        _rescan_keyword_ids.update(rescan_keyword_ids or ())
+    job_runner.submit("rescore", run_rescore, rerun=True)
+
 # 路由：添加关键词
 @app.post("/keywords/add")
-async def add_keyword(
+def add_keyword(
     word: str = Form(...), 
     category: str = Form(...), 
     weight: float = Form(...), 
@@ -339,10 +402,14 @@ async def add_keyword(
     
     keyword = Keyword(word=word, category=category, weight=weight)
     db.add(keyword)
+    bump_version(db)
     db.commit()
     
     logger.info(f"添加了新的关键词: {word} (权重: {weight})")
     
+    # 只需统计包含新关键词的文章
+    start_rescore([keyword.id])
+    
     return RedirectResponse("/keywords", status_code=303)
 
 # 路由：编辑关键词
@@ -362,7 +429,7 @@ async def edit_keyword_form(request: Request, keyword_id: int, db: Session = Dep
 
 # 路由：更新关键词
 @app.post("/keywords/{keyword_id}/update")
-async def update_keyword(
+def update_keyword(
     keyword_id: int, 
     word: str = Form(...), 
     category: str = Form(...), 
@@ -373,33 +440,41 @@ async def update_keyword(
     if not keyword:
         raise HTTPException(status_code=404, detail="关键词未找到")
     
+    word_changed = keyword.word != word
     keyword.word = word
     keyword.category = category
     keyword.weight = weight
+    bump_version(db)
     db.commit()
     
     logger.info(f"更新了关键词 #{keyword_id}: {word} (权重: {weight})")
     
+    # 只改权重时直接重算；改了词则重新统计这个词
+    start_rescore([keyword_id] if word_changed else None)
+    
     return RedirectResponse("/keywords", status_code=303)
 
 # 路由：删除关键词
 @app.get("/keywords/{keyword_id}/delete")
-async def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
+def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
     keyword = db.query(Keyword).filter(Keyword.id == keyword_id).first()
     if not keyword:
         raise HTTPException(status_code=404, detail="关键词未找到")
     
     word = keyword.word
+    keyword_index.remove_keywords(db, [keyword_id])
     db.delete(keyword)
+    bump_version(db)
     db.commit()
     
     logger.info(f"删除了关键词 #{keyword_id}: {word}")
+    start_rescore()
     
     return RedirectResponse("/keywords", status_code=303)
 
 # 路由：删除关键词分类
 @app.get("/keywords/category/{category}/delete")
-async def delete_keyword_category(category: str, db: Session = Depends(get_db)):
+def delete_keyword_category(category: str, db: Session = Depends(get_db)):
     # 找出该分类下的所有关键词
     keywords = db.query(Keyword).filter(Keyword.category == category).all()
     
@@ -411,94 +486,107 @@ async def delete_keyword_category(category: str, db: Session = Depends(get_db)):
     keyword_count = len(keywords)
     
     # 删除该分类下的所有关键词
+    keyword_index.remove_keywords(db, [keyword.id for keyword in keywords])
     db.query(Keyword).filter(Keyword.category == category).delete()
+    bump_version(db)
     db.commit()
     
     logger.info(f"删除了分类 '{category}' 下的所有关键词，共 {keyword_count} 个")
+    start_rescore()
     
     return RedirectResponse("/keywords", status_code=303)
 
 # 路由：切换关键词状态
 @app.get("/keywords/{keyword_id}/toggle")
-async def toggle_keyword(keyword_id: int, db: Session = Depends(get_db)):
+def toggle_keyword(keyword_id: int, db: Session = Depends(get_db)):
     keyword = db.query(Keyword).filter(Keyword.id == keyword_id).first()
     if not keyword:
         raise HTTPException(status_code=404, detail="关键词未找到")
     
     keyword.is_active = not keyword.is_active
+    bump_version(db)
     db.commit()
     
     status = "激活" if keyword.is_active else "停用"
     logger.info(f"{status}了关键词 #{keyword_id}: {keyword.word}")
+    start_rescore()
     
     return RedirectResponse("/keywords", status_code=303)
 
 # 路由：任务控制页面
 @app.get("/tasks", response_class=HTMLResponse)
 async def tasks_page(request: Request):
+    db = DataSessionLocal()
+    try:
+        queue_stats = article_queue.stats(db)
+    finally:
+        db.close()
     return templates.TemplateResponse(
         "tasks.html",
-        {"request": request}
+        {
+            "request": request,
+            "queue_stats": queue_stats,
+            "pipeline_stats": analysis_pipeline.stats(),
+            "scheduled_tasks": scheduler.stats(),
+            "task_runs": scheduler.history(limit=10),
+            "job_runs": job_runner.recent_runs(limit=20),
+            "cache_stats": analysis_cache.stats() if settings.ANALYSIS_CACHE_ENABLED else None,
+            "stage_stats": stage_counters.stats(),
+            "pool_stats": pool_stats()
+        }
     )
 
 # 路由：重新评估文章相关性和情感倾向
 @app.get("/tasks/reevaluate-articles")
-async def reevaluate_articles():
-    processor = LocalProcessor()
-    
-    # 启动文章重新评估
-    logger.info("手动触发了文章重新评估")
-    
-    # 在新线程中执行，避免阻塞主线程
-    def do_reevaluation():
-        result = processor.reevaluate_articles()
-        logger.info(f"文章重新评估完成，结果: {result}")
-    
-    thread = threading.Thread(target=do_reevaluation)
-    thread.start()
+def reevaluate_articles():
+    # 在任务执行器中执行，避免阻塞主线程；正在执行时合并到当前运行
+    if not job_runner.submit("reevaluate_articles", LocalProcessor().reevaluate_articles):
+        logger.info("手动触发了文章重新评估")
     
     return RedirectResponse("/tasks", status_code=303)
 
+# 采集任务使用自己的数据库会话（请求结束后请求的会话会被关闭）
+def collect_all_sources():
+    db = DataSessionLocal()
+    try:
+        return RSSCollector(db).fetch_all_active_sources()
+    finally:
+        db.close()
+
 # 路由：触发数据采集
 @app.get("/tasks/trigger-collection")
-async def trigger_collection(db: Session = Depends(get_db)):
-    collector = RSSCollector(db)
-    
+def trigger_collection(db: Session = Depends(get_db)):
     # 获取所有活跃的RSS源
-    sources = db.query(RSSSource).filter(RSSSource.is_active == True).all()
+    sources = db.query(RSSSource).filter(RSSSource.is_active == True).count()
     
     if not sources:
         logger.warning("没有找到活跃的RSS源")
         return RedirectResponse("/tasks", status_code=303)
     
-    # 启动数据采集
-    logger.info(f"手动触发了RSS数据采集，共{len(sources)}个源")
-    
-    # 在新线程中执行，避免阻塞主线程
-    def do_collection():
-        results = collector.fetch_all_active_sources()
-        logger.info(f"RSS数据采集完成，结果: {results}")
-    
-    thread = threading.Thread(target=do_collection)
-    thread.start()
+    # 在任务执行器中执行，避免阻塞主线程；正在执行时合并到当前运行
+    if not job_runner.submit("collect", collect_all_sources):
+        logger.info(f"手动触发了RSS数据采集，共{sources}个源")
     
     return RedirectResponse("/tasks", status_code=303)
 
 # 路由：处理待分析文章
 @app.get("/tasks/process-articles")
-async def process_articles():
-    processor = LocalProcessor()
-    
-    # 启动文章处理
-    logger.info("手动触发了文章处理")
+def process_articles():
+    # 在任务执行器中执行，避免阻塞主线程；正在执行时合并到当前运行
+    if not job_runner.submit("process_articles", lambda: LocalProcessor().process_pending_articles(limit=100)):
+        logger.info("手动触发了文章处理")
     
-    # 在新线程中执行，避免阻塞主线程
-    def do_processing():
-        result = processor.process_pending_articles(limit=100)
-        logger.info(f"文章处理完成，结果: {result}")
-    
-    thread = threading.Thread(target=do_processing)
-    thread.start()
+    return RedirectResponse("/tasks", status_code=303)
+
+# 路由：把处理失败（死信）的文章放回队列
+@app.get("/tasks/requeue-failed")
+async def requeue_failed_articles():
+    db = DataSessionLocal()
+    try:
+        requeued = article_queue.requeue_failed(db)
+    finally:
+        db.close()
+    logger.info(f"重新放回队列{requeued}篇处理失败的文章")
     
     return RedirectResponse("/tasks", status_code=303)
 
@@ -546,7 +634,7 @@ async def startup_event():
         
         <h3>内容</h3>
         <div class="article-content">
-            {{ article.content }}
+            {{ article.text }}
         </div>
         
         {% if article.summary %}
@@ -556,6 +644,18 @@ async def startup_event():
         </div>
         {% endif %}
         
+        {% if related %}
+        <h3>相似报道</h3>
+        <ul>
+            {% for item in related %}
+            <li>
+                <a href="/news/{{ item.id }}">{{ item.title }}</a> - {{ item.source }}
+                {% if item.id == article.canonical_id %}(原始报道){% endif %}
+            </li>
+            {% endfor %}
+        </ul>
+        {% endif %}
+        
         <div style="margin-top: 1rem;">
             <a href="/news" class="button">返回列表</a>
             {% if article.status == "pending" %}
@@ -586,8 +686,159 @@ async def startup_event():
         <ul>
             <li><strong>触发数据采集</strong> - 从所有活跃的RSS源获取新文章</li>
             <li><strong>处理待分析文章</strong> - 对待处理状态的文章进行内容分析</li>
-            <li><strong>启动后台处理器</strong> - 启动自动定期处理文章的后台任务</li>
+            <li><strong>启动后台处理器</strong> - 启动分析流水线，新采集的文章写入后几秒内自动分析</li>
         </ul>
+        
+        <h3>最近的后台任务</h3>
+        {% if job_runs %}
+        <table>
+            <thead>
+                <tr>
+                    <th>#</th>
+                    <th>任务</th>
+                    <th>开始时间</th>
+                    <th>耗时</th>
+                    <th>条目数</th>
+                    <th>吞吐量</th>
+                    <th>状态</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for run in job_runs %}
+                <tr>
+                    <td>{{ run.id }}</td>
+                    <td>{{ run.job }}</td>
+                    <td>{{ run.started_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
+                    <td>{{ "%.2f"|format(run.duration) ~ '秒' if run.duration is not none else '-' }}</td>
+                    <td>{{ run.items if run.items is not none else '-' }}</td>
+                    <td>{{ "%.1f"|format(run.throughput) ~ '/秒' if run.throughput is not none else '-' }}</td>
+                    <td class="status-{{ run.status }}" title="{{ run.error or '' }}">{{ run.status }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+        {% else %}
+        <p>还没有运行记录</p>
+        {% endif %}
+        
+        <h3>定时任务</h3>
+        {% if scheduled_tasks %}
+        <table>
+            <thead>
+                <tr>
+                    <th>任务</th>
+                    <th>间隔</th>
+                    <th>下次运行</th>
+                    <th>上次结果</th>
+                    <th>运行/失败/跳过</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for task in scheduled_tasks %}
+                <tr>
+                    <td>{{ task.name }}{% if task.is_running %}（运行中）{% endif %}</td>
+                    <td>{{ task.interval }}秒</td>
+                    <td>{{ task.next_run.strftime('%m-%d %H:%M:%S') if task.next_run else '-' }}</td>
+                    <td>{% if task.last %}{{ task.last.status }}（{{ "%.2f"|format(task.last.duration or 0) }}秒）{% else %}-{% endif %}</td>
+                    <td>{{ task.run_count }} / {{ task.error_count }} / {{ task.skipped_count }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+        {% else %}
+        <p>没有定时任务</p>
+        {% endif %}
+        
+        {% if task_runs %}
+        <h3>最近运行</h3>
+        <table>
+            <thead>
+                <tr>
+                    <th>任务</th>
+                    <th>开始时间</th>
+                    <th>耗时</th>
+                    <th>状态</th>
+                    <th>结果/错误</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for run in task_runs %}
+                <tr>
+                    <td>{{ run.task }}</td>
+                    <td>{{ run.started_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
+                    <td>{{ "%.2f"|format(run.duration) if run.duration is not none else '-' }}秒</td>
+                    <td class="status-{{ run.status }}">{{ run.status }}</td>
+                    <td>{{ (run.error or run.result or '')|truncate(120) }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+        {% endif %}
+        
+        <h3>分析流水线</h3>
+        <p>
+            {% if pipeline_stats.running %}运行中{% else %}未启动{% endif %}，
+            通知队列 {{ pipeline_stats.queued }} / {{ pipeline_stats.capacity }}（丢弃 {{ pipeline_stats.dropped }}），
+            已处理 {{ pipeline_stats.processed }} 篇 / {{ pipeline_stats.batches }} 批
+            {% if pipeline_stats.latency.p50 is not none %}
+            <br>采集到分析完成延迟（最近{{ [pipeline_stats.latency.count, 1000]|min }}篇）:
+            中位数 {{ "%.1f"|format(pipeline_stats.latency.p50) }}秒，
+            P95 {{ "%.1f"|format(pipeline_stats.latency.p95) }}秒，
+            最大 {{ "%.1f"|format(pipeline_stats.latency.max) }}秒
+            {% endif %}
+        </p>
+        
+        <h3>处理队列</h3>
+        <p>
+            可领取 {{ queue_stats.available }} 篇，租约中 {{ queue_stats.leased }} 篇，处理失败 {{ queue_stats.failed }} 篇
+            {% if queue_stats.failed %}<a href="/tasks/requeue-failed" class="button">重新处理失败文章</a>{% endif %}
+        </p>
+        
+        <h3>分析阶段</h3>
+        <p>
+            相关性阶段 {{ stage_stats.relevance }} 篇：低于阈值跳过 {{ stage_stats.gated }} 篇，
+            情感分析 {{ stage_stats.sentiment }} 篇，缓存命中 {{ stage_stats.sentiment_cached }} 篇
+            （免去情感分析 {{ "%.1f"|format(stage_stats.sentiment_avoided_rate * 100) }}%）
+        </p>
+        
+        {% if cache_stats %}
+        <h3>分析缓存</h3>
+        <p>
+            命中率 {{ "%.1f"|format(cache_stats.hit_rate * 100) }}%
+            （内存 {{ cache_stats.memory_hits }} / 数据库 {{ cache_stats.db_hits }} / 未命中 {{ cache_stats.misses }}），
+            内存条目 {{ cache_stats.entries }} / {{ cache_stats.max_entries }}
+        </p>
+        {% endif %}
+        
+        <h3>数据库连接池</h3>
+        <table>
+            <thead>
+                <tr>
+                    <th>引擎</th>
+                    <th>连接池</th>
+                    <th>使用中</th>
+                    <th>峰值</th>
+                    <th>空闲</th>
+                    <th>溢出</th>
+                    <th>累计取出</th>
+                    <th>新建连接</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for pool in pool_stats %}
+                <tr>
+                    <td title="{{ pool.url }}">{{ pool.name }}</td>
+                    <td>{{ pool.pool }}{% if pool.size is defined %}（{{ pool.size }} + {{ pool.max_overflow }}）{% endif %}</td>
+                    <td>{{ pool.in_use }}</td>
+                    <td>{{ pool.peak_in_use }}</td>
+                    <td>{{ pool.idle if pool.idle is defined else '-' }}</td>
+                    <td>{{ pool.overflow if pool.overflow is defined else '-' }}</td>
+                    <td>{{ pool.checkouts }}</td>
+                    <td>{{ pool.connects }}</td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
     </div>
     {% endblock %}
     """
@@ -631,9 +882,15 @@ async def startup_event():
     with open("admin_dashboard/templates/edit_source.html", "w", encoding="utf-8") as f:
         f.write(edit_source_template)
     
+    # 上次退出时未完成的任务记录标记为中断
+    job_runner.recover()
+    
     # 启动后台处理器
     start_background_processor()
 
+    # 启动RSS采集调度
+    start_ingest_scheduler()
+
 # 运行应用程序
 if __name__ == "__main__":
     import uvicorn
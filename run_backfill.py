@@ -0,0 +1,127 @@
+"""导入历史文章存档（JSONL / CSV，可带 .gz）
+
+    python run_backfill.py archive.jsonl.gz
+    python run_backfill.py abc_2015.csv --source "ABC News" --analyze --analysis-workers 4
+
+每条记录需要 guid（或 id/link/url）、title、发布时间（published_at/published/pubDate/date），
+可选 content（或 description/summary）、url、source。中断后重新运行同一命令从断点继续，
+--restart 从头导入（已导入的文章按guid跳过）。
+"""
+import argparse
+import logging
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List
+
+from core.config import settings
+from data_ingestion.backfill import ArchiveBackfill, create_backfill_engine
+from data_ingestion.database import init_db
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("backfill_runner")
+
+
+class AnalysisFeeder:
+    """把每批新导入的文章ID送去分析（后台线程，与下一批导入重叠执行）
+
+    分析比导入慢得多，最多积压 max_pending 批，超过时导入等待最早的一批分析完成。
+    """
+
+    def __init__(self, chunk_size: int = 1000, max_pending: int = 2):
+        # 分析依赖关键词和情感分析后端，只在需要时导入
+        from local_processor import LocalProcessor
+        self.processor = LocalProcessor(worker_id="backfill")
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backfill-analysis")
+        self.pending: Deque[Future] = deque()
+        self.analyzed = 0
+
+    def _analyze(self, ids: List[int]) -> None:
+        for i in range(0, len(ids), self.chunk_size):
+            chunk = ids[i:i + self.chunk_size]
+            result = self.processor.process_pending_articles(limit=len(chunk), ids=chunk)
+            if result.get("status") == "error":
+                # 未分析的文章仍为 pending，由流水线的定期扫描补上
+                logger.error(f"分析导入的文章失败: {result.get('message')}")
+            else:
+                self.analyzed += result.get("processed", 0)
+
+    def __call__(self, ids: List[int]) -> None:
+        while len(self.pending) >= self.max_pending:
+            self.pending.popleft().result()
+        self.pending.append(self.executor.submit(self._analyze, ids))
+
+    def close(self) -> None:
+        while self.pending:
+            self.pending.popleft().result()
+        self.executor.shutdown()
+
+
+def show_progress(stats: Dict) -> None:
+    """在终端同一行刷新进度，输出被重定向时每批一行"""
+    line = (
+        f"已读取 {stats['read']:,} 条 | 新增 {stats['inserted']:,} | 重复 {stats['duplicates']:,} | "
+        f"无效 {stats['invalid']:,} | {stats['rate']:,.0f} 条/秒（写入 {stats['write_rate']:,.0f} 篇/秒）| {stats['elapsed']:.0f}秒"
+    )
+    if sys.stderr.isatty():
+        sys.stderr.write("\r" + line)
+    else:
+        sys.stderr.write(line + "\n")
+    sys.stderr.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导入历史文章存档")
+    parser.add_argument("paths", nargs="+", help="JSONL 或 CSV 存档文件")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="存档格式，默认按扩展名判断")
+    parser.add_argument("--source", help="记录中没有 source 字段时使用的来源名称")
+    parser.add_argument("--batch-size", type=int, default=settings.BACKFILL_BATCH_SIZE, help="每个事务处理的记录数")
+    parser.add_argument("--restart", action="store_true", help="忽略断点，从头导入")
+    parser.add_argument("--analyze", action="store_true", help="导入后立即分析新文章")
+    parser.add_argument("--analysis-workers", type=int, default=settings.ANALYSIS_WORKERS, help="分析进程数（配合 --analyze）")
+    parser.add_argument("--quiet", action="store_true", help="不显示进度")
+    args = parser.parse_args()
+
+    engine = create_backfill_engine()
+    init_db(engine)
+
+    feeder = None
+    if args.analyze:
+        if args.analysis_workers > 1:
+            from content_analysis.parallel import parallel_analyzer
+            settings.ANALYSIS_WORKERS = parallel_analyzer.workers = args.analysis_workers
+        feeder = AnalysisFeeder()
+
+    backfill = ArchiveBackfill(
+        engine,
+        source=args.source,
+        batch_size=args.batch_size,
+        on_inserted=feeder,
+        progress=None if args.quiet else show_progress
+    )
+    failed = False
+    try:
+        for path in args.paths:
+            result = backfill.run(path, fmt=args.format, resume=not args.restart)
+            if not args.quiet and sys.stderr.isatty():
+                sys.stderr.write("\n")
+            logger.info(f"{path}: {result}")
+            failed = failed or result["status"] != "success"
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，已提交的批次会在下次运行时从断点继续")
+        failed = True
+    finally:
+        if feeder is not None:
+            feeder.close()
+            logger.info(f"分析了{feeder.analyzed}篇导入的文章")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
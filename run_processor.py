@@ -1,4 +1,5 @@
 from integration.processor import IntegrationProcessor
+import asyncio
 import logging
 import time
 import sys
@@ -12,14 +13,24 @@ logger = logging.getLogger("processor_runner")
 
 def main():
     """运行集成处理器"""
-    processor = IntegrationProcessor()
+    # 可选 --worker-id <名称>，默认使用主机名+进程号；多个守护进程可同时运行，通过队列领取文章
+    worker_id = None
+    if "--worker-id" in sys.argv:
+        worker_id = sys.argv[sys.argv.index("--worker-id") + 1]
+    processor = IntegrationProcessor(worker_id=worker_id)
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+    # --pipelined: 领取、分析、写回重叠执行，每次处理到队列为空（需要 httpx）
+    if "--pipelined" in sys.argv:
+        process = lambda: asyncio.run(processor.process_pending_pipelined())
+    else:
+        process = processor.process_pending_articles
+    
+    if "--daemon" in sys.argv:
         # 守护模式
         logger.info("启动处理器守护进程...")
         while True:
             try:
-                result = processor.process_pending_articles()
+                result = process()
                 logger.info(f"处理结果: {result}")
                 # 等待10秒后再次处理
                 time.sleep(10)
@@ -31,7 +42,7 @@ def main():
                 time.sleep(30)  # 错误后等待更长时间
     else:
         # 单次运行模式
-        result = processor.process_pending_articles()
+        result = process()
         logger.info(f"处理结果: {result}")
 
 if __name__ == "__main__":
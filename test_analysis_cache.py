@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from content_analysis.analysis_cache import AnalysisCache, content_hash
+from content_analysis.analyzer import ContentAnalyzer
+from data_ingestion.models import Base
+
+ARTICLES = [
+    ("Great news for students", "The new visa rules are very good for international students."),
+    ("Housing crisis", "Accommodation costs are terrible and not improving."),
+]
+
+
+def _cache(**kwargs):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return AnalysisCache(sessionmaker(bind=engine), **kwargs)
+
+
+def test_cached_results_match_uncached_analysis():
+    cache = _cache(max_entries=100)
+    cached = ContentAnalyzer(cache=cache, relevance_threshold=0)
+    expected = ContentAnalyzer(relevance_threshold=0).analyze_articles(ARTICLES)
+
+    assert cached.analyze_articles(ARTICLES) == expected
+    assert cache.stats()["misses"] == 2
+    # 空白不同的同一内容（如转载稿）也能命中
+    reflowed = [(title, "  " + content.replace(" ", "\n ")) for title, content in ARTICLES]
+    assert cached.sentiments(reflowed) == [result["sentiment"] for result in expected]
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_persistent_tier_survives_lru_eviction():
+    cache = _cache(max_entries=1)
+    analyzer = ContentAnalyzer(cache=cache, relevance_threshold=0)
+    analyzer.analyze_articles(ARTICLES)
+    assert cache.stats()["entries"] == 1
+
+    keys = [content_hash(title, content) for title, content in ARTICLES]
+    assert set(cache.get_many(keys, analyzer.sentiment_version)) == set(keys)
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1 and stats["db_hits"] == 1
+    # 分析器版本不同时不命中
+    assert cache.get_many(keys, "other:0") == {}
+
+
+def test_concurrent_writes_of_same_content_are_ignored():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    first, second = AnalysisCache(sessionmaker(bind=engine)), AnalysisCache(sessionmaker(bind=engine))
+    first.put_many({"a": 0.5}, "v1")
+    # 另一个进程分析了同一内容：已有条目保持不变，新条目照常写入
+    second.put_many({"a": 0.5, "b": -0.2}, "v1")
+    assert AnalysisCache(sessionmaker(bind=engine)).get_many(["a", "b"], "v1") == {"a": 0.5, "b": -0.2}
+
+
+def test_persistent_write_failures_keep_memory_tier():
+    engine = create_engine("sqlite://")
+    cache = AnalysisCache(sessionmaker(bind=engine))  # 没有建表：写入持久层失败
+    cache.put_many({"a": 0.5}, "v1")
+    assert cache.get_many(["a"], "v1") == {"a": 0.5}
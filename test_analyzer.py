@@ -1,4 +1,4 @@
-from content_analysis.analyzer import ContentAnalyzer
+from content_analysis.analyzer import ContentAnalyzer, stage_counters
 
 def test_analyzer():
     """测试内容分析器"""
@@ -24,5 +24,22 @@ def test_analyzer():
     print(f"情感倾向: {result['sentiment']:.2f}")
     print(f"匹配关键词: {', '.join(result['matched_keywords'])}")
 
+def test_relevance_gate_skips_sentiment():
+    """低于相关性阈值的文章不做情感分析"""
+    analyzer = ContentAnalyzer(relevance_threshold=0.05)
+    before = stage_counters.stats()
+    relevant, irrelevant = analyzer.analyze_articles([
+        ("Chinese students in Adelaide", "Visa and accommodation news for chinese students in Adelaide."),
+        ("Local sports", "The football match ended in a draw.")
+    ])
+    after = stage_counters.stats()
+    
+    assert set(relevant) == {"relevance_score", "sentiment", "matched_keywords"}
+    assert relevant["sentiment"] is not None
+    assert irrelevant["irrelevant"] and irrelevant["sentiment"] is None
+    assert after["relevance"] - before["relevance"] == 2
+    assert after["gated"] - before["gated"] == 1
+    assert after["sentiment"] - before["sentiment"] == 1
+
 if __name__ == "__main__":
     test_analyzer()
\ No newline at end of file
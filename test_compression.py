@@ -0,0 +1,38 @@
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from core.compression import GzipRequestMiddleware
+
+
+def _client(max_size=1024):
+    app = FastAPI()
+    app.add_middleware(GzipRequestMiddleware, max_size=max_size)
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return await request.json()
+
+    return TestClient(app)
+
+
+def _post(client, body):
+    return client.post("/echo", content=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+
+def test_gzip_request_body_is_decompressed():
+    client = _client()
+    assert _post(client, gzip.compress(b'{"limit": 10}')).json() == {"limit": 10}
+    # 未压缩的请求原样通过
+    assert client.post("/echo", json={"limit": 5}).json() == {"limit": 5}
+
+
+def test_oversized_body_is_rejected_with_413():
+    response = _post(_client(max_size=100), gzip.compress(b'{"text": "' + b"a" * 1000 + b'"}'))
+    assert response.status_code == 413
+
+
+def test_corrupt_body_is_rejected_with_400():
+    response = _post(_client(), b"not gzip at all")
+    assert response.status_code == 400
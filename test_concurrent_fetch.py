@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from data_ingestion.fetcher import FeedFetcher
+from data_ingestion.models import Base, RSSSource
+from data_ingestion.rss_collector import RSSCollector
+
+
+def _feed(source_id):
+    return (
+        b"<rss><channel><item><title>Story %d</title><link>https://example.com/%d</link>"
+        b"<description>Body %d</description></item></channel></rss>" % (source_id, source_id, source_id)
+    )
+
+
+class SlowResponse:
+    def __init__(self, content, chunk_delay=0.0, chunks=1):
+        self.status_code = 200
+        self.headers = {}
+        self.content = content
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+
+    def iter_content(self, chunk_size):
+        for _ in range(self.chunks):
+            time.sleep(self.chunk_delay)
+            yield self.content
+            self.content = b""
+
+    def close(self):
+        pass
+
+
+class RecordingSession:
+    """记录同时进行的请求数（总数和每个主机）以及每个主机的请求开始时间"""
+
+    def __init__(self, delays, slow_url=None):
+        self.delays = delays
+        self.slow_url = slow_url
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.active_per_host = defaultdict(int)
+        self.peak_per_host = defaultdict(int)
+        self.starts = defaultdict(list)
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        host = urlparse(url).netloc
+        source_id = int(url.rsplit("/", 1)[-1])
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.active_per_host[host] += 1
+            self.peak_per_host[host] = max(self.peak_per_host[host], self.active_per_host[host])
+            self.starts[host].append(time.monotonic())
+        try:
+            time.sleep(self.delays[source_id])
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.active_per_host[host] -= 1
+        if url == self.slow_url:
+            # 响应体下载超过单个源的超时
+            return SlowResponse(_feed(source_id), chunk_delay=0.2, chunks=3)
+        return SlowResponse(_feed(source_id))
+
+
+def test_concurrent_fetch_limits_and_result_order(monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", False)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    # 4个主机各2个源；越靠前的源越慢，完成顺序与源顺序相反
+    sources = [RSSSource(id=i, name=str(i), url=f"https://host{i % 4}.example.com/feed/{i}") for i in range(1, 9)]
+    db.add_all(sources)
+    db.commit()
+
+    session = RecordingSession({i: 0.02 * (9 - i) for i in range(1, 9)}, slow_url=sources[-1].url)
+    fetcher = FeedFetcher(max_workers=3, timeout=0.3, max_per_host=1, host_interval=0.05)
+    monkeypatch.setattr(fetcher, "_session", lambda: session)
+    collector = RSSCollector(db, fetcher)
+
+    writer_threads = set()
+    store_feed = collector._store_feed
+
+    def recording_store_feed(source, result):
+        writer_threads.add(threading.get_ident())
+        return store_feed(source, result)
+
+    monkeypatch.setattr(collector, "_store_feed", recording_store_feed)
+    results = collector.fetch_sources([source.id for source in sources], concurrent=True)
+
+    # 结果按源的顺序返回，超时的源单独失败
+    assert [r["source_id"] for r in results] == list(range(1, 9))
+    assert [r["status"] for r in results] == ["success"] * 7 + ["error"]
+    assert sum(r.get("new_articles", 0) for r in results) == 7
+    # 并发数不超过线程数，同一主机不并发且请求间隔不小于设置
+    assert 1 < session.peak <= 3
+    assert max(session.peak_per_host.values()) == 1
+    for starts in session.starts.values():
+        assert all(b - a >= 0.05 - 1e-3 for a, b in zip(starts, starts[1:]))
+    # 所有写库都在调用线程中完成
+    assert writer_threads == {threading.get_ident()}
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from core.config import settings
+from core.database import create_tuned_engine, get_engine, pool_stats
+
+
+def test_tuned_engine_sets_pragmas_and_reports_pool_stats(tmp_path):
+    engine = create_tuned_engine(f"sqlite:///{tmp_path / 'news.db'}", name="test")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.DB_BUSY_TIMEOUT
+        stats = next(s for s in pool_stats() if s["name"] == "test")
+        assert (stats["in_use"], stats["connects"], stats["pool"]) == (1, 1, "QueuePool")
+
+    stats = next(s for s in pool_stats() if s["name"] == "test")
+    assert (stats["in_use"], stats["idle"], stats["checkouts"]) == (0, 1, 1)
+
+
+def test_modules_share_one_engine_per_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    assert get_engine(url) is get_engine(url)
+
+
+def test_relative_and_absolute_sqlite_urls_share_an_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = get_engine("sqlite:///./relative.db")
+    assert get_engine(f"sqlite:///{tmp_path / 'relative.db'}") is engine
+    assert engine.url.database == str(tmp_path / "relative.db")
@@ -0,0 +1,92 @@
+import feedparser
+
+from data_ingestion.feed_stream import iter_feed_entries
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel>
+    <title>Test</title>
+    <item>
+        <title>First story</title>
+        <link>https://example.com/1</link>
+        <guid>story-1</guid>
+        <description>Short summary</description>
+        <content:encoded><![CDATA[<p>Full <b>body</b></p>]]></content:encoded>
+        <pubDate>Tue, 10 Jun 2025 04:00:00 GMT</pubDate>
+    </item>
+    <item>
+        <title>Second story</title>
+        <link>https://example.com/2</link>
+        <description>Another summary</description>
+    </item>
+</channel>
+</rss>"""
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>Test</title>
+    <entry>
+        <title>Atom story</title>
+        <id>urn:uuid:1</id>
+        <link rel="alternate" href="https://example.com/atom/1"/>
+        <summary>Atom summary</summary>
+        <published>2025-06-10T04:00:00Z</published>
+    </entry>
+</feed>"""
+
+
+def _key_fields(entry):
+    content = entry["content"][0].value if entry.get("content") else None
+    return (entry.get("id") or entry.get("link"), entry.get("link"), entry.get("title"),
+            entry.get("description"), content, tuple(entry.get("published_parsed") or ())[:6])
+
+
+def test_rss_entries_match_feedparser():
+    streamed = [_key_fields(e) for e in iter_feed_entries(RSS_FEED)]
+    parsed = [_key_fields(e) for e in feedparser.parse(RSS_FEED).entries]
+    assert streamed == parsed
+
+
+def test_atom_entries_match_feedparser():
+    streamed = [_key_fields(e) for e in iter_feed_entries(ATOM_FEED)]
+    parsed = [_key_fields(e) for e in feedparser.parse(ATOM_FEED).entries]
+    assert streamed == parsed
+
+
+def test_atom_xhtml_content_matches_feedparser():
+    feed = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>Test</title>
+    <entry>
+        <title>Xhtml story</title>
+        <id>urn:uuid:2</id>
+        <link rel="alternate" href="https://example.com/atom/2"/>
+        <summary type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Short <b>summary</b></div></summary>
+        <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>International students in Adelaide</p><br/></div></content>
+    </entry>
+</feed>"""
+    streamed = [_key_fields(e) for e in iter_feed_entries(feed)]
+    assert streamed == [_key_fields(e) for e in feedparser.parse(feed).entries]
+    assert streamed[0][4] == "<p>International students in Adelaide</p><br />"
+
+
+def test_stops_without_parsing_rest():
+    items = b"".join(
+        b"<item><title>t%d</title><link>https://example.com/%d</link></item>" % (i, i) for i in range(5000)
+    )
+    feed = b"<rss><channel>" + items + b"</channel></rss>"
+    entries = iter_feed_entries(feed)
+    assert next(entries).link == "https://example.com/0"
+    assert next(entries).link == "https://example.com/1"
+
+
+def test_falls_back_on_malformed_xml():
+    feed = RSS_FEED.replace(b"Another summary", b"Another&nbsp;summary")
+    titles = [e.title for e in iter_feed_entries(feed)]
+    assert titles == ["First story", "Second story"]
+
+
+def test_truncated_feed_keeps_complete_entries():
+    feed = RSS_FEED[:RSS_FEED.index(b"<title>Second story")]
+    entries = [e for e in iter_feed_entries(feed) if e.get("link")]
+    assert [e.title for e in entries] == ["First story"]
@@ -0,0 +1,96 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from data_ingestion.fetcher import FeedFetcher
+from data_ingestion.models import Article, Base, RSSSource, SourceFetchSummary
+from data_ingestion.rss_collector import RSSCollector
+from test_feed_stream import RSS_FEED
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """按顺序返回预设响应，并记录每次请求的请求头"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_conditional_get_skips_unchanged_feeds(monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", False)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    source = RSSSource(name="Test", url="https://example.com/feed")
+    db.add(source)
+    db.commit()
+
+    validators = {"ETag": '"v1"', "Last-Modified": "Tue, 10 Jun 2025 04:00:00 GMT"}
+    session = FakeSession([
+        FakeResponse(200, RSS_FEED, validators),
+        FakeResponse(304, headers={"ETag": '"v2"'}),  # 304 只带更新后的 ETag
+        FakeResponse(200, RSS_FEED, {"ETag": '"v3"'}),  # 服务端忽略条件请求，返回相同内容
+    ])
+    fetcher = FeedFetcher(max_workers=1, host_interval=0)
+    fetcher._local.session = session
+    parsed = []
+    iter_entries = RSSCollector._iter_entries
+    monkeypatch.setattr(RSSCollector, "_iter_entries", staticmethod(lambda result: parsed.append(1) or iter_entries(result)))
+    collector = RSSCollector(db, fetcher)
+
+    # 首次采集：解析并保存 ETag / Last-Modified 和响应体哈希
+    assert collector.fetch_rss_feed(source.id)["new_articles"] == 2
+    assert (source.etag, source.last_modified) == ('"v1"', validators["Last-Modified"])
+    assert source.content_hash and len(parsed) == 1
+    assert session.sent_headers[0] == {}
+
+    # 304：带上保存的校验信息，不解析
+    result = collector.fetch_rss_feed(source.id)
+    assert result["not_modified"] and result["new_articles"] == 0
+    assert session.sent_headers[1] == {"If-None-Match": '"v1"', "If-Modified-Since": validators["Last-Modified"]}
+    assert (source.not_modified_count, source.bytes_saved) == (1, len(RSS_FEED))
+    assert (source.etag, source.last_modified) == ('"v2"', validators["Last-Modified"])
+
+    # 响应体与上次相同：按哈希跳过解析
+    assert collector.fetch_rss_feed(source.id)["not_modified"]
+    assert source.unchanged_count == 1
+    assert session.sent_headers[2]["If-None-Match"] == '"v2"'
+    # 完整响应的校验信息整体替换
+    assert (source.etag, source.last_modified) == ('"v3"', None)
+    assert len(parsed) == 1
+    assert db.query(Article).count() == 2
+
+
+def test_truncated_feed_is_recorded_and_not_cached(monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_DUP_ENABLED", False)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    source = RSSSource(name="Test", url="https://example.com/feed")
+    db.add(source)
+    db.commit()
+
+    fetcher = FeedFetcher(max_workers=1, host_interval=0, max_bytes=RSS_FEED.index(b"<title>Second story"))
+    fetcher._local.session = FakeSession([FakeResponse(200, RSS_FEED)])
+    assert RSSCollector(db, fetcher).fetch_rss_feed(source.id)["new_articles"] == 1
+    # 不完整的响应体不保存哈希，遥测中记录截断
+    assert source.content_hash is None
+    assert db.get(SourceFetchSummary, source.id).truncated == 1
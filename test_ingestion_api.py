@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from data_ingestion import database
+from data_ingestion.models import Article
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # 导入服务时建表，使用临时数据库
+    monkeypatch.setattr(database, "engine", engine)
+    from data_ingestion import main
+
+    session_factory = sessionmaker(bind=engine)
+    database.init_db(engine)
+    with session_factory() as db:
+        for i in range(1, 6):
+            db.add(Article(id=i, guid=str(i), title=f"t{i}", content="c", source="test", url=str(i),
+                           published_at=datetime.now(), status="pending"))
+        db.commit()
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[main.get_db] = get_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def test_claim_limit_is_clamped(client):
+    response = client.post("/queue/claim", json={"worker_id": "w", "limit": 0})
+    assert [a["id"] for a in response.json()["articles"]] == [1]
+    response = client.post("/queue/claim", json={"worker_id": "w", "limit": 100000})
+    assert [a["id"] for a in response.json()["articles"]] == [2, 3, 4, 5]
+    assert client.post("/queue/claim", json={"limit": "many"}).status_code == 400
+
+
+def test_complete_rejects_invalid_rows(client):
+    token = client.post("/queue/claim", json={"worker_id": "w", "limit": 2}).json()["token"]
+    assert client.post(f"/queue/{token}/complete", json=[{"status": "processed"}]).status_code == 400
+    assert client.post(f"/queue/{token}/complete", json=[{"id": 1, "status": "done"}]).status_code == 400
+    assert client.post(f"/queue/{token}/complete", json=[{"id": 1, "claim_token": None}]).status_code == 400
+
+    response = client.post(f"/queue/{token}/complete", json=[{"id": 1, "relevance_score": 0.5, "status": "processed"}])
+    assert response.status_code == 200 and response.json() == {"written": 1}
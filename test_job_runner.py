@@ -0,0 +1,114 @@
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from data_ingestion.models import Base
+from job_runner import JobRunner, count_items
+
+
+def _runner():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return JobRunner(max_workers=2, session_factory=sessionmaker(bind=engine))
+
+
+def _wait_idle(runner, job):
+    deadline = time.monotonic() + 3
+    while runner.is_running(job) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_duplicate_triggers_coalesce_into_running_job():
+    runner = _runner()
+    release = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(1)
+        release.wait(2)
+        return {"status": "success", "processed": 40}
+
+    assert not runner.submit("process", job)
+    assert runner.submit("process", job)
+    release.set()
+    _wait_idle(runner, "process")
+
+    assert len(calls) == 1
+    run = runner.recent_runs()[0]
+    assert (run.status, run.items) == ("success", 40)
+    assert len(runner.recent_runs()) == 1
+    assert run.finished_at is not None and run.throughput > 0
+    # 上一次运行结束后可以再次触发
+    assert not runner.submit("process", job)
+
+
+def test_failed_runs_are_recorded():
+    runner = _runner()
+    runner.submit("reevaluate", lambda: {"status": "error", "message": "database is locked"})
+    _wait_idle(runner, "reevaluate")
+    run = runner.recent_runs()[0]
+    assert (run.status, run.error) == ("error", "database is locked")
+    assert count_items([{"new_articles": 2}, {"new_articles": 3}, {"status": "error"}]) == 5
+
+
+def test_rerun_triggers_during_execution_run_once_more():
+    runner = _runner()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def job():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {"status": "success", "rescored": 1}
+
+    assert not runner.submit("rescore", job, rerun=True)
+    started.wait(2)
+    # 执行期间的多次触发只补一次运行
+    assert runner.submit("rescore", job, rerun=True)
+    assert runner.submit("rescore", job, rerun=True)
+    release.set()
+    deadline = time.monotonic() + 3
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    _wait_idle(runner, "rescore")
+
+    assert len(calls) == 2
+    assert [run.status for run in runner.recent_runs()] == ["success", "success"]
+
+
+def test_bookkeeping_failures_do_not_block_submit_or_drop_reruns():
+    runner = _runner()
+    unlocked = threading.Event()
+
+    def locked(*args):
+        # 模拟写锁被占用：写运行记录要等待，写运行结果失败
+        unlocked.wait(2)
+        raise RuntimeError("database is locked")
+
+    runner._start_run = lambda job: unlocked.wait(2) and 1
+    runner._finish_run = locked
+    started, proceed = threading.Event(), threading.Event()
+    calls = []
+
+    def job():
+        calls.append(1)
+        started.set()
+        proceed.wait(2)
+        return {"status": "success"}
+
+    begin = time.monotonic()
+    assert not runner.submit("rescore", job, rerun=True)
+    assert time.monotonic() - begin < 0.5
+    unlocked.set()
+    assert started.wait(2)
+    assert runner.submit("rescore", job, rerun=True)
+    proceed.set()
+    deadline = time.monotonic() + 3
+    while (runner.is_running("rescore") or len(calls) < 2) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 写运行结果失败时，执行期间的触发仍会补一次运行
+    assert len(calls) == 2
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from content_analysis.analyzer import ContentAnalyzer
+from content_analysis.keyword_index import KeywordIndex
+from content_analysis.keyword_snapshot import bump_version
+from data_ingestion.models import Article, Base, Keyword
+
+TEXTS = [
+    ("Chinese students in Adelaide", "Visa rules for international students and chinese students."),
+    ("Housing crisis", "Accommodation and housing costs near the university keep rising. Housing!"),
+    ("Sports", "The match ended in a draw."),
+]
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for word, weight in [("chinese students", 3.0), ("adelaide", 2.0), ("visa", 2.0), ("housing", 1.5)]:
+        db.add(Keyword(word=word, category="test", weight=weight))
+    for i, (title, content) in enumerate(TEXTS, 1):
+        db.add(Article(id=i, guid=str(i), title=title, content=content, source="test", url=str(i),
+                       published_at=datetime.now(), status="processed"))
+    db.commit()
+    return db
+
+
+def _bump(db):
+    bump_version(db)
+    db.commit()
+
+
+def _expected(db):
+    weights = {k.word: k.weight for k in db.query(Keyword).filter(Keyword.is_active == True)}
+    analyzer = ContentAnalyzer(keyword_weights=weights)
+    return [analyzer.calculate_relevance(f"{title} {content}")[0] for title, content in TEXTS]
+
+
+def _scores(db):
+    return [a.relevance_score for a in db.query(Article).order_by(Article.id)]
+
+
+def test_rescore_matches_full_analysis_after_keyword_changes():
+    db = _session()
+    index = KeywordIndex()
+    index.index_articles(db, [(i, title, content) for i, (title, content) in enumerate(TEXTS, 1)])
+    db.commit()
+    index.rescore(db)
+    assert _scores(db) == pytest.approx(_expected(db), abs=1e-12)
+
+    # 修改权重、停用关键词：只重算
+    db.query(Keyword).filter(Keyword.word == "visa").update({"weight": 5.0})
+    db.query(Keyword).filter(Keyword.word == "adelaide").update({"is_active": False})
+    _bump(db)
+    index.rescore(db)
+    assert _scores(db) == pytest.approx(_expected(db), abs=1e-12)
+
+    # 新增关键词：只统计这个词
+    keyword = Keyword(word="university", category="test", weight=1.0)
+    db.add(keyword)
+    _bump(db)
+    index.rescan_keywords(db, [keyword.id])
+    index.rescore(db)
+    assert _scores(db) == pytest.approx(_expected(db), abs=1e-12)
+
+    # 删除关键词
+    housing = db.query(Keyword).filter(Keyword.word == "housing").one()
+    index.remove_keywords(db, [housing.id])
+    db.delete(housing)
+    _bump(db)
+    index.rescore(db)
+    assert _scores(db) == pytest.approx(_expected(db), abs=1e-12)
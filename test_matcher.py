@@ -0,0 +1,33 @@
+import random
+import re
+
+from content_analysis.analyzer import DEFAULT_KEYWORD_WEIGHTS
+from content_analysis.matcher import KeywordMatcher
+
+
+def _regex_counts(keywords, text):
+    counts = {}
+    for keyword in keywords:
+        matches = len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', text))
+        if matches:
+            counts[keyword] = matches
+    return counts
+
+
+def test_overlapping_keywords_counted_separately():
+    text = "chinese students and chinese-speaking students in china; part-time job, part-time jobs"
+    matcher = KeywordMatcher(DEFAULT_KEYWORD_WEIGHTS)
+    counts = matcher.count(text)
+    assert counts == _regex_counts(DEFAULT_KEYWORD_WEIGHTS, text)
+    assert counts["chinese"] == 2
+    assert counts["chinese students"] == 1
+    assert counts["part-time job"] == 1
+
+
+def test_matches_per_keyword_regex_on_random_text():
+    rng = random.Random(0)
+    alphabet = "ab -_.é1"
+    for _ in range(2000):
+        keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(5)]
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert KeywordMatcher(keywords).count(text) == _regex_counts(keywords, text)
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from data_ingestion.models import Article, ArticleSignature, Base
+from data_ingestion.near_duplicate import MinHashIndex, link_near_duplicates, minhash, shingles, similarity
+
+TITLE = "International students in Adelaide face rental shortage"
+CONTENT = (
+    "<p>International students arriving in Adelaide for the new semester are struggling to find "
+    "affordable housing, as vacancy rates across the city fall to record lows. University support "
+    "services say hundreds of students are staying in hostels or sleeping on friends' couches while "
+    "they search for a room, and some have deferred their studies altogether. Advocates are calling "
+    "on the state government to fund more purpose-built student accommodation near campus.</p>"
+)
+# 转载时改写了少量措辞
+REWORDED = (
+    "International students arriving in Adelaide for the new semester are struggling to find "
+    "affordable accommodation, as vacancy rates across the city fall to historic lows. University support "
+    "services say hundreds of students are staying in hostels or sleeping on friends' couches while "
+    "they look for a room, and some have deferred their studies altogether. Advocates are calling "
+    "on the state government to fund more purpose-built student accommodation near campus."
+)
+UNRELATED = (
+    "The Adelaide Crows have named an unchanged side for Saturday's clash at Adelaide Oval, with the "
+    "coach praising the midfield's work rate after last week's narrow win. Ticket sales are strong and "
+    "a crowd of more than forty thousand is expected if the forecast rain holds off until the evening."
+)
+
+
+def test_minhash_finds_reworded_copy_but_not_unrelated():
+    original = minhash(shingles(TITLE, CONTENT))
+    reworded = minhash(shingles(TITLE, REWORDED))
+    unrelated = minhash(shingles("Crows unchanged", UNRELATED))
+    assert similarity(original, reworded) >= 0.7 > similarity(original, unrelated)
+    # 文本过短时不计算签名
+    assert minhash(shingles("Short", "too short")) is None
+
+    index = MinHashIndex(max_size=10, threshold=0.7)
+    index.add(1, original)
+    assert index.find(reworded) == 1
+    assert index.find(unrelated) is None
+
+
+def test_index_evicts_oldest_signatures():
+    index = MinHashIndex(max_size=2, threshold=0.7)
+    index.add(1, minhash(shingles(TITLE, CONTENT)))
+    index.add(2, minhash(shingles("Crows unchanged", UNRELATED)))
+    index.add(3, minhash(shingles("Another story", UNRELATED.replace("Crows", "Power"))))
+    assert len(index) == 2
+    assert index.find(minhash(shingles(TITLE, REWORDED))) is None
+    # 淘汰的签名也从桶中移除
+    assert all(1 not in bucket for band in index._buckets for bucket in band.values())
+
+
+def test_link_near_duplicates_marks_copies():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    rows = [(1, TITLE, CONTENT), (2, TITLE, REWORDED), (3, "Crows unchanged", UNRELATED)]
+    for article_id, title, content in rows:
+        db.add(Article(id=article_id, guid=str(article_id), title=title, content=content, source="test",
+                       url=str(article_id), published_at=datetime.now(), status="pending"))
+    db.commit()
+
+    index = MinHashIndex(max_size=10, threshold=0.7)
+    assert link_near_duplicates(db, index, rows) == 1
+    db.commit()
+
+    assert {a.id: (a.status, a.canonical_id) for a in db.query(Article)} == {
+        1: ("pending", None), 2: ("duplicate", 1), 3: ("pending", None)
+    }
+    # 只有规范文章保存签名，重新加载的索引仍能找到转载
+    assert sorted(article_id for (article_id,) in db.query(ArticleSignature.article_id)) == [1, 3]
+    reloaded = MinHashIndex(max_size=10, threshold=0.7)
+    reloaded.load(db)
+    assert reloaded.find(minhash(shingles(TITLE, REWORDED))) == 1
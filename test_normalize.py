@@ -0,0 +1,16 @@
+from data_ingestion.normalize import plain_text
+
+
+def test_plain_text_strips_markup_and_normalizes():
+    html = (
+        '<div class="story"><script>var x = "<b>";</script><style>p {color: red}</style>'
+        '<p>Chinese&nbsp;students &amp; <a href="https://example.com/?a=1&amp;b=2">visa</a>\n\n'
+        'news</p><!-- comment --><p>\uff46\uff55\uff4c\uff4c\uff57\uff49\uff44\uff54\uff48 co\u00adop\u200bera\ufb01on</p></div>'
+    )
+    assert plain_text(html) == "Chinese students & visa news fullwidth cooperafion"
+
+
+def test_plain_text_handles_empty_content():
+    assert plain_text(None) == ""
+    assert plain_text("") == ""
+    assert plain_text("  plain   text\t") == "plain text"
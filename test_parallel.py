@@ -0,0 +1,50 @@
+from content_analysis.analyzer import ContentAnalyzer
+from content_analysis.parallel import ParallelAnalyzer
+
+KEYWORDS = {"international students": 1.0, "adelaide": 0.8, "visa": 0.6}
+
+ARTICLES = [
+    (i, f"Story {i}", text)
+    for i, text in enumerate([
+        "International students in Adelaide welcome the new visa rules.",
+        "Local football club wins the grand final.",
+        "Adelaide universities report record international students enrolments, a great result.",
+        "Visa delays leave international students stranded and angry.",
+        "Weather forecast: rain expected across the state.",
+        "Adelaide festival draws big crowds.",
+        "International students face terrible rental shortages in Adelaide.",
+    ] * 3)
+]
+
+
+def test_parallel_matches_sequential():
+    analyzer = ContentAnalyzer(keyword_weights=KEYWORDS, relevance_threshold=0.05)
+    expected = [
+        (article_id, result["relevance_score"], result["sentiment"])
+        for (article_id, _, _), result in zip(
+            ARTICLES, analyzer.analyze_articles([(title, content) for _, title, content in ARTICLES])
+        )
+    ]
+
+    parallel = ParallelAnalyzer(workers=2, chunk_size=100)
+    pool_for = parallel._pool_for
+    chunk_sizes = []
+
+    class RecordingPool:
+        def __init__(self, pool):
+            self.pool = pool
+
+        def map(self, func, chunks):
+            chunk_sizes.extend(len(chunk) for chunk in chunks)
+            return self.pool.map(func, chunks)
+
+    parallel._pool_for = lambda a: RecordingPool(pool_for(a))
+    try:
+        results = list(parallel.analyze(analyzer, ARTICLES))
+    finally:
+        parallel.shutdown()
+
+    assert results == expected
+    assert any(sentiment is None for _, _, sentiment in results)
+    # 文章数少于 chunk_size 时也分给每个进程
+    assert chunk_sizes == [11, 10]
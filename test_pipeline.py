@@ -0,0 +1,92 @@
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import local_processor
+from analysis_pipeline import AnalysisPipeline
+from content_analysis.keyword_snapshot import AnalyzerSnapshot
+from data_ingestion.database import init_db
+from data_ingestion.models import Article
+
+
+def _database(tmp_path, monkeypatch, count):
+    engine = create_engine(f"sqlite:///{tmp_path / 'news.db'}")
+    init_db(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        for i in range(1, count + 1):
+            db.add(Article(id=i, guid=str(i), title=f"International students {i}", content="Adelaide",
+                           source="test", url=str(i), published_at=datetime.now(), status="pending"))
+        db.commit()
+    monkeypatch.setattr(local_processor, "SessionLocal", session_factory)
+    monkeypatch.setattr(local_processor, "analyzer_snapshot", AnalyzerSnapshot(session_factory=session_factory))
+
+    # 记录每次领取时的文章ID（None 表示扫描）
+    calls = []
+    process = local_processor.LocalProcessor.process_pending_articles
+
+    def recording_process(self, limit=10, ids=None):
+        calls.append(None if ids is None else list(ids))
+        return process(self, limit=limit, ids=ids)
+
+    monkeypatch.setattr(local_processor.LocalProcessor, "process_pending_articles", recording_process)
+    return session_factory, calls
+
+
+def _wait_processed(pipeline, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while pipeline.stats()["processed"] < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return pipeline.stats()["processed"]
+
+
+def _statuses(session_factory):
+    with session_factory() as db:
+        return sorted(status for (status,) in db.query(Article.status))
+
+
+def test_notifications_are_micro_batched(tmp_path, monkeypatch):
+    session_factory, calls = _database(tmp_path, monkeypatch, 7)
+    pipeline = AnalysisPipeline(workers=1, queue_size=100, batch_size=3, batch_wait=0.5, sweep_interval=5)
+    pipeline.publish(range(1, 8))
+    pipeline.start()
+    try:
+        assert _wait_processed(pipeline, 7) == 7
+    finally:
+        pipeline.stop(timeout=0.1)
+
+    assert [ids for ids in calls if ids is not None] == [[1, 2, 3], [4, 5, 6], [7]]
+    assert _statuses(session_factory) == ["processed"] * 7
+
+
+def test_full_queue_drops_notifications_and_sweep_catches_up(tmp_path, monkeypatch):
+    session_factory, calls = _database(tmp_path, monkeypatch, 5)
+    pipeline = AnalysisPipeline(workers=1, queue_size=2, batch_size=10, batch_wait=0.05, sweep_interval=0.2)
+    # 队列满时不阻塞，多出的通知被丢弃
+    pipeline.publish(range(1, 6))
+    assert (pipeline.stats()["queued"], pipeline.stats()["dropped"]) == (2, 3)
+
+    pipeline.start()
+    try:
+        assert _wait_processed(pipeline, 5) == 5
+    finally:
+        pipeline.stop(timeout=0.5)
+
+    assert calls[0] == [1, 2] and None in calls
+    assert _statuses(session_factory) == ["processed"] * 5
+
+
+def test_sweep_processes_pending_without_notifications(tmp_path, monkeypatch):
+    session_factory, calls = _database(tmp_path, monkeypatch, 5)
+    pipeline = AnalysisPipeline(workers=1, queue_size=10, batch_size=2, batch_wait=0.05, sweep_interval=0.1)
+    pipeline.start()
+    try:
+        assert _wait_processed(pipeline, 5) == 5
+    finally:
+        pipeline.stop(timeout=0.5)
+
+    # 一次扫描按批领取，直到没有待处理文章
+    assert calls[:3] == [None, None, None]
+    assert _statuses(session_factory) == ["processed"] * 5
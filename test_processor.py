@@ -0,0 +1,70 @@
+import asyncio
+
+import integration.async_client as async_client
+from integration.processor import IntegrationProcessor
+
+
+class StubClient:
+    """同时充当数据采集和内容分析服务的异步客户端，记录领取、写回和释放的批次"""
+
+    def __init__(self, batches=5, bad_batches=(), cancel_on=None):
+        self.batches = batches
+        self.bad_batches = set(bad_batches)  # 返回格式错误的分析结果
+        self.cancel_on = cancel_on  # 写回时阶段意外退出的批次
+        self.claimed, self.completed, self.failed = [], [], []
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def claim_articles(self, worker_id, limit=10):
+        if len(self.claimed) >= self.batches:
+            return {"token": None, "articles": []}
+        batch = len(self.claimed) + 1
+        self.claimed.append(f"t{batch}")
+        return {"token": f"t{batch}", "articles": [{"id": batch, "title": "t", "plain_text": "c"}]}
+
+    async def batch_analyze(self, requests):
+        if requests[0]["article_id"] in self.bad_batches:
+            return [{}]
+        return [{"relevance_score": 0.5, "sentiment": 0.1} for _ in requests]
+
+    async def complete_articles(self, token, rows):
+        if token == self.cancel_on:
+            raise asyncio.CancelledError()
+        self.completed.append(token)
+        return {"written": len(rows)}
+
+    async def fail_articles(self, token, error):
+        self.failed.append(token)
+        return {}
+
+
+def _run(stub, monkeypatch):
+    monkeypatch.setattr(async_client, "AsyncDataIngestionClient", stub)
+    monkeypatch.setattr(async_client, "AsyncContentAnalysisClient", stub)
+    processor = IntegrationProcessor(worker_id="test")
+    return asyncio.run(asyncio.wait_for(processor.process_pending_pipelined(limit=1), 5))
+
+
+def test_bad_batch_is_released_and_others_complete(monkeypatch):
+    stub = StubClient(bad_batches={2})
+    result = _run(stub, monkeypatch)
+    assert (result["status"], result["processed"], result["failed_batches"]) == ("success", 4, 1)
+    assert stub.failed == ["t2"]
+    assert sorted(stub.completed) == ["t1", "t3", "t4", "t5"]
+
+
+def test_stage_failure_releases_every_claimed_batch(monkeypatch):
+    stub = StubClient(batches=50, cancel_on="t2")
+    result = _run(stub, monkeypatch)
+    assert result["status"] == "error"
+    # 写回阶段退出后不再领取新批次，已领取的批次要么写回、要么释放
+    assert len(stub.claimed) < 50
+    assert sorted(stub.completed + stub.failed) == sorted(stub.claimed)
+    assert "t2" in stub.failed
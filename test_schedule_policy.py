@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from data_ingestion import schedule_policy
+from data_ingestion.ingest_scheduler import IngestScheduler
+from data_ingestion.models import Base, RSSSource
+
+
+@pytest.fixture(autouse=True)
+def policy_settings(monkeypatch):
+    for name, value in [("INGEST_MIN_INTERVAL", 300), ("INGEST_MAX_INTERVAL", 86400), ("INGEST_MAX_BACKOFF", 86400),
+                        ("INGEST_TARGET_NEW", 3), ("INGEST_SMOOTHING", 0.5), ("INGEST_GROWTH_FACTOR", 1.5)]:
+        monkeypatch.setattr(settings, name, value)
+
+
+def test_adapt_interval_follows_publish_rate_within_bounds():
+    # 1小时内6篇新文章：积累3篇约需半小时，与当前间隔平滑后缩短
+    assert schedule_policy.adapt_interval(3600, 6, 3600) == 2700
+    # 没有新文章时逐步拉长
+    assert schedule_policy.adapt_interval(3600, 0, 3600) == 5400
+    # 第一次采集（没有上次采集时间）保持当前间隔
+    assert schedule_policy.adapt_interval(3600, 5, None) == 3600
+    # 限制在上下限之间
+    assert schedule_policy.adapt_interval(300, 100, 60) == 300
+    assert schedule_policy.adapt_interval(80000, 0, 80000) == 86400
+    assert schedule_policy.adapt_interval(10, 0, None) == 300
+
+
+def test_backoff_doubles_per_failure_up_to_cap():
+    assert [schedule_policy.backoff_delay(600, errors, jitter=0) for errors in range(5)] == [600, 600, 1200, 2400, 4800]
+    assert schedule_policy.backoff_delay(600, 20, jitter=0) == 86400
+    # 间隔低于下限时按下限退避
+    assert schedule_policy.backoff_delay(10, 1, jitter=0) == 300
+
+
+def test_backoff_jitter_stays_within_range():
+    delays = {schedule_policy.backoff_delay(600, 2, jitter=0.1) for _ in range(200)}
+    assert min(delays) >= 1200 and max(delays) <= 1320
+    assert len(delays) > 1
+    capped = {schedule_policy.backoff_delay(600, 20, jitter=0.1) for _ in range(200)}
+    assert min(capped) >= 86400 and max(capped) <= 86400 * 1.1
+
+
+def test_due_sources_in_due_order():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2026, 1, 1, 12)
+    for source_id, offset in [(1, 30), (2, -10), (3, None), (4, 5), (5, -20)]:
+        next_fetch_at = None if offset is None else now + timedelta(minutes=offset)
+        db.add(RSSSource(id=source_id, name=str(source_id), url=str(source_id), next_fetch_at=next_fetch_at))
+    db.get(RSSSource, 5).is_active = False
+    db.commit()
+
+    # 从未采集的源立即到期，其余按到期时间先后，停用的源不采集
+    assert IngestScheduler.due_source_ids(db, now) == [3, 2]
+    assert IngestScheduler.due_source_ids(db, now + timedelta(minutes=10)) == [3, 2, 4]
+
+    # 采集后到期时间推后，改期立即生效
+    db.get(RSSSource, 2).next_fetch_at = db.get(RSSSource, 3).next_fetch_at = now + timedelta(hours=2)
+    db.get(RSSSource, 4).next_fetch_at = now + timedelta(minutes=60)
+    db.get(RSSSource, 1).next_fetch_at = now + timedelta(minutes=1)
+    db.commit()
+    assert IngestScheduler.due_source_ids(db, now + timedelta(minutes=10)) == [1]
+    assert IngestScheduler.due_source_ids(db, now + timedelta(minutes=60)) == [1, 4]
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from core.scheduler import Scheduler
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_runs_are_recorded_and_do_not_overlap():
+    scheduler = Scheduler(max_workers=2, jitter=0)
+    release = threading.Event()
+    active = []
+    peak = []
+
+    def slow():
+        active.append(1)
+        peak.append(len(active))
+        release.wait(2)
+        active.pop()
+        return "done"
+
+    def failing():
+        raise ValueError("boom")
+
+    scheduler.add_task("slow", slow, interval=0.05, run_immediately=True)
+    scheduler.add_task("failing", failing, interval=60, run_immediately=True)
+    scheduler.start()
+    try:
+        # 慢任务运行期间多次到期，只会被跳过，不会并发执行
+        assert _wait_for(lambda: scheduler.get_task("slow").skipped_count >= 3)
+        release.set()
+        assert _wait_for(lambda: scheduler.get_task("slow").run_count >= 2)
+    finally:
+        scheduler.stop()
+
+    assert max(peak) == 1
+    runs = {run["task"]: run for run in reversed(scheduler.history())}
+    assert runs["slow"]["status"] == "success" and runs["slow"]["result"] == "done"
+    assert runs["failing"]["status"] == "error" and runs["failing"]["error"] == "boom"
+    assert scheduler.get_task("failing").error_count == 1
+
+
+def test_added_task_wakes_idle_scheduler():
+    scheduler = Scheduler(max_workers=1, jitter=0)
+    scheduler.start()
+    try:
+        ran = threading.Event()
+        scheduler.add_task("later", ran.set, interval=3600, run_immediately=True)
+        assert ran.wait(1)
+        assert scheduler.run_now("later") and _wait_for(lambda: scheduler.get_task("later").run_count == 2)
+        assert not scheduler.run_now("missing")
+    finally:
+        scheduler.stop()
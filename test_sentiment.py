@@ -0,0 +1,25 @@
+import pytest
+
+from content_analysis.sentiment import LexiconSentiment, TextBlobSentiment
+
+SAMPLES = [
+    "The new policy is very good news for international students!",
+    "This is not good",
+    "not a good outcome for renters",
+    "It is not very good",
+    "Housing remains a terrible problem... but the outlook is really positive!!",
+    "The \"safe\" rating wasn't convincing; residents said it's dangerous.",
+    "<p>Great result</p> <a href=\"https://example.com\">Read more</a>",
+    "",
+]
+
+
+def test_lexicon_within_tolerance_of_textblob():
+    expected = TextBlobSentiment().polarity_batch(SAMPLES)
+    actual = LexiconSentiment().polarity_batch(SAMPLES)
+    assert actual == pytest.approx(expected, abs=0.05)
+
+
+def test_batch_matches_single():
+    engine = LexiconSentiment()
+    assert engine.polarity_batch(SAMPLES) == [engine.polarity(text) for text in SAMPLES]
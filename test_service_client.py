@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+import integration.async_client as async_client
+import integration.service_client as service_client
+from integration.async_client import AsyncServiceClient
+from integration.service_client import ServiceClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = {} if body is None else body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.body
+
+
+def _client(monkeypatch, outcomes):
+    """按顺序返回或抛出 outcomes 中的结果，返回 (客户端, 请求次数列表)"""
+    monkeypatch.setattr(service_client, "retry_delay", lambda attempt: 0)
+    client = ServiceClient("http://service", retries=2)
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(method)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    client.session.request = request
+    return client, calls
+
+
+def _refused():
+    return requests.exceptions.ConnectionError(
+        MaxRetryError(None, "/", reason=NewConnectionError(None, "Connection refused"))
+    )
+
+
+def test_post_is_not_retried_after_read_timeout(monkeypatch):
+    client, calls = _client(monkeypatch, [requests.exceptions.ReadTimeout("read timed out")])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client._make_request("post", "/queue/claim", {"limit": 10})
+    assert len(calls) == 1
+
+    client, calls = _client(monkeypatch, [FakeResponse(503)])
+    with pytest.raises(requests.exceptions.HTTPError):
+        client._make_request("post", "/queue/claim", {"limit": 10})
+    assert len(calls) == 1
+
+
+def test_post_is_retried_when_connection_was_never_made(monkeypatch):
+    client, calls = _client(monkeypatch, [_refused(), FakeResponse(200, {"token": "t"})])
+    assert client._make_request("post", "/queue/claim", {"limit": 10}) == {"token": "t"}
+    assert len(calls) == 2
+
+
+def test_idempotent_requests_retry_timeouts_and_gateway_errors(monkeypatch):
+    client, calls = _client(monkeypatch, [requests.exceptions.ReadTimeout("read timed out"), FakeResponse(503), FakeResponse(200, [])])
+    assert client._make_request("post", "/batch-analyze", [], idempotent=True) == []
+    assert len(calls) == 3
+
+    client, calls = _client(monkeypatch, [FakeResponse(503)])
+    with pytest.raises(requests.exceptions.HTTPError):
+        client._make_request("get", "/articles/pending")
+    assert len(calls) == 3
+
+
+def _async_calls(monkeypatch, error, method="post", idempotent=None):
+    monkeypatch.setattr(async_client, "retry_delay", lambda attempt: 0)
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            raise error
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client = AsyncServiceClient("http://service", retries=2)
+        await client.client.aclose()
+        client.client = httpx.AsyncClient(base_url="http://service", transport=httpx.MockTransport(handler))
+        async with client:
+            return await client._make_request(method, "/queue/claim", {"limit": 10}, idempotent=idempotent)
+
+    try:
+        return asyncio.run(run()), len(calls)
+    except httpx.HTTPError as e:
+        return e, len(calls)
+
+
+def test_async_post_retry_rules(monkeypatch):
+    result, calls = _async_calls(monkeypatch, httpx.ReadTimeout("read timed out"))
+    assert isinstance(result, httpx.ReadTimeout) and calls == 1
+    assert _async_calls(monkeypatch, httpx.ConnectError("refused")) == ({"ok": True}, 2)
+    assert _async_calls(monkeypatch, httpx.ReadTimeout("read timed out"), idempotent=True) == ({"ok": True}, 2)
@@ -0,0 +1,108 @@
+import os
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from data_ingestion import telemetry
+from data_ingestion.fetcher import FetchResult
+from data_ingestion.models import Base, RSSSource, SourceFetchStat
+
+NOW = datetime(2025, 6, 10, 12, 30)
+TEMPLATES = os.path.join(os.path.dirname(__file__), "admin_dashboard", "templates")
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(RSSSource(id=1, name="ABC", url="https://example.com/rss"))
+    db.commit()
+    return db
+
+
+def _stat(bucket_start, resolution=0, samples=1, errors=0, wall_time=1.0, p50=None, p95=None, **values):
+    return SourceFetchStat(
+        source_id=1, bucket_start=bucket_start, resolution=resolution, samples=samples, errors=errors,
+        unchanged=values.get("unchanged", 0), truncated=values.get("truncated", 0), wall_time=wall_time,
+        latency_p50=wall_time if p50 is None else p50, latency_p95=wall_time if p95 is None else p95,
+        bytes=values.get("bytes", 100), entries=values.get("entries", 10), new_articles=values.get("new_articles", 1),
+        parse_time=values.get("parse_time", 0.1), db_time=values.get("db_time", 0.2)
+    )
+
+
+def _rows(db, resolution):
+    return db.query(SourceFetchStat).filter_by(resolution=resolution).order_by(SourceFetchStat.bucket_start).all()
+
+
+def test_compact_downsamples_and_expires(monkeypatch):
+    monkeypatch.setattr(telemetry.settings, "TELEMETRY_RAW_RETENTION", 48)
+    monkeypatch.setattr(telemetry.settings, "TELEMETRY_HOURLY_RETENTION", 30)
+    monkeypatch.setattr(telemetry.settings, "TELEMETRY_DAILY_RETENTION", 365)
+    db = _session()
+    db.add_all([
+        # 超过48小时的原始记录：同一小时的三次采集（一次失败）和下一小时的一次
+        _stat(datetime(2025, 6, 7, 10, 5), wall_time=1.0, truncated=1),
+        _stat(datetime(2025, 6, 7, 10, 20), wall_time=3.0, bytes=300, new_articles=4),
+        _stat(datetime(2025, 6, 7, 10, 40), errors=1, wall_time=5.0, entries=0, new_articles=0),
+        _stat(datetime(2025, 6, 7, 11, 15), wall_time=2.0),
+        # 仍在保留期内的原始记录
+        _stat(datetime(2025, 6, 10, 11, 0)),
+        # 超过30天的小时汇总，按天合并
+        _stat(datetime(2025, 5, 1, 3), resolution=telemetry.HOUR, samples=3, wall_time=4.0, p50=1.0, p95=2.0),
+        _stat(datetime(2025, 5, 1, 5), resolution=telemetry.HOUR, samples=1, wall_time=4.0, p50=4.0, p95=8.0),
+        # 超过365天的天汇总
+        _stat(datetime(2024, 5, 1), resolution=telemetry.DAY, samples=24),
+    ])
+    db.commit()
+
+    assert telemetry.compact(db, now=NOW) == {"raw": 4, "hourly": 2, "expired": 1}
+
+    assert [row.bucket_start for row in _rows(db, 0)] == [datetime(2025, 6, 10, 11, 0)]
+    ten, eleven = _rows(db, telemetry.HOUR)
+    assert (ten.bucket_start, eleven.bucket_start) == (datetime(2025, 6, 7, 10), datetime(2025, 6, 7, 11))
+    assert (ten.samples, ten.errors, ten.truncated, ten.wall_time) == (3, 1, 1, 9.0)
+    assert (ten.bytes, ten.entries, ten.new_articles) == (500, 20, 5)
+    # 分位数只统计成功的采集
+    assert (ten.latency_p50, ten.latency_p95) == (1.0, 3.0)
+    assert (eleven.samples, eleven.latency_p50) == (1, 2.0)
+
+    (day,) = _rows(db, telemetry.DAY)
+    assert (day.bucket_start, day.samples, day.wall_time) == (datetime(2025, 5, 1), 4, 8.0)
+    # 按每行的成功次数加权
+    assert (day.latency_p50, day.latency_p95) == (1.0, 8.0)
+
+    # 再次执行没有可合并的记录
+    assert telemetry.compact(db, now=NOW) == {"raw": 0, "hourly": 0, "expired": 0}
+
+
+def _result(elapsed, entries=10, content=b"x" * 2048, truncated=False):
+    result = FetchResult("https://example.com/rss", status_code=200, content=content, elapsed=elapsed)
+    result.entries = [{}] * entries
+    result.parse_time = 0.05
+    result.truncated = truncated
+    return result
+
+
+def test_summary_on_sources_page():
+    db = _session()
+    source = db.get(RSSSource, 1)
+    for elapsed, new_articles in [(1.0, 5), (2.0, 0), (3.0, 0), (10.0, 5)]:
+        telemetry.record_fetch(db, source, _result(elapsed), new_articles=new_articles, db_time=0.02)
+    telemetry.record_fetch(db, source, _result(30.0, truncated=True), error=True)
+    db.commit()
+
+    summary = telemetry.summaries(db)[1]
+    assert (summary.samples, summary.errors, summary.truncated) == (5, 1, 1)
+    assert (summary.latency_p50, summary.latency_p95) == (2.0, 10.0)
+    assert (summary.avg_bytes, summary.avg_entries, summary.new_ratio) == (2048, 10, 0.25)
+    assert (round(summary.parse_time, 3), round(summary.db_time, 3)) == (0.05, 0.02)
+
+    source.stats = summary
+    source.health_status = "healthy"
+    env = Environment(loader=FileSystemLoader(TEMPLATES))
+    html = env.get_template("sources.html").render(request=None, sources=[source], url_for=lambda *a, **k: "")
+    text = " ".join(html.split())
+    assert "延迟 p50 2.00s / p95 10.00s" in text
+    assert "新文章率 25%, 平均 2.0 KB / 10 条, 解析 50ms / 写库 20ms (最近5次, 失败1次, 截断1次)" in text
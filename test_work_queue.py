@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from data_ingestion.models import Article, Base
+from data_ingestion.work_queue import ArticleQueue, bulk_update_articles
+
+
+def _session(count=5):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(1, count + 1):
+        db.add(Article(id=i, guid=str(i), title=f"t{i}", content="c", source="test", url=str(i),
+                       published_at=datetime.now(), status="pending"))
+    db.commit()
+    return db
+
+
+def _expire_leases(db):
+    db.execute(update(Article).values(lease_expires_at=datetime.now() - timedelta(seconds=1)))
+    db.commit()
+
+
+def test_claims_do_not_overlap_and_stale_results_are_dropped():
+    db = _session()
+    queue = ArticleQueue(lease_seconds=60, max_attempts=3)
+    first, a = queue.claim(db, "a", 3)
+    second, b = queue.claim(db, "b", 3)
+    assert [x.id for x in a] == [1, 2, 3] and [x.id for x in b] == [4, 5]
+    assert queue.claim(db, "c", 3) == (None, [])
+
+    # 租约到期后被他人接手，原工作者的结果不会写回
+    _expire_leases(db)
+    third, c = queue.claim(db, "c", 3)
+    assert [x.id for x in c] == [1, 2, 3]
+    assert queue.complete(db, first, [{"id": 1, "status": "processed"}]) == 0
+    assert queue.complete(db, third, [{"id": 1, "status": "processed"}]) == 1
+    db.commit()
+    assert queue.stats(db) == {"available": 2, "leased": 2, "failed": 0}
+
+
+def test_repeated_failures_are_dead_lettered():
+    db = _session(1)
+    queue = ArticleQueue(lease_seconds=60, max_attempts=2)
+    token, _ = queue.claim(db, "a", 1)
+    assert queue.fail(db, token, "boom") == {"retry": 1, "failed": 0}
+    # 第二次领取后工作者崩溃，租约到期时转为死信
+    queue.claim(db, "a", 1)
+    _expire_leases(db)
+    assert queue.claim(db, "b", 1) == (None, [])
+    assert queue.stats(db)["failed"] == 1
+    assert db.get(Article, 1).last_error == "boom"
+
+    assert queue.requeue_failed(db) == 1
+    assert [x.id for x in queue.claim(db, "b", 1)[1]] == [1]
+
+
+def test_bulk_update_leaves_missing_columns_untouched():
+    db = _session(3)
+    db.execute(update(Article).values(sentiment=0.5))
+    rows = [{"id": 1, "status": "processed"}, {"id": 2, "status": "irrelevant", "sentiment": None}, {"id": 9, "status": "processed"}]
+    assert bulk_update_articles(db, rows) == 2
+    db.commit()
+    assert [(a.status, a.sentiment) for a in db.query(Article).order_by(Article.id)] == [
+        ("processed", 0.5), ("irrelevant", None), ("pending", 0.5)
+    ]